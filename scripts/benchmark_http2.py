@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Benchmark HTTP/1.1 vs HTTP/2 for concurrent lookups against a local mock server.
+
+The mock server speaks cleartext HTTP/2 (prior knowledge) and HTTP/1.1 on the
+same port. It simulates connection setup cost (TLS handshake) and per-request
+latency, and counts the connections each client opens.
+
+Usage:
+    python scripts/benchmark_http2.py
+    python scripts/benchmark_http2.py --requests 50 --latency 0.05 --setup 0.1
+
+Requires the optional 'h2' package (pip install h2).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    print(json.dumps({"error": "h2 not installed", "message": "Run: pip install h2"}))
+    sys.exit(1)
+
+from src.utils import HTTPPoolConfig
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+BODY = json.dumps({"object": "list", "results": [], "has_more": False}).encode()
+
+
+class MockServer:
+    """Minimal HTTP/1.1 + h2c server with simulated latency."""
+
+    def __init__(self, latency: float, setup: float):
+        self.latency = latency
+        self.setup = setup
+        self.connections = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        await asyncio.sleep(self.setup)
+
+        try:
+            preface = await reader.readexactly(len(H2_PREFACE))
+        except asyncio.IncompleteReadError:
+            writer.close()
+            return
+
+        if preface == H2_PREFACE:
+            await self._serve_h2(preface, reader, writer)
+        else:
+            await self._serve_h1(preface, reader, writer)
+
+    async def _serve_h1(self, buffer: bytes, reader, writer):
+        try:
+            while True:
+                while b"\r\n\r\n" not in buffer:
+                    chunk = await reader.read(65536)
+                    if not chunk:
+                        return
+                    buffer += chunk
+                _, buffer = buffer.split(b"\r\n\r\n", 1)
+
+                await asyncio.sleep(self.latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+                )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_h2(self, preface: bytes, reader, writer):
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def respond(stream_id: int):
+            await asyncio.sleep(self.latency)
+            conn.send_headers(
+                stream_id,
+                [(":status", "200"), ("content-type", "application/json"),
+                 ("content-length", str(len(BODY)))],
+            )
+            conn.send_data(stream_id, BODY, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        pending = set()
+        data = preface
+        try:
+            while data:
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        task = asyncio.create_task(respond(event.stream_id))
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+                writer.write(conn.data_to_send())
+                await writer.drain()
+                data = await reader.read(65536)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def run_client(url: str, count: int, http2: bool, config: HTTPPoolConfig) -> float:
+    """Fire ``count`` concurrent lookups and return the wall time."""
+    # Cleartext h2 needs prior knowledge; real upstreams negotiate it via ALPN
+    client = httpx.AsyncClient(limits=config.limits(), http1=not http2, http2=http2)
+    async with client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.post(f"{url}/v1/databases/db/query", json={"page_size": 1})
+              for _ in range(count))
+        )
+        elapsed = time.perf_counter() - start
+
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="HTTP/1.1 vs HTTP/2 benchmark")
+    parser.add_argument("--requests", type=int, default=50, help="Concurrent lookups")
+    parser.add_argument("--latency", type=float, default=0.05, help="Per-request latency (s)")
+    parser.add_argument("--setup", type=float, default=0.1, help="Connection setup cost (s)")
+    args = parser.parse_args()
+
+    config = HTTPPoolConfig()
+    results = {}
+
+    for label, http2 in (("http1.1", False), ("http2", True)):
+        server = MockServer(args.latency, args.setup)
+        srv = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+
+        async with srv:
+            elapsed = await run_client(f"http://127.0.0.1:{port}", args.requests, http2, config)
+
+        results[label] = {
+            "wall_time_s": round(elapsed, 3),
+            "connections": server.connections,
+            "requests": args.requests,
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Benchmark Notion query payloads with and without filter_properties projection.
+
+Builds a mock Companies database shaped like real query responses (full
+rich_text objects, long descriptions and notes), then compares every page of
+results as returned in full against the projections the tools request:
+response bytes and the time to parse them and build the domain index.
+
+Usage:
+    python scripts/benchmark_projection.py
+    python scripts/benchmark_projection.py --pages 10000 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.serialization import NOTION_PAGE_PROPERTIES
+from src.tools.notion import _website_key
+from src.tools.notion_contacts import COMPANY_FIELDS
+
+PAGE_SIZE = 100
+
+WORDS = (
+    "voice agents speech recognition latency streaming transcription diarization "
+    "multilingual call center dictation meeting notes realtime pipeline accuracy"
+).split()
+
+# Properties each scenario fetches (None: every property)
+SCENARIOS = {
+    "full": None,
+    "dedup": ["Company_Name", "Website"],
+    "search": list(NOTION_PAGE_PROPERTIES),
+    "accounts": COMPANY_FIELDS,
+}
+
+
+def rich_text(text: str) -> list[dict]:
+    """Rich text as Notion returns it, split into 2000-character runs."""
+    return [
+        {
+            "type": "text",
+            "text": {"content": text[i:i + 2000], "link": None},
+            "annotations": {
+                "bold": False, "italic": False, "strikethrough": False,
+                "underline": False, "code": False, "color": "default",
+            },
+            "plain_text": text[i:i + 2000],
+            "href": None,
+        }
+        for i in range(0, len(text), 2000)
+    ]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def select(prop_id: str, name: str) -> dict:
+    return {"id": prop_id, "type": "select", "select": {"id": f"opt-{name}", "name": name, "color": "blue"}}
+
+
+def make_page(index: int, rng: random.Random) -> dict:
+    name = f"Company {index}"
+    return {
+        "object": "page",
+        "id": f"{index:08x}-0000-4000-8000-{rng.getrandbits(48):012x}",
+        "created_time": "2024-01-01T00:00:00.000Z",
+        "last_edited_time": "2024-06-01T00:00:00.000Z",
+        "parent": {"type": "database_id", "database_id": "companies-db"},
+        "archived": False,
+        "url": f"https://www.notion.so/Company-{index}",
+        "properties": {
+            "Company_Name": {"id": "title", "type": "title", "title": rich_text(name)},
+            "Website": {"id": "W%3Ab", "type": "url", "url": f"https://www.company{index}.ai"},
+            "Linkedin Link": {"id": "Lk", "type": "url", "url": f"https://linkedin.com/company/company{index}"},
+            "ICP": select("%3FIcP", rng.choice(["1", "2", "3", "4", "N/A"])),
+            "Status / Engagement": select("St", rng.choice(["Ice Box", "Contacted", "Meeting"])),
+            "Vertical": select("Vt", rng.choice(["Voice AI", "Healthcare", "Sales"])),
+            "ASR provider": {"id": "As", "type": "multi_select", "multi_select": [
+                {"id": "opt-dg", "name": "Deepgram", "color": "green"},
+                {"id": "opt-wh", "name": "Whisper", "color": "gray"},
+            ]},
+            "Nbr of AI/ML/Speech engineer": {"id": "Nb", "type": "number", "number": rng.randint(0, 50)},
+            "Main Office Country": {"id": "Co", "type": "rich_text", "rich_text": rich_text("France")},
+            "Product description": {"id": "Pd", "type": "rich_text", "rich_text": rich_text(sentence(rng, 250))},
+            "Notes": {"id": "No", "type": "rich_text", "rich_text": rich_text(sentence(rng, 400))},
+        },
+    }
+
+
+def responses(pages: list[dict], properties: list[str] | None) -> list[bytes]:
+    """Query response bodies for every page of results, projected to ``properties``."""
+    if properties is not None:
+        pages = [
+            {**page, "properties": {k: v for k, v in page["properties"].items() if k in properties}}
+            for page in pages
+        ]
+    bodies = []
+    for start in range(0, len(pages), PAGE_SIZE):
+        batch = pages[start:start + PAGE_SIZE]
+        has_more = start + PAGE_SIZE < len(pages)
+        bodies.append(json.dumps({
+            "object": "list",
+            "results": batch,
+            "has_more": has_more,
+            "next_cursor": batch[-1]["id"] if has_more else None,
+        }).encode())
+    return bodies
+
+
+def parse(bodies: list[bytes]) -> float:
+    """Seconds to decode every response and index the pages by domain."""
+    start = time.perf_counter()
+    index = {}
+    for body in bodies:
+        for page in json.loads(body)["results"]:
+            index[_website_key(page)] = page["id"]
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="filter_properties projection benchmark")
+    parser.add_argument("--pages", type=int, default=5000, help="Pages in the mock database")
+    parser.add_argument("--repeat", type=int, default=3, help="Parse runs per scenario (best is kept)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [make_page(i, rng) for i in range(args.pages)]
+
+    results = {}
+    for label, properties in SCENARIOS.items():
+        bodies = responses(pages, properties)
+        size = sum(len(body) for body in bodies)
+        seconds = min(parse(bodies) for _ in range(args.repeat))
+        results[label] = {
+            "properties": properties or "all",
+            "requests": len(bodies),
+            "bytes": size,
+            "bytes_per_page": round(size / max(args.pages, 1)),
+            "parse_ms": round(seconds * 1000, 1),
+        }
+
+    full = results["full"]
+    for label, result in results.items():
+        if label != "full":
+            result["bytes_saved_pct"] = round(100 * (1 - result["bytes"] / full["bytes"]), 1)
+            result["parse_speedup"] = round(full["parse_ms"] / max(result["parse_ms"], 0.001), 1)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Offline Notion snapshot - export the Companies and People databases to SQLite.
+
+Usage:
+    # Export (Companies from NOTION_DATABASE_ID, People from NOTION_PEOPLE_DATABASE_ID)
+    python scripts/notion_snapshot.py export
+
+    # Full-text search over company name, description and vertical
+    python scripts/notion_snapshot.py search "voice agents"
+
+    # Ad-hoc SQL over the flattened tables
+    python scripts/notion_snapshot.py sql "SELECT company_name FROM companies
+        WHERE icp = '3' AND asr_provider LIKE '%Deepgram%' AND main_office_country = 'France'"
+
+    # Every subcommand takes --path for a snapshot file other than the default
+    python scripts/notion_snapshot.py export --path /tmp/notion.sqlite3
+    python scripts/notion_snapshot.py search "voice agents" --path /tmp/notion.sqlite3
+
+Environment:
+    NOTION_API_KEY: Your Notion API key (from .env or environment)
+    NOTION_SNAPSHOT_PATH: Snapshot file (default data/cache/notion/snapshot.sqlite3)
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.serialization import project_notion_page
+from src.tools.notion import get_snapshot, notion_export_snapshot
+from src.tools.notion_snapshot import NotionSnapshot
+from src.utils import close_http_clients
+
+load_dotenv(Path(__file__).parent.parent / ".env")
+
+
+async def export(path: str | None) -> dict:
+    try:
+        return await notion_export_snapshot(Path(path) if path else None)
+    finally:
+        await close_http_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline Notion snapshot")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="Export databases to the snapshot")
+    export_cmd.add_argument("--path", help="Snapshot file")
+
+    search_cmd = commands.add_parser("search", help="Full-text search companies")
+    search_cmd.add_argument("text")
+    search_cmd.add_argument("--table", default="companies")
+    search_cmd.add_argument("--limit", type=int, default=20)
+    search_cmd.add_argument("--path", help="Snapshot file")
+
+    sql_cmd = commands.add_parser("sql", help="Run a read-only SQL query")
+    sql_cmd.add_argument("query")
+    sql_cmd.add_argument("--path", help="Snapshot file")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        result = asyncio.run(export(args.path))
+        print(json.dumps(result, indent=2))
+        sys.exit(1 if "error" in result else 0)
+
+    if args.path:
+        path = Path(args.path)
+        snapshot = NotionSnapshot(path) if path.exists() else None
+    else:
+        snapshot = get_snapshot()
+    if snapshot is None:
+        hint = "python scripts/notion_snapshot.py export" + (f" --path {args.path}" if args.path else "")
+        print(f"Error: no snapshot yet. Run: {hint}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.command == "search":
+            rows = [project_notion_page(p) for p in snapshot.search(args.table, args.text, args.limit)]
+        else:
+            rows = snapshot.query(args.query)
+    except sqlite3.Error as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(rows, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
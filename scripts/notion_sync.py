@@ -21,7 +21,7 @@ import json
 import os
 import sys
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import quote, urlparse
 
 import httpx
 from dotenv import load_dotenv
@@ -33,6 +33,9 @@ load_dotenv(env_path)
 NOTION_API_URL = "https://api.notion.com/v1"
 NOTION_VERSION = "2022-06-28"
 
+# Properties format_page shows; search listings fetch only these
+LISTING_PROPERTIES = ["Company_Name", "Website", "ICP", "Vertical"]
+
 
 def get_config() -> tuple[str, str]:
     """Get Notion API key and database ID from environment."""
@@ -80,6 +83,9 @@ def normalize_domain(url: str) -> str:
 def notion_find_by_website(website: str) -> dict | None:
     """Find a company by website URL.
 
+    All URL variations and a 'contains' fallback are ORed into one query; the
+    best hit is picked locally (exact variation > same domain > other match).
+
     Args:
         website: Website URL to search for
 
@@ -88,58 +94,37 @@ def notion_find_by_website(website: str) -> dict | None:
     """
     _, db_id = get_config()
     domain = normalize_domain(website)
+    if not domain:
+        return None
 
-    # Try multiple URL variations
     variations = [
         f"https://{domain}",
         f"https://www.{domain}",
         domain,
     ]
+    clauses = [{"property": "Website", "url": {"equals": v}} for v in variations]
+    clauses.append({"property": "Website", "url": {"contains": domain}})
 
     with httpx.Client() as client:
-        for url_variant in variations:
-            payload = {
-                "filter": {
-                    "property": "Website",
-                    "url": {"equals": url_variant},
-                }
-            }
-
-            response = client.post(
-                f"{NOTION_API_URL}/databases/{db_id}/query",
-                json=payload,
-                headers=get_headers(),
-                timeout=30.0,
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get("results", [])
-                if results:
-                    return results[0]
-
-        # Fallback: contains search
-        payload = {
-            "filter": {
-                "property": "Website",
-                "url": {"contains": domain},
-            }
-        }
-
         response = client.post(
             f"{NOTION_API_URL}/databases/{db_id}/query",
-            json=payload,
+            json={"filter": {"or": clauses}},
             headers=get_headers(),
             timeout=30.0,
         )
 
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get("results", [])
-            if results:
-                return results[0]
+    if response.status_code != 200:
+        return None
 
-    return None
+    def rank(page: dict) -> tuple:
+        url = page.get("properties", {}).get("Website", {}).get("url") or ""
+        if url in variations:
+            return (variations.index(url), page.get("created_time", ""))
+        same_domain = normalize_domain(url) == domain
+        return (len(variations) + (0 if same_domain else 1), page.get("created_time", ""))
+
+    results = response.json().get("results", [])
+    return min(results, key=rank) if results else None
 
 
 def notion_save_company(
@@ -239,11 +224,23 @@ def notion_save_company(
         }
 
 
-def notion_search(query: str) -> dict:
+def property_ids(client: httpx.Client, names: list[str]) -> list[str] | None:
+    """Property IDs of ``names`` from the database schema, None if any is unknown."""
+    _, db_id = get_config()
+    response = client.get(f"{NOTION_API_URL}/databases/{db_id}", headers=get_headers(), timeout=30.0)
+    if response.status_code != 200:
+        return None
+    schema = response.json().get("properties", {})
+    ids = [schema.get(name, {}).get("id") for name in names]
+    return ids if all(ids) else None
+
+
+def notion_search(query: str, properties: list[str] | None = None) -> dict:
     """Search for companies in Notion.
 
     Args:
         query: Search query
+        properties: Only return these properties (Notion's filter_properties)
 
     Returns:
         Search results
@@ -260,12 +257,13 @@ def notion_search(query: str) -> dict:
         }
 
     with httpx.Client() as client:
-        response = client.post(
-            f"{NOTION_API_URL}/databases/{db_id}/query",
-            json=payload,
-            headers=get_headers(),
-            timeout=30.0,
-        )
+        url = f"{NOTION_API_URL}/databases/{db_id}/query"
+        ids = property_ids(client, properties) if properties else None
+        if ids:
+            # IDs are already percent-encoded; keep httpx from encoding them again
+            url += "?" + "&".join(f"filter_properties={quote(i, safe='%')}" for i in ids)
+
+        response = client.post(url, json=payload, headers=get_headers(), timeout=30.0)
 
         if response.status_code != 200:
             return {"error": f"API error {response.status_code}", "detail": response.text}
@@ -391,7 +389,7 @@ Examples:
                 print(f"Not found: {args.website}")
 
     elif args.command == "search":
-        result = notion_search(args.query)
+        result = notion_search(args.query, properties=None if args.json else LISTING_PROPERTIES)
 
         if args.json:
             print(json.dumps(result, indent=2))
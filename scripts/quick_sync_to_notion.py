@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """
 Direct Notion sync script - Run on your laptop with local .env file
-Usage: python scripts/quick_sync_to_notion.py livekit.io
+Usage: python scripts/quick_sync_to_notion.py livekit.io [daily.co ...] [--replace-report]
+
+Each company's latest research/deep-dive-<company>-*.md report is uploaded to
+its page as Notion blocks; the reports upload concurrently, and re-running
+after an interruption resumes where the upload stopped.
 """
 import os
 import sys
@@ -18,6 +22,11 @@ except ImportError:
     print("Run: pip install notion-client")
     sys.exit(1)
 
+from src.tools.notion import diff_properties, get_schema_cache
+from src.tools.notion_blocks import notion_append_documents
+from src.tools.notion_mirror import normalize_id
+from src.utils import close_http_clients
+
 # Load .env if available
 env_file = Path(__file__).parent.parent / "config" / ".env"
 if env_file.exists():
@@ -31,7 +40,9 @@ if env_file.exists():
 # Configuration
 DATABASE_ID = os.environ.get("NOTION_DATABASE_ID", "2861bdff7e998000a14edb0bf56a75bf")
 NOTION_API_KEY = os.environ.get("NOTION_API_KEY", "")
-COMPANY = sys.argv[1] if len(sys.argv) > 1 else "livekit.io"
+COMPANIES = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or ["livekit.io"]
+REPLACE_REPORT = "--replace-report" in sys.argv
+RESEARCH_DIR = Path(__file__).parent.parent / "research"
 
 # Company data mapping (extracted from deep dive analyses)
 COMPANY_DATA = {
@@ -85,35 +96,68 @@ COMPANY_DATA = {
     },
 }
 
-async def sync_to_notion():
-    """Sync company data to Notion database."""
+async def sync_to_notion(company: str) -> str:
+    """Sync company data to Notion database and return its page ID."""
     if not NOTION_API_KEY:
         print("❌ NOTION_API_KEY not set")
         print("\nPlease set it in config/.env or export it:")
         print("export NOTION_API_KEY='secret_your_key_here'")
         sys.exit(1)
 
-    if COMPANY not in COMPANY_DATA:
-        print(f"❌ Unknown company: {COMPANY}")
+    if company not in COMPANY_DATA:
+        print(f"❌ Unknown company: {company}")
         print(f"Available: {', '.join(COMPANY_DATA.keys())}")
         sys.exit(1)
 
-    data = COMPANY_DATA[COMPANY]
+    data = COMPANY_DATA[company]
     client = AsyncClient(auth=NOTION_API_KEY)
 
     print(f"\n{'='*60}")
     print(f"  Syncing {data['Company_Name']} to Notion")
     print(f"{'='*60}\n")
 
-    # Step 1: Search for existing page
+    # Step 1: Prepare properties
+    properties = {
+        "Company_Name": {"title": [{"text": {"content": data["Company_Name"]}}]},
+        "Website": {"url": data["Website"]},
+        "Linkedin Link": {"url": data["Linkedin Link"]},
+        "Status / Engagement": {"select": {"name": data["Status / Engagement"]}},
+        "Vertical": {"select": {"name": data["Vertical"]}},
+        "ICP": {"select": {"name": data["ICP"]}},
+        "Product description": {"rich_text": [{"text": {"content": data["Product description"]}}]},
+        "ASR provider": {"multi_select": [{"name": name} for name in data["ASR provider"]]},
+        "Nbr of AI/ML/Speech engineer": {"number": data["Nbr of AI/ML/Speech engineer"]},
+        "Main Office Country": {"rich_text": [{"text": {"content": data["Main Office Country"]}}]},
+    }
+
+    # Check property names and select options against the cached schema
+    schema_cache = get_schema_cache()
+    schema = schema_cache.get(DATABASE_ID)
+    if schema is None:
+        schema = schema_cache.put(DATABASE_ID, await client.databases.retrieve(database_id=DATABASE_ID))
+    problems = schema.validate(properties)
+    if problems and normalize_id(DATABASE_ID) not in schema_cache.fetched:
+        # The persisted copy may predate new options; check the live schema once
+        schema = schema_cache.put(DATABASE_ID, await client.databases.retrieve(database_id=DATABASE_ID))
+        problems = schema.validate(properties)
+    if problems:
+        print("❌ Properties do not match the database schema:")
+        for problem in problems:
+            print(f"   • {problem}")
+        sys.exit(1)
+
+    # Step 2: Search for existing page, fetching only the properties we write
+    # (their IDs come from the schema; caches written before IDs were kept lack them)
     print(f"🔍 Searching for existing page by URL: {data['Website']}")
+    projection = [schema.properties[name].get("id") for name in properties]
     try:
         query = await client.databases.query(
             database_id=DATABASE_ID,
             filter={
                 "property": "Website",
                 "url": {"equals": data["Website"]}
-            }
+            },
+            **({"filter_properties": projection} if all(projection) else {}),
         )
     except Exception as e:
         print(f"❌ Error querying database: {e}")
@@ -123,35 +167,26 @@ async def sync_to_notion():
         print("3. Go to Notion DB → ... → Add connections → Select your integration")
         sys.exit(1)
 
-    # Step 2: Prepare properties
-    properties = {
-        "Company_Name": {"title": [{"text": {"content": data["Company_Name"]}}]},
-        "Website": {"url": data["Website"]},
-        "Linkedin Link": {"url": data["Linkedin Link"]},
-        "Status / Engagement": {"select": {"name": data["Status / Engagement"]}},
-        "Vertical": {"select": {"name": data["Vertical"]}},
-        "ICP": {"select": {"name": data["ICP"]}},
-        "Product description": {"rich_text": [{"text": {"content": data["Product description"]}}]},
-        "ASR provider": {"multi_select": [{"name": name} for name in data["ASR provider"]]},
-        "Nbr of AI/ML/Speech engineer": {"number": data["Nbr of AI/ML/Speech engineer"]},
-        "Main Office Country": {"rich_text": [{"text": {"content": data["Main Office Country"]}}]},
-    }
-
-    # Step 3: Create or update page
+    # Step 3: Create or update page (only properties that changed)
     if query["results"]:
-        page_id = query["results"][0]["id"]
+        existing = query["results"][0]
+        page_id = existing["id"]
         print(f"✅ Found existing page")
         print(f"   Page ID: {page_id}")
 
-        try:
-            response = await client.pages.update(
-                page_id=page_id,
-                properties=properties
-            )
-            print(f"✅ Updated page properties")
-        except Exception as e:
-            print(f"❌ Error updating page: {e}")
-            sys.exit(1)
+        changed = diff_properties(properties, existing)
+        if not changed:
+            print(f"✅ Page already up to date, skipped update")
+        else:
+            try:
+                response = await client.pages.update(
+                    page_id=page_id,
+                    properties=changed
+                )
+                print(f"✅ Updated {len(changed)} changed properties ({len(properties) - len(changed)} unchanged)")
+            except Exception as e:
+                print(f"❌ Error updating page: {e}")
+                sys.exit(1)
     else:
         print(f"📝 No existing page found, creating new...")
 
@@ -170,26 +205,6 @@ async def sync_to_notion():
             print("2. Check 'Vertical' and 'ICP' values exist as options")
             sys.exit(1)
 
-    # Step 4: Add content reference
-    report_path = f"logs/deep-dive-{COMPANY}-2025-11-06.md"
-    try:
-        await client.blocks.children.append(
-            block_id=page_id,
-            children=[
-                {
-                    "object": "block",
-                    "type": "callout",
-                    "callout": {
-                        "rich_text": [{"type": "text", "text": {"content": f"📊 Full research report: {report_path}"}}],
-                        "icon": {"emoji": "📊"}
-                    }
-                }
-            ]
-        )
-        print(f"✅ Added report reference")
-    except Exception as e:
-        print(f"⚠️  Could not add content block: {e}")
-
     # Success!
     page_url = f"https://notion.so/{page_id.replace('-', '')}"
     print(f"\n{'='*60}")
@@ -203,10 +218,51 @@ async def sync_to_notion():
     print(f"   • ASR Providers: {', '.join(data['ASR provider'])}")
     print(f"   • Engineers: {data['Nbr of AI/ML/Speech engineer']}")
     print()
+    return page_id
+
+
+def latest_report(company: str) -> Path | None:
+    """Most recent deep dive for ``company`` (file names end with the date)."""
+    reports = sorted(RESEARCH_DIR.glob(f"deep-dive-{company}-*.md"))
+    return reports[-1] if reports else None
+
+
+async def main():
+    """Sync each company's properties, then upload all their reports concurrently."""
+    page_ids = {company: await sync_to_notion(company) for company in COMPANIES}
+    documents = []
+    for company, page_id in page_ids.items():
+        report = latest_report(company)
+        if report is None:
+            print(f"⚠️  No research report found for {company} in {RESEARCH_DIR}")
+            continue
+        documents.append({"page_id": page_id, "markdown": report.read_text(), "title": report.name})
+
+    try:
+        results = await notion_append_documents(documents, replace=REPLACE_REPORT)
+    finally:
+        await close_http_clients()
+
+    failed = False
+    for document, result in zip(documents, results):
+        if "error" in result:
+            failed = True
+            print(f"❌ {document['title']}: {result['error']}")
+            if "differing_blocks" in (result.get("detail") or {}):
+                print("   Pass --replace-report to overwrite the uploaded version")
+            else:
+                print(f"   Stopped after {result.get('appended', 0)} blocks; re-run to resume")
+        else:
+            print(
+                f"✅ {document['title']}: {result['appended']} blocks appended, "
+                f"{result['skipped']} already uploaded ({result['requests']} requests)"
+            )
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python scripts/quick_sync_to_notion.py <company>")
+        print("Usage: python scripts/quick_sync_to_notion.py <company> [<company> ...] [--replace-report]")
         print("\nAvailable companies:")
         for company in COMPANY_DATA.keys():
             print(f"  - {company}")
@@ -214,4 +270,4 @@ if __name__ == "__main__":
         print("  python scripts/quick_sync_to_notion.py livekit.io")
         sys.exit(1)
 
-    asyncio.run(sync_to_notion())
+    asyncio.run(main())
@@ -33,7 +33,18 @@ from .tools import (
     browser_extract_links,
     browser_scroll_and_capture,
 )
-from .tools.notion import notion_find_by_website, notion_save_company_if_not_exists
+from .tools.notion_contacts import AsyncNotionContactManager
+from .tools.notion import (
+    flush_notion_writes,
+    notion_find_by_website,
+    notion_save_company_if_not_exists,
+    start_write_behind,
+)
+from .logging_config import get_logger
+from .serialization import NOTION_PAGE_PROPERTIES, serialize_result, verbose_enabled
+from .utils import close_http_clients
+
+logger = get_logger("agent")
 
 
 # System prompt for the sales assistant
@@ -95,6 +106,7 @@ User: "Research vapi.ai and find key contacts"
 
 ### Skip Rules
 - Skip n8n if user explicitly says "search the web" or "use Exa/Tavily"
+- If a tool returns `service_unavailable`, do not retry it - go to the next priority
 - Skip Playwright if APIs already returned complete data
 - Go directly to Playwright if user asks for "screenshot" or "scrape"
 
@@ -201,8 +213,16 @@ Priority: CTO, VP Engineering, Head of AI, Founder/CEO.
 2. Enrich with n8n_enrich_person
 3. Browser fallback for LinkedIn profiles
 
+Start with notion_company_contacts to see who is already linked to the
+company. Check notion_check_contact before adding anyone; add new contacts
+with notion_add_contact (company_id is the Notion page of their company).
+
 Return: name, title, email, linkedin, source.""",
         tools=[
+            "mcp__sales__notion_company_contacts",
+            "mcp__sales__notion_check_contact",
+            "mcp__sales__notion_search_contacts",
+            "mcp__sales__notion_add_contact",
             "mcp__sales__n8n_enrich_person",
             "mcp__sales__exa_web_search",
             "mcp__sales__browser_extract_text",
@@ -226,6 +246,31 @@ Return ranked list with: company, domain, description, icp, fit_score, reasoning
 }
 
 
+def _json_result(tool_name: str, result: Any) -> dict[str, Any]:
+    """Wrap a tool result as MCP text content.
+
+    Results are projected and size-bounded per tool (see src/serialization.py).
+    When the upstream's circuit breaker is open, the result is flagged as an
+    error with a short instruction so the model moves on to the next tool
+    priority instead of retrying a dead dependency.
+    """
+    if isinstance(result, dict) and result.get("service_unavailable"):
+        unavailable = {
+            "error": "service_unavailable",
+            "service": result.get("service"),
+            "retry_in_seconds": result.get("retry_in"),
+            "instruction": "Do not retry this tool now; use the next tool priority.",
+        }
+        return {
+            "content": [{"type": "text", "text": json.dumps(unavailable)}],
+            "is_error": True,
+        }
+
+    return {
+        "content": [{"type": "text", "text": serialize_result(tool_name, result)}]
+    }
+
+
 # Define tools using the @tool decorator
 @tool(
     "exa_web_search",
@@ -235,6 +280,7 @@ Return ranked list with: company, domain, description, icp, fit_score, reasoning
         "num_results": int,
         "category": str,
         "include_domains": list,
+        "refresh": bool,
     },
 )
 async def tool_exa_search(args: dict[str, Any]) -> dict[str, Any]:
@@ -244,26 +290,24 @@ async def tool_exa_search(args: dict[str, Any]) -> dict[str, Any]:
         num_results=args.get("num_results", 10),
         category=args.get("category"),
         include_domains=args.get("include_domains"),
+        refresh_cache=args.get("refresh", False),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("exa_web_search", result)
 
 
 @tool(
     "exa_find_lookalikes",
     "Find companies similar to a given company URL",
-    {"url": str, "num_results": int},
+    {"url": str, "num_results": int, "refresh": bool},
 )
 async def tool_exa_find_similar(args: dict[str, Any]) -> dict[str, Any]:
     """Find similar companies using Exa."""
     result = await exa_find_similar(
         url=args["url"],
         num_results=args.get("num_results", 10),
+        refresh_cache=args.get("refresh", False),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("exa_find_lookalikes", result)
 
 
 @tool(
@@ -273,6 +317,7 @@ async def tool_exa_find_similar(args: dict[str, Any]) -> dict[str, Any]:
         "query": str,
         "search_depth": str,
         "max_results": int,
+        "refresh": bool,
     },
 )
 async def tool_tavily_search(args: dict[str, Any]) -> dict[str, Any]:
@@ -281,39 +326,39 @@ async def tool_tavily_search(args: dict[str, Any]) -> dict[str, Any]:
         query=args["query"],
         search_depth=args.get("search_depth", "basic"),
         max_results=args.get("max_results", 10),
+        refresh_cache=args.get("refresh", False),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("tavily_search", result)
 
 
 @tool(
     "tavily_extract_content",
     "Extract content from specific URLs using Tavily",
-    {"urls": list},
+    {"urls": list, "refresh": bool},
 )
 async def tool_tavily_extract(args: dict[str, Any]) -> dict[str, Any]:
     """Extract content from URLs."""
-    result = await tavily_extract(urls=args["urls"])
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    result = await tavily_extract(
+        urls=args["urls"],
+        refresh_cache=args.get("refresh", False),
+    )
+    return _json_result("tavily_extract_content", result)
 
 
 @tool(
     "notion_search_companies",
     "Search the Notion database for existing companies",
-    {"query": str, "filter_property": str},
+    {"query": str, "filter_property": str, "limit": int},
 )
 async def tool_notion_search(args: dict[str, Any]) -> dict[str, Any]:
     """Search Notion for companies."""
     result = await notion_search(
         query=args["query"],
         filter_property=args.get("filter_property"),
+        limit=args.get("limit", 25),
+        properties=None if verbose_enabled() else list(NOTION_PAGE_PROPERTIES),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("notion_search_companies", result)
 
 
 @tool(
@@ -334,7 +379,7 @@ async def tool_notion_search(args: dict[str, Any]) -> dict[str, Any]:
 async def tool_notion_save(args: dict[str, Any]) -> dict[str, Any]:
     """Save company to Notion."""
     # Check for duplicates first
-    existing = await notion_find_by_website(args["website"])
+    existing = await notion_find_by_website(args["website"], properties=["Company_Name"])
     if existing:
         return {
             "content": [{
@@ -354,9 +399,7 @@ async def tool_notion_save(args: dict[str, Any]) -> dict[str, Any]:
         ai_ml_engineers=args.get("ai_ml_engineers"),
         country=args.get("country"),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("notion_save_company", result)
 
 
 @tool(
@@ -366,13 +409,82 @@ async def tool_notion_save(args: dict[str, Any]) -> dict[str, Any]:
 )
 async def tool_notion_update(args: dict[str, Any]) -> dict[str, Any]:
     """Update company in Notion."""
+    # With write-behind on, wait for the flush so a failed PATCH reaches the
+    # model instead of a 'queued' receipt
     result = await notion_update_company(
         page_id=args["page_id"],
         updates=args["updates"],
+        wait=True,
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("notion_update_company", result)
+
+
+@tool(
+    "notion_check_contact",
+    "Check whether a person is already in the Notion People database, by LinkedIn URL",
+    {"linkedin_url": str},
+)
+async def tool_notion_check_contact(args: dict[str, Any]) -> dict[str, Any]:
+    """Check People database for a contact."""
+    result = await AsyncNotionContactManager().check_duplicate_by_linkedin(args["linkedin_url"])
+    return _json_result("notion_check_contact", result)
+
+
+@tool(
+    "notion_search_contacts",
+    "Search the Notion People database for contacts by name",
+    {"name": str},
+)
+async def tool_notion_search_contacts(args: dict[str, Any]) -> dict[str, Any]:
+    """Search People database by name."""
+    result = await AsyncNotionContactManager().search_contacts_by_name(args["name"])
+    return _json_result("notion_search_contacts", result)
+
+
+@tool(
+    "notion_company_contacts",
+    "Get a company from Notion with every contact already linked to it, by website domain",
+    {"domain": str},
+)
+async def tool_notion_company_contacts(args: dict[str, Any]) -> dict[str, Any]:
+    """Company and its People contacts from one prefetch of both databases."""
+    result = await AsyncNotionContactManager().get_account(args["domain"])
+    return _json_result("notion_company_contacts", result)
+
+
+@tool(
+    "notion_add_contact",
+    "Add a person to the Notion People database, linked to their company page. Check for duplicates first.",
+    {
+        "name": str,
+        "role": str,
+        "company_id": str,
+        "linkedin_url": str,
+        "email": str,
+        "decision_level": str,
+    },
+)
+async def tool_notion_add_contact(args: dict[str, Any]) -> dict[str, Any]:
+    """Add contact to People database."""
+    contacts = AsyncNotionContactManager()
+    existing = await contacts.check_duplicate_by_linkedin(args["linkedin_url"])
+    if existing.get("exists"):
+        return {
+            "content": [{
+                "type": "text",
+                "text": f"Contact already exists in Notion: {existing.get('page_id')}",
+            }]
+        }
+
+    result = await contacts.add_contact(
+        name=args["name"],
+        role=args["role"],
+        company_page_url=args["company_id"],
+        linkedin_url=args["linkedin_url"],
+        email=args.get("email"),
+        decision_level=args.get("decision_level") or "Decision Maker",
+    )
+    return _json_result("notion_add_contact", result)
 
 
 @tool(
@@ -389,9 +501,7 @@ async def tool_n8n_enrich_company(args: dict[str, Any]) -> dict[str, Any]:
         domain=args["domain"],
         company_name=args.get("company_name"),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("n8n_enrich_company", result)
 
 
 @tool(
@@ -412,9 +522,7 @@ async def tool_n8n_enrich_person(args: dict[str, Any]) -> dict[str, Any]:
         name=args.get("name"),
         company=args.get("company"),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("n8n_enrich_person", result)
 
 
 # Browser automation tools (Playwright)
@@ -470,9 +578,7 @@ async def tool_browser_extract_text(args: dict[str, Any]) -> dict[str, Any]:
         selector=args.get("selector"),
         wait_for=args.get("wait_for"),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("browser_extract_text", result)
 
 
 @tool(
@@ -491,9 +597,7 @@ async def tool_browser_extract_html(args: dict[str, Any]) -> dict[str, Any]:
         selector=args.get("selector"),
         wait_for=args.get("wait_for"),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("browser_extract_html", result)
 
 
 @tool(
@@ -512,9 +616,7 @@ async def tool_browser_extract_links(args: dict[str, Any]) -> dict[str, Any]:
         selector=args.get("selector"),
         filter_pattern=args.get("filter_pattern"),
     )
-    return {
-        "content": [{"type": "text", "text": json.dumps(result, indent=2)}]
-    }
+    return _json_result("browser_extract_links", result)
 
 
 @tool(
@@ -566,6 +668,10 @@ def create_sales_tools_server():
             tool_notion_search,
             tool_notion_save,
             tool_notion_update,
+            tool_notion_check_contact,
+            tool_notion_search_contacts,
+            tool_notion_company_contacts,
+            tool_notion_add_contact,
             # n8n enrichment tools
             tool_n8n_enrich_company,
             tool_n8n_enrich_person,
@@ -617,6 +723,10 @@ def create_agent_options(
             "mcp__sales__notion_search_companies",
             "mcp__sales__notion_save_company",
             "mcp__sales__notion_update_company",
+            "mcp__sales__notion_check_contact",
+            "mcp__sales__notion_search_contacts",
+            "mcp__sales__notion_company_contacts",
+            "mcp__sales__notion_add_contact",
             # n8n enrichment tools
             "mcp__sales__n8n_enrich_company",
             "mcp__sales__n8n_enrich_person",
@@ -668,6 +778,7 @@ class SalesAssistant:
         permission_mode: str | None = None,
         include_subagents: bool = True,
         session_id: str | None = None,
+        write_behind: bool | None = None,
     ):
         """Initialize the Sales Assistant.
 
@@ -676,6 +787,9 @@ class SalesAssistant:
             permission_mode: Permission mode for tool execution
             include_subagents: Whether to include subagent definitions
             session_id: Resume a previous session by ID
+            write_behind: Merge Notion page updates per page and flush them in
+                one request (the update tool still waits for the outcome);
+                defaults to NOTION_WRITE_BEHIND
         """
         self.options = create_agent_options(
             system_prompt=system_prompt,
@@ -685,6 +799,9 @@ class SalesAssistant:
         self._client: ClaudeSDKClient | None = None
         self._session_id = session_id
         self._current_session_id: str | None = None
+        if write_behind is None:
+            write_behind = os.getenv("NOTION_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+        self._write_behind = write_behind
 
     @property
     def session_id(self) -> str | None:
@@ -703,6 +820,8 @@ class SalesAssistant:
             else:
                 self._client = ClaudeSDKClient(options=self.options)
             await self._client.__aenter__()
+            if self._write_behind:
+                start_write_behind()
             return self
         except CLINotFoundError as e:
             raise CLINotInstalledError(
@@ -711,9 +830,20 @@ class SalesAssistant:
             ) from e
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Exit async context."""
-        if self._client:
-            await self._client.__aexit__(exc_type, exc_val, exc_tb)
+        """Exit async context, flushing buffered Notion writes and releasing
+        pooled HTTP connections."""
+        try:
+            if self._client:
+                await self._client.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            try:
+                for failed in await flush_notion_writes():
+                    logger.error(
+                        f"Buffered Notion update of page {failed['page_id']} "
+                        f"({', '.join(failed['properties'])}) failed: {failed.get('error')}"
+                    )
+            finally:
+                await close_http_clients()
 
     async def query(self, prompt: str) -> str:
         """Send a query to the assistant and get a response.
@@ -0,0 +1,210 @@
+"""Persistent on-disk response cache for search APIs (Exa, Tavily)."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from .logging_config import get_logger
+
+logger = get_logger("cache")
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "responses.sqlite3"
+
+# Time-to-live per endpoint, in seconds
+ENDPOINT_TTLS: dict[str, float] = {
+    "exa.search": 24 * 3600,
+    "exa.find_similar": 7 * 24 * 3600,
+    "tavily.search": 24 * 3600,
+    "tavily.extract": 7 * 24 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+
+
+def cache_key(model: BaseModel) -> str:
+    """Canonical hash of a validated request model.
+
+    Field order and defaults are normalized by the model, so equivalent calls
+    map to the same key regardless of how the arguments were passed.
+    """
+    canonical = json.dumps(model.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed cache with per-endpoint TTL and size-bounded LRU eviction.
+
+    Payloads are stored as zlib-compressed JSON.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: int = 5000,
+        ttls: Optional[dict[str, float]] = None,
+    ):
+        self.path = Path(path or DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries
+        self.ttls = {**ENDPOINT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, endpoint: str, key: str) -> Optional[dict[str, Any]]:
+        """Return a cached response, or None if missing or expired."""
+        now = time.time()
+        ttl = self.ttls.get(endpoint, DEFAULT_TTL)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE endpoint = ? AND key = ?",
+                (endpoint, key),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if now - created_at > ttl:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND key = ?",
+                    (endpoint, key),
+                )
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE endpoint = ? AND key = ?",
+                (now, endpoint, key),
+            )
+            self._conn.commit()
+
+        self.hits += 1
+        return json.loads(zlib.decompress(value))
+
+    def set(self, endpoint: str, key: str, value: dict[str, Any]) -> None:
+        """Store a response and evict least-recently-used entries over the limit."""
+        now = time.time()
+        blob = zlib.compress(json.dumps(value).encode())
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (endpoint, key, blob, now, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE rowid IN ("
+                    "SELECT rowid FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self, endpoint: Optional[str] = None) -> None:
+        """Remove all entries, or only those of one endpoint."""
+        with self._lock:
+            if endpoint:
+                self._conn.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            else:
+                self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": count}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide response cache.
+
+    Disabled (returns None) when RESPONSE_CACHE_DISABLED is set. The location
+    can be overridden with RESPONSE_CACHE_PATH.
+    """
+    global _cache
+
+    if os.getenv("RESPONSE_CACHE_DISABLED"):
+        return None
+
+    if _cache is None:
+        path = os.getenv("RESPONSE_CACHE_PATH")
+        try:
+            _cache = ResponseCache(Path(path) if path else None)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache unavailable: {e}")
+            return None
+
+    return _cache
+
+
+async def cached_call(
+    endpoint: str,
+    request: BaseModel,
+    fetch,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+) -> dict[str, Any]:
+    """Serve ``fetch()`` through the response cache.
+
+    Args:
+        endpoint: Endpoint name (selects the TTL)
+        request: Validated request model, hashed into the key
+        fetch: Zero-argument coroutine function performing the API call
+        use_cache: False bypasses the cache entirely
+        refresh_cache: True skips the lookup but stores the fresh response
+
+    Returns:
+        Response data (errors are never cached)
+    """
+    cache = get_response_cache() if use_cache else None
+    if cache is None:
+        return await fetch()
+
+    key = cache_key(request)
+    if not refresh_cache:
+        cached = cache.get(endpoint, key)
+        if cached is not None:
+            logger.info(f"Cache hit for {endpoint}")
+            return cached
+
+    data = await fetch()
+    if isinstance(data, dict) and "error" not in data:
+        cache.set(endpoint, key, data)
+    return data
@@ -20,6 +20,7 @@ class Config:
 
     # Notion
     notion_database_id: Optional[str] = None
+    notion_people_database_id: Optional[str] = None
 
     # n8n webhooks
     n8n_webhook_company: Optional[str] = None
@@ -54,6 +55,7 @@ class Config:
             tavily_api_key=os.getenv("TAVILY_API_KEY"),
             notion_api_key=os.getenv("NOTION_API_KEY"),
             notion_database_id=os.getenv("NOTION_DATABASE_ID"),
+            notion_people_database_id=os.getenv("NOTION_PEOPLE_DATABASE_ID"),
             n8n_webhook_company=os.getenv("N8N_WEBHOOK_COMPANY"),
             n8n_webhook_people=os.getenv("N8N_WEBHOOK_PEOPLE"),
         )
@@ -67,6 +69,8 @@ class Config:
 
         if not self.notion_api_key:
             warnings.append("NOTION_API_KEY not set - Notion sync disabled")
+        elif not self.notion_people_database_id:
+            warnings.append("NOTION_PEOPLE_DATABASE_ID not set - contact tools disabled")
 
         if not self.n8n_webhook_company:
             warnings.append("N8N_WEBHOOK_COMPANY not set - company enrichment disabled")
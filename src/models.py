@@ -80,6 +80,7 @@ class TavilySearchInput(BaseModel):
     )
     max_results: int = Field(default=10, ge=1, le=20, description="Number of results")
     include_answer: bool = Field(default=True, description="Include AI-generated answer")
+    include_raw_content: bool = Field(default=False, description="Include raw page content")
     include_domains: Optional[list[str]] = None
     exclude_domains: Optional[list[str]] = None
 
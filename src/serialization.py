@@ -0,0 +1,247 @@
+"""Compact serialization of tool results for the agent's context window.
+
+Raw upstream payloads are large: a Notion query returns dozens of nested
+property objects per page and Exa returns up to 2000 characters of text per
+result. Each tool result is projected to the fields the model actually uses,
+dumped as compact JSON and cut down to a per-tool character budget.
+
+Set TOOL_RESULTS_VERBOSE=1 to get the full, indented payload for debugging.
+"""
+
+import json
+import os
+from typing import Any, Callable, Optional
+
+TRUNCATION_MARK = "…"
+
+# Maximum characters of serialized JSON per tool
+TOOL_BUDGETS: dict[str, int] = {
+    "exa_web_search": 6000,
+    "exa_find_lookalikes": 6000,
+    "tavily_search": 6000,
+    "tavily_extract_content": 12000,
+    "notion_search_companies": 4000,
+    "notion_save_company": 1000,
+    "notion_update_company": 1000,
+    "notion_check_contact": 500,
+    "notion_search_contacts": 3000,
+    "notion_add_contact": 500,
+    "notion_company_contacts": 3000,
+    "n8n_enrich_company": 8000,
+    "n8n_enrich_person": 4000,
+    "browser_extract_text": 15000,
+    "browser_extract_html": 20000,
+    "browser_extract_links": 8000,
+}
+DEFAULT_BUDGET = 8000
+
+# Top-level keys holding result lists that may be shortened to fit the budget
+LIST_KEYS = ("results", "links")
+
+
+def verbose_enabled() -> bool:
+    """Whether TOOL_RESULTS_VERBOSE asks for full, unprojected results."""
+    return os.getenv("TOOL_RESULTS_VERBOSE", "").lower() in ("1", "true", "yes")
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _trim(text: Optional[str], limit: int) -> Optional[str]:
+    """Cut ``text`` to ``limit`` characters, marking the cut."""
+    if not isinstance(text, str) or len(text) <= limit:
+        return text
+    return text[: max(limit - 1, 0)].rstrip() + TRUNCATION_MARK
+
+
+def _drop_empty(data: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in data.items() if v not in (None, "", [], {})}
+
+
+def notion_property_value(prop: dict[str, Any]) -> Any:
+    """Plain value of a Notion property object (title, url, select, ...)."""
+    # Payloads built locally (and some fixtures) omit "type"
+    kind = prop.get("type") or next((k for k in prop if k != "id"), None)
+    value = prop.get(kind) if kind else None
+
+    if kind in ("title", "rich_text"):
+        return "".join(part.get("plain_text") or part.get("text", {}).get("content", "")
+                       for part in value or [])
+    if kind in ("select", "status"):
+        return value.get("name") if value else None
+    if kind == "multi_select":
+        return [option.get("name") for option in value or []]
+    if kind == "relation":
+        return [item.get("id") for item in value or []]
+    if kind == "people":
+        return [person.get("name") or person.get("id") for person in value or []]
+    if kind in ("formula", "rollup") and isinstance(value, dict):
+        return value.get(value.get("type"))
+    return value
+
+
+# Properties project_notion_page reads; queries for projected results fetch only these
+NOTION_PAGE_PROPERTIES = ("Company_Name", "Website", "ICP")
+
+
+def project_notion_page(page: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a Notion page to id, url, name, website and ICP."""
+    properties = page.get("properties", {})
+
+    def prop(name: str) -> Any:
+        return notion_property_value(properties[name]) if name in properties else None
+
+    name = prop("Company_Name")
+    if name is None:
+        # Fall back to whichever property is the page title
+        name = next(
+            (notion_property_value(p) for p in properties.values() if p.get("type") == "title"),
+            None,
+        )
+
+    return _drop_empty({
+        "id": page.get("id"),
+        "url": page.get("url"),
+        "name": name,
+        "website": prop("Website"),
+        "icp": prop("ICP"),
+    })
+
+
+def project_notion_list(data: dict[str, Any]) -> dict[str, Any]:
+    return _drop_empty({
+        "results": [project_notion_page(page) for page in data.get("results", [])],
+        "has_more": data.get("has_more") or None,
+        "next_cursor": data.get("next_cursor"),
+    })
+
+
+def project_notion_update(data: dict[str, Any]) -> dict[str, Any]:
+    """Buffered updates return a receipt, which is already compact."""
+    if data.get("queued"):
+        return data
+    return project_notion_page(data)
+
+
+def project_exa(data: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "results": [
+            _drop_empty({
+                "title": r.get("title"),
+                "url": r.get("url"),
+                "published": (r.get("publishedDate") or "")[:10],
+                "text": _trim(r.get("text"), 500),
+            })
+            for r in data.get("results", [])
+        ]
+    }
+
+
+def project_tavily_search(data: dict[str, Any]) -> dict[str, Any]:
+    return _drop_empty({
+        "answer": data.get("answer"),
+        "results": [
+            _drop_empty({
+                "title": r.get("title"),
+                "url": r.get("url"),
+                "content": _trim(r.get("content"), 500),
+            })
+            for r in data.get("results", [])
+        ],
+    })
+
+
+def project_tavily_extract(data: dict[str, Any]) -> dict[str, Any]:
+    return _drop_empty({
+        "results": [
+            {"url": r.get("url"), "content": _trim(r.get("raw_content"), 4000)}
+            for r in data.get("results", [])
+        ],
+        "failed": [r.get("url") if isinstance(r, dict) else r
+                   for r in data.get("failed_results", [])],
+    })
+
+
+TOOL_PROJECTIONS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "exa_web_search": project_exa,
+    "exa_find_lookalikes": project_exa,
+    "tavily_search": project_tavily_search,
+    "tavily_extract_content": project_tavily_extract,
+    "notion_search_companies": project_notion_list,
+    "notion_save_company": project_notion_page,
+    "notion_update_company": project_notion_update,
+}
+
+
+def _fit_budget(data: Any, budget: int) -> str:
+    """Serialize ``data`` compactly within ``budget`` characters.
+
+    Trailing items of the result list are dropped first (the count is kept in
+    ``omitted``), then the longest top-level string is shortened. Anything
+    still over budget (nested payloads, non-dict results) is returned as a
+    prefix of its JSON text under ``partial``, with ``truncated`` set.
+    """
+    text = _dumps(data)
+    if len(text) <= budget:
+        return text
+    if not isinstance(data, dict):
+        return _cap_text(text, budget)
+
+    data = dict(data)
+    for key in LIST_KEYS:
+        items = data.get(key)
+        if not isinstance(items, list) or not items:
+            continue
+
+        overflow = len(text) - budget + len(_dumps({"omitted": len(items)}))
+        kept = list(items)
+        while kept and overflow > 0:
+            overflow -= len(_dumps(kept.pop())) + 1
+        data[key] = kept
+        data["omitted"] = len(items) - len(kept)
+        text = _dumps(data)
+        break
+
+    while len(text) > budget:
+        strings = [k for k, v in data.items() if isinstance(v, str) and len(v) > 1]
+        if not strings:
+            break
+        longest = max(strings, key=lambda k: len(data[k]))
+        value = data[longest]
+        data[longest] = _trim(value, max(len(value) - (len(text) - budget) - 8, 1))
+        data["truncated"] = True
+        text = _dumps(data)
+
+    return text if len(text) <= budget else _cap_text(text, budget)
+
+
+def _cap_text(text: str, budget: int) -> str:
+    """``text`` cut so that its JSON wrapper fits ``budget`` characters."""
+    cut = budget
+    while True:
+        capped = _dumps({"truncated": True, "partial": text[:cut]})
+        if len(capped) <= budget or cut == 0:
+            return capped
+        cut = max(cut - (len(capped) - budget), 0)
+
+
+def serialize_result(tool: str, result: Any, verbose: Optional[bool] = None) -> str:
+    """Serialize a tool result for the model.
+
+    Args:
+        tool: Tool name (selects projection and budget)
+        result: Raw tool result
+        verbose: Full indented payload; defaults to TOOL_RESULTS_VERBOSE
+
+    Returns:
+        JSON text
+    """
+    if verbose if verbose is not None else verbose_enabled():
+        return json.dumps(result, indent=2, default=str)
+
+    projection = TOOL_PROJECTIONS.get(tool)
+    if projection and isinstance(result, dict) and "error" not in result:
+        result = projection(result)
+
+    return _fit_budget(result, TOOL_BUDGETS.get(tool, DEFAULT_BUDGET))
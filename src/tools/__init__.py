@@ -7,8 +7,20 @@ from .notion import (
     notion_search,
     notion_update_company,
     notion_find_by_website,
+    notion_find_by_websites,
     notion_save_company_if_not_exists,
+    notion_sync_mirror,
+    notion_iter_pages,
+    notion_scan_database,
+    get_notion_write_stats,
+    get_database_schema,
+    notion_find_user,
+    notion_export_snapshot,
+    start_write_behind,
+    flush_notion_writes,
 )
+from .notion_contacts import AsyncNotionContactManager, normalize_linkedin_url
+from .notion_blocks import markdown_to_blocks, notion_append_documents, notion_append_markdown
 from .n8n import n8n_trigger_workflow, n8n_enrich_company, n8n_enrich_person
 from .browser import (
     browser_screenshot,
@@ -27,7 +39,22 @@ __all__ = [
     "notion_search",
     "notion_update_company",
     "notion_find_by_website",
+    "notion_find_by_websites",
     "notion_save_company_if_not_exists",
+    "notion_sync_mirror",
+    "notion_iter_pages",
+    "notion_scan_database",
+    "get_notion_write_stats",
+    "get_database_schema",
+    "notion_find_user",
+    "notion_export_snapshot",
+    "start_write_behind",
+    "flush_notion_writes",
+    "AsyncNotionContactManager",
+    "normalize_linkedin_url",
+    "markdown_to_blocks",
+    "notion_append_markdown",
+    "notion_append_documents",
     "n8n_trigger_workflow",
     "n8n_enrich_company",
     "n8n_enrich_person",
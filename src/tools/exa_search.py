@@ -3,8 +3,18 @@
 import os
 from typing import Any, Optional
 
+from ..cache import cached_call
 from ..logging_config import get_logger
-from ..utils import RetryConfig, http_request
+from ..utils import (
+    AdaptiveTimeoutConfig,
+    CircuitBreakerConfig,
+    HedgeConfig,
+    HTTPPoolConfig,
+    RateLimitConfig,
+    RetryConfig,
+    http_request,
+    single_flight,
+)
 from ..models import ExaSearchInput, ExaFindSimilarInput
 
 logger = get_logger("tools.exa")
@@ -19,7 +29,68 @@ EXA_RETRY_CONFIG = RetryConfig(
     retryable_status_codes=(429, 500, 502, 503, 504),
 )
 
+# Exa search endpoints allow ~5 requests/second
+EXA_RATE_LIMIT = RateLimitConfig(requests_per_second=5.0, burst=5)
+
+EXA_CIRCUIT_BREAKER = CircuitBreakerConfig(failure_threshold=5, recovery_timeout=30.0)
+
+# /search and /findSimilar are idempotent: hedge requests slower than p95,
+# spending at most 10% extra requests
+EXA_HEDGE_CONFIG = HedgeConfig(percentile=95.0, max_hedge_ratio=0.1)
+
+EXA_TIMEOUTS = AdaptiveTimeoutConfig(floor=5.0, ceiling=45.0)
+
+EXA_POOL_CONFIG = HTTPPoolConfig(http2=True)
 
+
+async def _exa_post(
+    endpoint: str,
+    payload: dict[str, Any],
+    api_key: str,
+    label: str,
+) -> dict[str, Any]:
+    """POST to an Exa endpoint and unwrap the response.
+
+    Args:
+        endpoint: Endpoint path (e.g. "search")
+        payload: JSON body
+        api_key: Exa API key
+        label: Operation name for log messages
+
+    Returns:
+        Response data, or an error dict
+    """
+    result = await http_request(
+        method="POST",
+        url=f"{EXA_API_URL}/{endpoint}",
+        headers={
+            "x-api-key": api_key,
+            "Content-Type": "application/json",
+        },
+        json=payload,
+        timeout=30.0,
+        retry_config=EXA_RETRY_CONFIG,
+        rate_limit=EXA_RATE_LIMIT,
+        circuit_breaker=EXA_CIRCUIT_BREAKER,
+        hedge=EXA_HEDGE_CONFIG,
+        adaptive_timeout=EXA_TIMEOUTS,
+        pool=EXA_POOL_CONFIG,
+    )
+
+    if "error" in result:
+        logger.error(f"Exa {label} failed: {result['error']}")
+        if result.get("service_unavailable"):
+            return result
+        return {"error": result["error"], "detail": result.get("data")}
+
+    data = result["data"]
+    num_found = len(data.get("results", []))
+    logger.info(f"Exa {label} returned {num_found} results")
+
+    return data
+
+
+@single_flight("exa.search")
 async def exa_search(
     query: str,
     num_results: int = 10,
@@ -29,6 +100,8 @@ async def exa_search(
     start_published_date: Optional[str] = None,
     category: Optional[str] = None,
     contents: bool = True,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
 ) -> dict[str, Any]:
     """Search the web using Exa AI.
 
@@ -41,6 +114,8 @@ async def exa_search(
         start_published_date: Filter by publish date (ISO format)
         category: Filter by category (company, research_paper, news, etc.)
         contents: Include page contents in results
+        use_cache: Serve from / store in the on-disk response cache
+        refresh_cache: Ignore any cached response and fetch a fresh one
 
     Returns:
         Search results with URLs, titles, and optionally content
@@ -87,35 +162,24 @@ async def exa_search(
     if validated.contents:
         payload["contents"] = {"text": {"maxCharacters": 2000}}
 
-    result = await http_request(
-        method="POST",
-        url=f"{EXA_API_URL}/search",
-        headers={
-            "x-api-key": api_key,
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=30.0,
-        retry_config=EXA_RETRY_CONFIG,
+    return await cached_call(
+        "exa.search",
+        validated,
+        lambda: _exa_post("search", payload, api_key, "search"),
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
     )
 
-    if "error" in result:
-        logger.error(f"Exa search failed: {result['error']}")
-        return {"error": result["error"], "detail": result.get("data")}
-
-    data = result["data"]
-    num_found = len(data.get("results", []))
-    logger.info(f"Exa search returned {num_found} results")
-
-    return data
-
 
+@single_flight("exa.find_similar")
 async def exa_find_similar(
     url: str,
     num_results: int = 10,
     include_domains: Optional[list[str]] = None,
     exclude_domains: Optional[list[str]] = None,
     contents: bool = True,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
 ) -> dict[str, Any]:
     """Find companies/pages similar to a given URL.
 
@@ -125,6 +189,8 @@ async def exa_find_similar(
         include_domains: Only include results from these domains
         exclude_domains: Exclude results from these domains
         contents: Include page contents in results
+        use_cache: Serve from / store in the on-disk response cache
+        refresh_cache: Ignore any cached response and fetch a fresh one
 
     Returns:
         Similar pages with URLs, titles, and optionally content
@@ -162,24 +228,10 @@ async def exa_find_similar(
     if validated.contents:
         payload["contents"] = {"text": {"maxCharacters": 2000}}
 
-    result = await http_request(
-        method="POST",
-        url=f"{EXA_API_URL}/findSimilar",
-        headers={
-            "x-api-key": api_key,
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=30.0,
-        retry_config=EXA_RETRY_CONFIG,
+    return await cached_call(
+        "exa.find_similar",
+        validated,
+        lambda: _exa_post("findSimilar", payload, api_key, "find similar"),
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
     )
-
-    if "error" in result:
-        logger.error(f"Exa find similar failed: {result['error']}")
-        return {"error": result["error"], "detail": result.get("data")}
-
-    data = result["data"]
-    num_found = len(data.get("results", []))
-    logger.info(f"Exa find similar returned {num_found} results")
-
-    return data
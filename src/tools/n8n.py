@@ -6,7 +6,14 @@ from typing import Any, Optional
 import httpx
 
 from ..logging_config import get_logger
-from ..utils import RetryConfig, http_request
+from ..utils import (
+    AdaptiveTimeoutConfig,
+    CircuitBreakerConfig,
+    RateLimitConfig,
+    RetryConfig,
+    http_request,
+    single_flight,
+)
 from ..models import N8nEnrichCompanyInput, N8nEnrichPersonInput, N8nTriggerWorkflowInput
 
 logger = get_logger("tools.n8n")
@@ -19,6 +26,15 @@ N8N_RETRY_CONFIG = RetryConfig(
     retryable_status_codes=(429, 500, 502, 503, 504),
 )
 
+# Shared by every webhook on the same n8n host, to avoid saturating workers
+N8N_RATE_LIMIT = RateLimitConfig(requests_per_second=2.0, burst=5)
+
+# Webhooks are slow to recover (workflow restarts), so trip early and wait longer
+N8N_CIRCUIT_BREAKER = CircuitBreakerConfig(failure_threshold=3, recovery_timeout=60.0)
+
+# Enrichment workflows can legitimately run for minutes; allow timeouts to grow
+N8N_TIMEOUTS = AdaptiveTimeoutConfig(floor=10.0, ceiling=180.0)
+
 
 async def _call_webhook(
     url: str,
@@ -30,7 +46,7 @@ async def _call_webhook(
     Args:
         url: Webhook URL
         data: Data payload to send
-        timeout: Request timeout in seconds
+        timeout: Initial request timeout in seconds (adapts to observed latency)
 
     Returns:
         Workflow response or error
@@ -44,16 +60,22 @@ async def _call_webhook(
         json=data,
         timeout=float(timeout),
         retry_config=N8N_RETRY_CONFIG,
+        rate_limit=N8N_RATE_LIMIT,
+        circuit_breaker=N8N_CIRCUIT_BREAKER,
+        adaptive_timeout=N8N_TIMEOUTS,
     )
 
     if "error" in result:
         logger.error(f"n8n webhook failed: {result['error']}")
+        if result.get("service_unavailable"):
+            return result
         return {"error": result["error"], "detail": result.get("data")}
 
     logger.info(f"n8n webhook succeeded (status {result['status_code']})")
     return result["data"]
 
 
+@single_flight("n8n.enrich_company")
 async def n8n_enrich_company(
     domain: str,
     company_name: Optional[str] = None,
@@ -93,6 +115,7 @@ async def n8n_enrich_company(
     return await _call_webhook(url, data)
 
 
+@single_flight("n8n.enrich_person")
 async def n8n_enrich_person(
     linkedin_url: Optional[str] = None,
     email: Optional[str] = None,
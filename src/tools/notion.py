@@ -1,14 +1,31 @@
 """Notion database integration - direct API calls for token efficiency."""
 
+import asyncio
 import os
 import re
-from typing import Any, Optional
-from urllib.parse import urlparse
-
-import httpx
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import quote, urlencode, urlparse
 
 from ..logging_config import get_logger
-from ..utils import RetryConfig, http_request
+from ..serialization import notion_property_value
+from ..utils import (
+    AdaptiveTimeoutConfig,
+    CircuitBreakerConfig,
+    HTTPPoolConfig,
+    RateLimitConfig,
+    RetryConfig,
+    http_request,
+    single_flight,
+)
+from .notion_mirror import NotionMirror, normalize_id
+from .notion_schema import NotionSchema, SchemaCache
+from .notion_snapshot import NotionSnapshot
+from .notion_users import NotionUserDirectory
+from .notion_write_buffer import WriteBehindBuffer
 
 logger = get_logger("tools.notion")
 
@@ -23,6 +40,66 @@ NOTION_RETRY_CONFIG = RetryConfig(
     retryable_status_codes=(429, 500, 502, 503, 504),
 )
 
+# Notion allows an average of ~3 requests/second per integration
+NOTION_RATE_LIMIT = RateLimitConfig(requests_per_second=3.0, burst=3)
+
+NOTION_CIRCUIT_BREAKER = CircuitBreakerConfig(failure_threshold=5, recovery_timeout=30.0)
+
+# Lookups normally return in a few hundred ms; let timeouts shrink accordingly
+NOTION_TIMEOUTS = AdaptiveTimeoutConfig(floor=2.0, ceiling=30.0)
+
+# Bulk syncs issue many concurrent requests; multiplex them when HTTP2_ENABLED
+NOTION_POOL_CONFIG = HTTPPoolConfig(http2=True)
+
+# Local database mirrors (see notion_mirror.py). Lookups sync a delta first
+# when the mirror is older than NOTION_MIRROR_MAX_STALENESS seconds
+# (0 disables mirroring); NOTION_MIRROR_DIR overrides where they persist.
+DEFAULT_MIRROR_DIR = Path(__file__).parent.parent.parent / "data" / "cache" / "notion"
+MIRROR_MAX_STALENESS = 60.0
+
+# Mirror per database, keyed by normalized database ID
+_mirrors: dict[str, NotionMirror] = {}
+
+# Page updates avoided by property diffing
+_write_stats = {
+    "writes_sent": 0,
+    "writes_skipped": 0,
+    "properties_sent": 0,
+    "properties_skipped": 0,
+    "writes_rejected": 0,
+}
+
+# Database schemas used to reject invalid writes before sending them. Cached
+# per process and persisted next to the mirrors for NOTION_SCHEMA_TTL seconds;
+# NOTION_SCHEMA_VALIDATION=0 turns validation off. They also map property
+# names to the IDs that filter_properties projections need
+# (NOTION_PROJECTION=0 always fetches every property).
+SCHEMA_TTL = 24 * 3600
+_schema_cache: Optional[SchemaCache] = None
+
+# Offline SQLite snapshot (notion_export_snapshot) at NOTION_SNAPSHOT_PATH.
+# Searches are answered from it while it is younger than
+# NOTION_SNAPSHOT_MAX_AGE seconds (0 disables it).
+SNAPSHOT_MAX_AGE = 3600.0
+EXPORT_BATCH_SIZE = 500
+_snapshot: Optional[NotionSnapshot] = None
+
+# Full scans of databases with at least this many pages (as last seen by the
+# mirror or snapshot) are split into NOTION_SCAN_PARTITIONS created_time
+# ranges paginated concurrently; 1 disables partitioning.
+SCAN_PARTITIONS = 4
+SCAN_PARTITION_MIN_PAGES = 1000
+# Workspace users, persisted next to the mirrors for NOTION_USERS_TTL seconds
+USERS_TTL = 24 * 3600
+_user_directory: Optional[NotionUserDirectory] = None
+
+# Results notion_search returns unless asked for more (None: all pages)
+SEARCH_LIMIT = 100
+
+# Write-behind buffer for page updates; inactive until start_write_behind()
+WRITE_BEHIND_WINDOW = 5.0
+_write_buffer: Optional[WriteBehindBuffer] = None
+
 
 def _normalize_domain(url: str) -> str:
     """Extract and normalize domain from URL for comparison.
@@ -76,6 +153,65 @@ def _get_url_variations(domain: str) -> list[str]:
     ]
 
 
+# Notion accepts at most 100 conditions in one compound filter
+MAX_FILTER_CLAUSES = 100
+
+
+def _website_clauses(domain: str, variations: bool = True) -> list[dict[str, Any]]:
+    """Website filter conditions matching ``domain``: every URL variation plus
+    a 'contains' fallback.
+
+    'contains' already matches all variations, so bulk lookups pass
+    ``variations=False`` to fit one condition per domain.
+    """
+    clauses = []
+    if variations:
+        clauses = [{"property": "Website", "url": {"equals": v}} for v in _get_url_variations(domain)]
+    clauses.append({"property": "Website", "url": {"contains": domain}})
+    return clauses
+
+
+def _rank_website_match(page: dict[str, Any], domain: str) -> Optional[tuple]:
+    """Sort key for a page matching ``domain``, or None if it does not match.
+
+    Exact URL variations rank first (in _get_url_variations order), then URLs
+    with the same normalized domain (e.g. with a path), then subdomains, then
+    any other URL containing the domain. Ties go to the oldest page.
+    """
+    website = page.get("properties", {}).get("Website")
+    url = (notion_property_value(website) or "") if website else ""
+    if domain not in url.lower():
+        return None
+
+    variations = _get_url_variations(domain)
+    if url in variations:
+        rank = variations.index(url)
+    elif _normalize_domain(url) == domain:
+        rank = len(variations)
+    elif _normalize_domain(url).endswith(f".{domain}"):
+        rank = len(variations) + 1
+    else:
+        rank = len(variations) + 2
+    return (rank, page.get("created_time", ""))
+
+
+def _best_website_match(pages: list[dict[str, Any]], domain: str) -> Optional[dict[str, Any]]:
+    ranked = [(key, page) for page in pages if (key := _rank_website_match(page, domain))]
+    return min(ranked, key=lambda item: item[0])[1] if ranked else None
+
+
+def _mirror_website_match(mirror: NotionMirror, domain: str) -> Optional[dict[str, Any]]:
+    """Best mirrored page for ``domain``, ranked like the live lookup.
+
+    The domain index answers pages with the same normalized domain; on a miss
+    the mirror is scanned for subdomains and other URLs containing the domain.
+    """
+    page = mirror.lookup("domain", domain)
+    if page is not None:
+        return page
+    return _best_website_match(mirror.query(lambda p: _rank_website_match(p, domain) is not None), domain)
+
+
 def _get_headers() -> dict[str, str]:
     """Get Notion API headers."""
     api_key = os.getenv("NOTION_API_KEY")
@@ -86,22 +222,668 @@ def _get_headers() -> dict[str, str]:
     }
 
 
+async def _notion_request(
+    method: str,
+    path: str,
+    payload: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """Call the Notion API through the shared, pooled HTTP client.
+
+    Args:
+        method: HTTP method
+        path: API path relative to NOTION_API_URL (e.g. "pages")
+        payload: JSON body
+
+    Returns:
+        http_request result dict ('status_code', 'data', optionally 'error')
+    """
+    return await http_request(
+        method=method,
+        url=f"{NOTION_API_URL}/{path}",
+        headers=_get_headers(),
+        json=payload,
+        timeout=30.0,
+        retry_config=NOTION_RETRY_CONFIG,
+        rate_limit=NOTION_RATE_LIMIT,
+        circuit_breaker=NOTION_CIRCUIT_BREAKER,
+        adaptive_timeout=NOTION_TIMEOUTS,
+        pool=NOTION_POOL_CONFIG,
+    )
+
+
+class NotionAPIError(Exception):
+    """A paginated Notion request failed; ``result`` holds the tool error dict."""
+
+    def __init__(self, result: dict[str, Any]):
+        super().__init__(result.get("error"))
+        self.result = result
+
+
+async def notion_iter_pages(
+    path: str,
+    payload: Optional[dict[str, Any]] = None,
+    page_size: int = 100,
+    limit: Optional[int] = None,
+    method: str = "POST",
+    properties: Optional[list[str]] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream every result of a paginated Notion query.
+
+    Follows ``next_cursor`` until ``has_more`` is false. The request for the
+    next batch is already in flight while the caller consumes the current one.
+    Stop early with ``limit`` or by leaving the loop; wrap the iterator in
+    ``contextlib.aclosing`` so an early stop cancels the prefetch immediately.
+
+    Args:
+        path: "databases/{id}/query", "search" or (with method="GET") "users"
+        payload: Request body (filter, sorts, query, ...)
+        page_size: Results per request (Notion allows up to 100)
+        limit: Stop after this many results
+        method: "GET" endpoints take the cursor as query parameters
+        properties: Property IDs to return (Notion's filter_properties, see
+            property_projection); every property when None
+
+    Yields:
+        Result objects (pages or databases)
+
+    Raises:
+        NotionAPIError: If a request fails
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    body: dict[str, Any] = {**(payload or {}), "page_size": min(page_size, limit or page_size)}
+
+    # Property IDs come percent-encoded from the API and are sent as they are
+    projection = "&".join(f"filter_properties={quote(p, safe='%')}" for p in properties or ())
+
+    def request() -> asyncio.Future:
+        if method == "GET":
+            query = "&".join(part for part in (urlencode(body), projection) if part)
+            return asyncio.ensure_future(_notion_request("GET", f"{path}?{query}"))
+        target = f"{path}?{projection}" if projection else path
+        return asyncio.ensure_future(_notion_request(method, target, dict(body)))
+
+    fetch: Optional[asyncio.Future] = request()
+    yielded = 0
+
+    try:
+        while fetch is not None:
+            result = await fetch
+            fetch = None
+            if "error" in result:
+                raise NotionAPIError(_api_error(result))
+
+            data = result["data"]
+            batch = data.get("results", [])
+            if data.get("has_more") and (limit is None or yielded + len(batch) < limit):
+                body["start_cursor"] = data.get("next_cursor")
+                fetch = request()
+
+            for item in batch:
+                yield item
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+    finally:
+        if fetch is not None:
+            fetch.cancel()
+
+
+_SCAN_DONE = object()
+
+
+def created_time_partitions(start: datetime, end: datetime, count: int) -> list[dict[str, Any]]:
+    """Disjoint filters splitting pages created in [start, end] into ``count`` ranges.
+
+    The first range is open towards the past and the last towards the
+    future, so pages outside [start, end] are still covered.
+    """
+    if count <= 1 or end <= start:
+        return []
+    step = (end - start) / count
+    bounds = [(start + step * i).isoformat() for i in range(1, count)]
+
+    def created(condition: str, bound: str) -> dict[str, Any]:
+        return {"timestamp": "created_time", "created_time": {condition: bound}}
+
+    partitions = [created("before", bounds[0])]
+    partitions += [
+        {"and": [created("on_or_after", low), created("before", high)]}
+        for low, high in zip(bounds, bounds[1:])
+    ]
+    partitions.append(created("on_or_after", bounds[-1]))
+    return partitions
+
+
+def option_partitions(prop: str, options: list[str], kind: str = "select") -> list[dict[str, Any]]:
+    """Disjoint filters with one partition per option of a select or status property.
+
+    Pages without a value, or with an option missing from ``options`` (a
+    stale schema), fall into two extra partitions.
+
+    Args:
+        prop: Property name, e.g. "ICP" or "Status"
+        options: Option names, e.g. from get_database_schema()
+        kind: "select" or "status"
+    """
+    if not options:
+        return []
+    partitions = [{"property": prop, kind: {"equals": option}} for option in options]
+    partitions.append({"property": prop, kind: {"is_empty": True}})
+    partitions.append({"and": [
+        {"property": prop, kind: {"is_not_empty": True}},
+        *({"property": prop, kind: {"does_not_equal": option}} for option in options),
+    ]})
+    return partitions
+
+
+async def notion_scan_database(
+    database_id: str,
+    payload: Optional[dict[str, Any]] = None,
+    partitions: Optional[list[dict[str, Any]]] = None,
+    concurrency: int = SCAN_PARTITIONS,
+    properties: Optional[list[str]] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream every page of a database, paginating disjoint partitions concurrently.
+
+    Each partition filter (see created_time_partitions and option_partitions)
+    is combined with the ``payload`` filter and paginated on its own cursor
+    chain, at most ``concurrency`` at a time; the shared rate limiter still
+    bounds the request rate. Pages arrive in no particular order and are
+    deduplicated by ID. Without ``partitions`` this is a plain sequential scan.
+    ``properties`` restricts the returned properties as in notion_iter_pages.
+
+    Raises:
+        NotionAPIError: If any partition fails
+    """
+    path = f"databases/{database_id}/query"
+    if not partitions or len(partitions) == 1:
+        payload = dict(payload or {})
+        if partitions:
+            base = payload.get("filter")
+            payload["filter"] = {"and": [base, partitions[0]]} if base else partitions[0]
+        async with aclosing(notion_iter_pages(path, payload, properties=properties)) as stream:
+            async for page in stream:
+                yield page
+        return
+
+    base = (payload or {}).get("filter")
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EXPORT_BATCH_SIZE)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def scan(partition: dict[str, Any]) -> None:
+        body = {**(payload or {}), "filter": {"and": [base, partition]} if base else partition}
+        async with semaphore:
+            async with aclosing(notion_iter_pages(path, body, properties=properties)) as stream:
+                async for page in stream:
+                    await queue.put(page)
+
+    async def scan_all() -> None:
+        try:
+            await asyncio.gather(*(scan(partition) for partition in partitions))
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_SCAN_DONE)
+
+    async def next_item() -> Any:
+        # Wait on the runner too, so a scan that dies without queueing its
+        # outcome (e.g. a cancelled partition) raises here instead of hanging
+        getter = asyncio.ensure_future(queue.get())
+        try:
+            await asyncio.wait((getter, runner), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if getter.done() and not getter.cancelled():
+            return getter.result()
+        if not queue.empty():
+            return queue.get_nowait()
+        if runner.cancelled():
+            raise RuntimeError(f"Partitioned scan of {database_id} was cancelled")
+        runner.result()
+        raise RuntimeError(f"Partitioned scan of {database_id} ended without a result")
+
+    runner = asyncio.ensure_future(scan_all())
+    seen: set[str] = set()
+    try:
+        while True:
+            item = await next_item()
+            if item is _SCAN_DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            key = normalize_id(item.get("id", ""))
+            if key in seen:
+                continue
+            seen.add(key)
+            yield item
+    finally:
+        runner.cancel()
+
+
+async def _scan_partitions(database_id: str, expected_pages: int) -> Optional[list[dict[str, Any]]]:
+    """created_time partitions for a full scan of a database this large, if worthwhile.
+
+    Ranges run from the oldest page's creation to now; if the oldest page
+    cannot be fetched the scan is simply not partitioned.
+    """
+    count = int(os.getenv("NOTION_SCAN_PARTITIONS", SCAN_PARTITIONS))
+    if count <= 1 or expected_pages < SCAN_PARTITION_MIN_PAGES:
+        return None
+    result = await _notion_request("POST", f"databases/{database_id}/query", {
+        "sorts": [{"timestamp": "created_time", "direction": "ascending"}],
+        "page_size": 1,
+    })
+    oldest = result.get("data", {}).get("results") if "error" not in result else None
+    if not oldest:
+        return None
+    start = datetime.fromisoformat(oldest[0]["created_time"].replace("Z", "+00:00"))
+    return created_time_partitions(start, datetime.now(timezone.utc), count) or None
+
+
+async def _query_all(
+    database_id: str,
+    payload: Optional[dict[str, Any]] = None,
+    properties: Optional[list[str]] = None,
+) -> list[dict[str, Any]] | dict[str, Any]:
+    """Query every page of a database (only ``properties`` IDs, if given).
+
+    Returns:
+        List of pages, or an error dict if any page of results failed
+    """
+    try:
+        path = f"databases/{database_id}/query"
+        return [page async for page in notion_iter_pages(path, payload, properties=properties)]
+    except NotionAPIError as e:
+        return e.result
+
+
+def _api_error(result: dict[str, Any]) -> dict[str, Any]:
+    """Convert a failed _notion_request result into the tool error shape."""
+    if result.get("service_unavailable"):
+        return result
+    return {
+        "error": f"Notion API error: {result['status_code'] or result['error']}",
+        "detail": result.get("data"),
+    }
+
+
+def _website_key(page: dict[str, Any]) -> str:
+    """Normalized domain of a Companies page's Website property."""
+    website = page.get("properties", {}).get("Website")
+    return _normalize_domain(notion_property_value(website) or "") if website else ""
+
+
+def get_mirror(database_id: str) -> NotionMirror:
+    """Get the local mirror of a database, with its lookup indexes registered."""
+    key = normalize_id(database_id)
+    mirror = _mirrors.get(key)
+    if mirror is None:
+        mirror_dir = Path(os.getenv("NOTION_MIRROR_DIR") or DEFAULT_MIRROR_DIR)
+        mirror = NotionMirror(
+            path=mirror_dir / f"{key}.sqlite3",
+            max_staleness=float(os.getenv("NOTION_MIRROR_MAX_STALENESS", MIRROR_MAX_STALENESS)),
+        )
+        mirror.add_index("domain", _website_key)
+        _mirrors[key] = mirror
+    return mirror
+
+
+def get_schema_cache() -> SchemaCache:
+    """Get the process-wide cache of database schemas."""
+    global _schema_cache
+    if _schema_cache is None:
+        _schema_cache = SchemaCache(
+            directory=Path(os.getenv("NOTION_MIRROR_DIR") or DEFAULT_MIRROR_DIR),
+            ttl=float(os.getenv("NOTION_SCHEMA_TTL", SCHEMA_TTL)),
+        )
+    return _schema_cache
+
+
+@single_flight("notion.database_schema")
+async def get_database_schema(database_id: str, refresh: bool = False) -> Optional[NotionSchema]:
+    """Schema of a database, fetched from the API only when not cached.
+
+    Returns:
+        The schema, or None if it could not be fetched
+    """
+    cache = get_schema_cache()
+    schema = None if refresh else cache.get(database_id)
+    if schema is None:
+        result = await _notion_request("GET", f"databases/{database_id}")
+        if "error" in result:
+            logger.warning(f"Could not fetch schema of database {database_id}: {_api_error(result)['error']}")
+            return None
+        schema = cache.put(database_id, result["data"])
+    return schema
+
+
+async def validate_properties(
+    database_id: Optional[str],
+    properties: dict[str, Any],
+) -> Optional[dict[str, Any]]:
+    """Check an outgoing payload against the database schema.
+
+    A schema read from the persisted cache may predate options added since,
+    so it is refetched once before a payload is rejected. Writes go through
+    unchecked when validation is off or the schema is unavailable.
+
+    Returns:
+        Tool error dict listing the problems, or None if the payload may be sent
+    """
+    if not database_id or os.getenv("NOTION_SCHEMA_VALIDATION", "1").lower() in ("0", "false", "no"):
+        return None
+
+    schema = await get_database_schema(database_id)
+    problems = schema.validate(properties) if schema else []
+    if problems and normalize_id(database_id) not in get_schema_cache().fetched:
+        schema = await get_database_schema(database_id, refresh=True)
+        problems = schema.validate(properties) if schema else []
+
+    if not problems:
+        return None
+    _write_stats["writes_rejected"] += 1
+    logger.warning(f"Rejected Notion write to {database_id}: {'; '.join(problems)}")
+    return {"error": "Invalid Notion properties", "detail": problems}
+
+
+async def property_projection(database_id: str, names: list[str]) -> Optional[list[str]]:
+    """Property IDs to request as filter_properties for the properties ``names``.
+
+    IDs come from the cached schema. Returns None, meaning "fetch every
+    property", when projection is disabled or any name has no known ID.
+    """
+    if os.getenv("NOTION_PROJECTION", "1") == "0" or not names:
+        return None
+    schema = await get_database_schema(database_id)
+    if schema is None:
+        return None
+    ids = [schema.properties.get(name, {}).get("id") for name in names]
+    return ids if all(ids) else None
+
+
+def get_user_directory() -> NotionUserDirectory:
+    """Get the workspace user directory shared by the tools and scripts."""
+    global _user_directory
+    if _user_directory is None:
+        _user_directory = NotionUserDirectory(
+            path=Path(os.getenv("NOTION_MIRROR_DIR") or DEFAULT_MIRROR_DIR) / "users.json",
+            ttl=float(os.getenv("NOTION_USERS_TTL", USERS_TTL)),
+        )
+    return _user_directory
+
+
+@single_flight("notion.sync_users")
+async def notion_sync_users() -> dict[str, Any]:
+    """List every workspace user into the user directory.
+
+    Returns:
+        {"users": count} or a tool error dict
+    """
+    try:
+        users = [user async for user in notion_iter_pages("users", method="GET")]
+    except NotionAPIError as e:
+        return e.result
+
+    directory = get_user_directory()
+    directory.replace(users)
+    logger.info(f"Listed {len(directory)} Notion users")
+    return {"users": len(directory)}
+
+
+async def notion_find_user(name: str) -> Optional[str]:
+    """Resolve a workspace user's name to their ID.
+
+    Served from the persisted directory while it is fresh. The directory is
+    relisted when stale, or once per process when ``name`` is missing from a
+    copy listed by an earlier process.
+
+    Returns:
+        User ID, or None if no user has that name
+    """
+    directory = get_user_directory()
+    if directory.is_fresh():
+        user_id = directory.lookup(name)
+        if user_id or directory.refreshed:
+            return user_id
+
+    result = await notion_sync_users()
+    if "error" in result:
+        logger.warning(f"Could not list Notion users: {result['error']}")
+    return directory.lookup(name)
+
+
+def _mirror_page(page: dict[str, Any]) -> None:
+    """Keep an already-synced mirror and the snapshot current after a page write."""
+    database_id = page.get("parent", {}).get("database_id")
+    mirror = _mirrors.get(normalize_id(database_id)) if database_id else None
+    if mirror is not None and mirror.synced_at is not None:
+        mirror.put(page)
+    snapshot = get_snapshot() if database_id else None
+    if snapshot is not None:
+        snapshot.put(page)
+
+
+def _snapshot_path() -> Path:
+    default = Path(os.getenv("NOTION_MIRROR_DIR") or DEFAULT_MIRROR_DIR) / "snapshot.sqlite3"
+    return Path(os.getenv("NOTION_SNAPSHOT_PATH") or default)
+
+
+def get_snapshot() -> Optional[NotionSnapshot]:
+    """The exported snapshot, or None if none has been exported yet."""
+    global _snapshot
+    path = _snapshot_path()
+    if _snapshot is not None and _snapshot.path != path:
+        _snapshot.close()
+        _snapshot = None
+    if _snapshot is None and path.exists():
+        _snapshot = NotionSnapshot(path)
+    return _snapshot
+
+
+def _expected_pages(database_id: str) -> int:
+    """Last known page count of a database, from its loaded mirror or the snapshot."""
+    mirror = _mirrors.get(normalize_id(database_id))
+    snapshot = get_snapshot()
+    return max(
+        len(mirror) if mirror is not None else 0,
+        snapshot.page_count(database_id) if snapshot is not None else 0,
+    )
+
+
+def _fresh_snapshot(database_id: str) -> Optional[tuple[NotionSnapshot, str]]:
+    """Snapshot and table holding ``database_id`` if exported recently enough."""
+    max_age = float(os.getenv("NOTION_SNAPSHOT_MAX_AGE", SNAPSHOT_MAX_AGE))
+    snapshot = get_snapshot() if max_age > 0 else None
+    table = snapshot.table_for(database_id) if snapshot else None
+    if table is None:
+        return None
+    age = snapshot.age(table)
+    return (snapshot, table) if age is not None and age < max_age else None
+
+
+async def notion_export_snapshot(
+    path: Optional[Path] = None,
+    databases: Optional[dict[str, str]] = None,
+) -> dict[str, Any]:
+    """Export databases into the offline SQLite snapshot.
+
+    Pages are streamed into a new file, which replaces the previous snapshot
+    only once every database exported successfully.
+
+    Args:
+        path: Snapshot file (defaults to NOTION_SNAPSHOT_PATH or the mirror directory)
+        databases: Table name -> database ID (defaults to 'companies' from
+            NOTION_DATABASE_ID and 'people' from NOTION_PEOPLE_DATABASE_ID)
+
+    Returns:
+        Dict with 'path', exported page counts per table and 'seconds', or an error
+    """
+    global _snapshot
+    if not os.getenv("NOTION_API_KEY"):
+        return {"error": "NOTION_API_KEY not configured"}
+
+    if databases is None:
+        databases = {
+            table: db_id for table, db_id in (
+                ("companies", os.getenv("NOTION_DATABASE_ID")),
+                ("people", os.getenv("NOTION_PEOPLE_DATABASE_ID")),
+            ) if db_id
+        }
+    if not databases:
+        return {"error": "NOTION_DATABASE_ID not configured"}
+
+    path = Path(path) if path else _snapshot_path()
+    partial = path.with_name(path.name + ".partial")
+    partial.unlink(missing_ok=True)
+    snapshot = NotionSnapshot(partial)
+    started = time.monotonic()
+
+    async def export(table: str, database_id: str) -> int:
+        snapshot.begin_table(table, database_id)
+        count, batch = 0, []
+        partitions = await _scan_partitions(database_id, _expected_pages(database_id))
+        async for page in notion_scan_database(database_id, partitions=partitions):
+            batch.append(page)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                snapshot.write_pages(table, batch)
+                count, batch = count + len(batch), []
+        snapshot.write_pages(table, batch)
+        snapshot.finish_table(table, count + len(batch))
+        return count + len(batch)
+
+    tasks = [asyncio.ensure_future(export(table, db_id)) for table, db_id in databases.items()]
+    exported = False
+    try:
+        counts = await asyncio.gather(*tasks)
+        exported = True
+    except NotionAPIError as e:
+        logger.warning(f"Notion snapshot export failed: {e.result.get('error')}")
+        return e.result
+    finally:
+        # Stop the other tables before their connection and file go away
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        snapshot.close()
+        if not exported:
+            partial.unlink(missing_ok=True)
+
+    if _snapshot is not None and _snapshot.path == path:
+        _snapshot.close()
+        _snapshot = None
+    os.replace(partial, path)
+
+    result = {
+        "path": str(path),
+        "tables": dict(zip(databases, counts)),
+        "seconds": round(time.monotonic() - started, 2),
+    }
+    logger.info(f"Exported Notion snapshot: {result['tables']} in {result['seconds']}s")
+    return result
+
+
+@single_flight("notion.sync_mirror")
+async def notion_sync_mirror(
+    database_id: Optional[str] = None,
+    full: bool = False,
+) -> dict[str, Any]:
+    """Bring the local mirror of a database up to date.
+
+    Only pages edited since the last checkpoint are fetched, unless this is
+    the first sync, a periodic full resync is due, or ``full`` is set.
+
+    Args:
+        database_id: Database to sync (defaults to NOTION_DATABASE_ID)
+        full: Force a full scan
+
+    Returns:
+        Dict with 'mode', 'fetched' pages and mirrored 'pages', or an error
+    """
+    if not os.getenv("NOTION_API_KEY"):
+        return {"error": "NOTION_API_KEY not configured"}
+
+    db_id = database_id or os.getenv("NOTION_DATABASE_ID")
+    if not db_id:
+        return {"error": "NOTION_DATABASE_ID not configured"}
+
+    mirror = get_mirror(db_id)
+    delta = None if full else mirror.delta_filter()
+
+    if delta:
+        pages = await _query_all(db_id, {"filter": delta})
+    else:
+        try:
+            partitions = await _scan_partitions(db_id, len(mirror))
+            pages = [page async for page in notion_scan_database(db_id, partitions=partitions)]
+        except NotionAPIError as e:
+            pages = e.result
+    if isinstance(pages, dict):
+        logger.warning(f"Notion mirror sync failed: {pages.get('error')}")
+        return pages
+
+    mirror.apply(pages, full=delta is None)
+    mode = "delta" if delta else "full"
+    logger.info(f"Notion mirror {mode} sync: {len(pages)} fetched, {len(mirror)} mirrored")
+    return {"mode": mode, "fetched": len(pages), "pages": len(mirror)}
+
+
+async def _fresh_mirror(database_id: str) -> Optional[NotionMirror]:
+    """Mirror of ``database_id`` within its staleness bound, syncing if needed.
+
+    Returns None when mirroring is disabled or the sync failed, in which case
+    callers query Notion directly.
+    """
+    mirror = get_mirror(database_id)
+    if mirror.max_staleness <= 0:
+        return None
+    if not mirror.is_fresh():
+        await notion_sync_mirror(database_id)
+    return mirror if mirror.is_fresh() else None
+
+
+def _matches(page: dict[str, Any], prop: str, value: str, exact: bool) -> bool:
+    """Local equivalent of a Notion text 'contains'/'equals' filter."""
+    field = page.get("properties", {}).get(prop)
+    if not field:
+        return False
+    actual = notion_property_value(field)
+    if isinstance(actual, list):
+        actual = " ".join(str(v) for v in actual)
+    actual = "" if actual is None else str(actual)
+    return actual == value if exact else value.lower() in actual.lower()
+
+
 async def notion_search(
     query: str,
     database_id: Optional[str] = None,
     filter_property: Optional[str] = None,
     filter_value: Optional[str] = None,
+    limit: Optional[int] = SEARCH_LIMIT,
+    properties: Optional[list[str]] = None,
 ) -> dict[str, Any]:
     """Search Notion for pages matching a query.
 
+    Database searches are answered from the offline snapshot (see
+    notion_export_snapshot) while it is fresh; there a query without
+    filter_property is a full-text search over name, description and
+    vertical. Next comes the local mirror (see notion_sync_mirror) within its
+    staleness bound. Otherwise result pages are collected with
+    notion_iter_pages up to ``limit``.
+
     Args:
         query: Search query
         database_id: Limit search to a specific database (optional)
         filter_property: Property name to filter by (optional)
         filter_value: Value to filter for (optional)
+        limit: Maximum number of results (default: SEARCH_LIMIT; None: all)
+        properties: Property names to fetch when querying a database live
+            (default: all; local results always carry every property)
 
     Returns:
-        Matching pages with their properties
+        Matching pages with their properties ('has_more' if cut by limit)
     """
     api_key = os.getenv("NOTION_API_KEY")
     if not api_key:
@@ -114,6 +896,31 @@ async def notion_search(
 
     # If we have a database ID, query that database
     if db_id:
+        fresh = _fresh_snapshot(db_id)
+        if fresh is not None:
+            snapshot, table = fresh
+            fetch = limit + 1 if limit else None
+            if query and filter_property:
+                pages = snapshot.filter(table, filter_property, query, limit=fetch)
+            elif filter_property and filter_value:
+                pages = snapshot.filter(table, filter_property, filter_value, exact=True, limit=fetch)
+            elif query:
+                pages = snapshot.search(table, query, limit=fetch)
+            else:
+                pages = snapshot.filter(table, limit=fetch)
+            return _page_list(pages, limit)
+
+        mirror = await _fresh_mirror(db_id)
+        if mirror is not None:
+            if query and filter_property:
+                pages = mirror.query(lambda p: _matches(p, filter_property, query, exact=False))
+            elif filter_property and filter_value:
+                pages = mirror.query(lambda p: _matches(p, filter_property, filter_value, exact=True))
+            else:
+                pages = mirror.query(lambda p: True)
+            return _page_list(pages, limit)
+
+        path = f"databases/{db_id}/query"
         payload: dict[str, Any] = {}
 
         # Add text filter if query provided
@@ -127,33 +934,35 @@ async def notion_search(
                 "property": filter_property,
                 "rich_text": {"equals": filter_value},
             }
+        projection = await property_projection(db_id, properties) if properties else None
+    else:
+        # Otherwise, do a global search
+        path = "search"
+        payload = {"query": query}
+        projection = None
+
+    # Fetch one extra result to know whether the limit cut anything off
+    pages = []
+    try:
+        stream = notion_iter_pages(path, payload, limit=limit + 1 if limit else None, properties=projection)
+        async with aclosing(stream):
+            async for page in stream:
+                pages.append(page)
+    except NotionAPIError as e:
+        return e.result
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{NOTION_API_URL}/databases/{db_id}/query",
-                json=payload,
-                headers=_get_headers(),
-                timeout=30.0,
-            )
-
-            if response.status_code != 200:
-                return {"error": f"Notion API error: {response.status_code}", "detail": response.text}
-
-            return response.json()
-
-    # Otherwise, do a global search
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{NOTION_API_URL}/search",
-            json={"query": query},
-            headers=_get_headers(),
-            timeout=30.0,
-        )
+    return _page_list(pages, limit)
 
-        if response.status_code != 200:
-            return {"error": f"Notion API error: {response.status_code}", "detail": response.text}
 
-        return response.json()
+def _page_list(pages: list[dict[str, Any]], limit: Optional[int]) -> dict[str, Any]:
+    """Notion list response for collected pages, cut to ``limit``."""
+    has_more = limit is not None and len(pages) > limit
+    return {
+        "object": "list",
+        "results": pages[:limit] if limit is not None else pages,
+        "has_more": has_more,
+        "next_cursor": None,
+    }
 
 
 async def notion_save_company(
@@ -198,78 +1007,96 @@ async def notion_save_company(
     logger.info(f"Saving company to Notion: {company_name} ({website})")
 
     # Build properties matching Blynt's Notion schema
-    properties: dict[str, Any] = {
-        "Company_Name": {"title": [{"text": {"content": company_name}}]},
-        "Website": {"url": website},
+    properties = _company_properties({
+        "company_name": company_name,
+        "website": website,
+        "linkedin_url": linkedin_url or None,
+        "vertical": vertical or None,
+        "icp": icp or None,
+        "product_description": product_description or None,
+        "asr_providers": asr_providers or None,
+        "ai_ml_engineers": ai_ml_engineers,
+        "country": country or None,
+    })
+
+    invalid = await validate_properties(db_id, properties)
+    if invalid:
+        return invalid
+
+    payload = {
+        "parent": {"database_id": db_id},
+        "properties": properties,
     }
 
-    if linkedin_url:
-        properties["Linkedin Link"] = {"url": linkedin_url}
+    result = await _notion_request("POST", "pages", payload)
+    if "error" in result:
+        return _api_error(result)
 
-    if vertical:
-        properties["Vertical"] = {"select": {"name": vertical}}
+    _mirror_page(result["data"])
+    return result["data"]
 
-    if icp:
-        properties["ICP"] = {"select": {"name": icp}}
 
-    if product_description:
-        properties["Product description"] = {
-            "rich_text": [{"text": {"content": product_description}}]
-        }
+def _comparable(prop: dict[str, Any]) -> Any:
+    """Property value normalized for comparison (empty values are equal, lists unordered)."""
+    value = notion_property_value(prop)
+    if isinstance(value, list):
+        return sorted(str(v) for v in value) or None
+    if value == "":
+        return None
+    return value
 
-    if asr_providers:
-        properties["ASR provider"] = {
-            "multi_select": [{"name": provider} for provider in asr_providers]
-        }
 
-    if ai_ml_engineers is not None:
-        properties["Nbr of AI/ML/Speech engineer"] = {"number": ai_ml_engineers}
+def diff_properties(properties: dict[str, Any], page: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """Outgoing properties whose values differ from ``page``.
 
-    if country:
-        properties["Main Office Country"] = {
-            "rich_text": [{"text": {"content": country}}]
-        }
+    Properties the page does not have are kept. An empty result means the
+    update is a no-op and the request can be skipped. Outcomes are counted in
+    get_notion_write_stats().
 
-    payload = {
-        "parent": {"database_id": db_id},
-        "properties": properties,
+    Args:
+        properties: Outgoing Notion property payload
+        page: Current page (lookup result or mirror copy)
+
+    Returns:
+        The changed subset of ``properties``
+    """
+    current = (page or {}).get("properties", {})
+    changed = {
+        name: prop for name, prop in properties.items()
+        if name not in current or _comparable(prop) != _comparable(current[name])
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{NOTION_API_URL}/pages",
-            json=payload,
-            headers=_get_headers(),
-            timeout=30.0,
-        )
+    _write_stats["properties_sent"] += len(changed)
+    _write_stats["properties_skipped"] += len(properties) - len(changed)
+    _write_stats["writes_sent" if changed else "writes_skipped"] += 1
+    return changed
 
-        if response.status_code not in (200, 201):
-            return {"error": f"Notion API error: {response.status_code}", "detail": response.text}
 
-        return response.json()
+def get_notion_write_stats() -> dict[str, int]:
+    """Counters of page updates and properties skipped by diffing."""
+    return dict(_write_stats)
 
 
-async def notion_update_company(
-    page_id: str,
-    updates: dict[str, Any],
-) -> dict[str, Any]:
-    """Update an existing company page in Notion.
+def _mirrored_page(page_id: str) -> Optional[dict[str, Any]]:
+    """Current copy of a page from any fresh mirror."""
+    for mirror in _mirrors.values():
+        if mirror.is_fresh():
+            page = mirror.get(page_id)
+            if page is not None:
+                return page
+    return None
 
-    Args:
-        page_id: Notion page ID to update
-        updates: Dictionary of property updates
 
-    Returns:
-        Updated page data
-    """
-    api_key = os.getenv("NOTION_API_KEY")
-    if not api_key:
-        return {"error": "NOTION_API_KEY not configured"}
+def _company_properties(fields: dict[str, Any]) -> dict[str, Any]:
+    """Convert company fields (company_name, website, icp, ...) to Notion properties.
 
-    # Convert updates to Notion property format
+    Unknown keys and None values are ignored.
+    """
     properties: dict[str, Any] = {}
 
-    for key, value in updates.items():
+    for key, value in fields.items():
+        if value is None:
+            continue
         if key == "company_name":
             properties["Company_Name"] = {"title": [{"text": {"content": value}}]}
         elif key == "website":
@@ -294,35 +1121,154 @@ async def notion_update_company(
             properties["Main Office Country"] = {
                 "rich_text": [{"text": {"content": value}}]
             }
+        elif key == "status":
+            properties["Status / Engagement"] = {"select": {"name": value}}
+
+    return properties
+
+
+async def notion_update_company(
+    page_id: str,
+    updates: dict[str, Any],
+    current: Optional[dict[str, Any]] = None,
+    wait: bool = False,
+    database_id: Optional[str] = None,
+) -> dict[str, Any]:
+    """Update an existing company page in Notion.
+
+    Only properties that differ from the current page are sent; if nothing
+    changed, no request is made and the current page is returned.
+
+    While the write-behind buffer is active (start_write_behind), the update
+    is merged with other pending updates of the page and a 'queued' receipt
+    is returned right away. If that update fails, it is reported when the
+    buffer is flushed (flush_notion_writes); pass wait=True to get the
+    outcome of this update instead.
+
+    Args:
+        page_id: Notion page ID to update
+        updates: Dictionary of property updates
+        current: Page data already in hand (defaults to the mirrored copy)
+        wait: With the buffer active, wait for the flush and return its result
+        database_id: Database whose schema validates the update (defaults to
+            the page's parent, then NOTION_DATABASE_ID)
+
+    Returns:
+        Updated page data, or a 'queued' receipt when buffered
+    """
+    api_key = os.getenv("NOTION_API_KEY")
+    if not api_key:
+        return {"error": "NOTION_API_KEY not configured"}
+
+    # Convert updates to Notion property format
+    properties = _company_properties(updates)
+
+    current = current or _mirrored_page(page_id)
+    database_id = (
+        database_id
+        or (current or {}).get("parent", {}).get("database_id")
+        or os.getenv("NOTION_DATABASE_ID")
+    )
+    invalid = await validate_properties(database_id, properties)
+    if invalid:
+        return invalid
+
+    buffer = _write_buffer
+    if buffer is not None:
+        future = buffer.enqueue(page_id, properties, detached=not wait)
+        if wait:
+            return await future
+        return {
+            "queued": True,
+            "page_id": page_id,
+            "properties": sorted(properties),
+            "flush_within_seconds": buffer.window,
+        }
+
+    return await _send_page_update(page_id, properties, current)
+
+
+async def _send_page_update(
+    page_id: str,
+    properties: dict[str, Any],
+    current: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """PATCH the properties that differ from the current page."""
+    current = current or _mirrored_page(page_id)
+    if current is not None:
+        properties = diff_properties(properties, current)
+        if not properties:
+            logger.info(f"Skipping no-op update of page {page_id}")
+            return current
 
     payload = {"properties": properties}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.patch(
-            f"{NOTION_API_URL}/pages/{page_id}",
-            json=payload,
-            headers=_get_headers(),
-            timeout=30.0,
-        )
+    result = await _notion_request("PATCH", f"pages/{page_id}", payload)
+    if "error" in result:
+        return _api_error(result)
 
-        if response.status_code != 200:
-            return {"error": f"Notion API error: {response.status_code}", "detail": response.text}
+    _mirror_page(result["data"])
+    return result["data"]
 
-        return response.json()
 
+def start_write_behind(window: float = WRITE_BEHIND_WINDOW) -> WriteBehindBuffer:
+    """Buffer notion_update_company calls from now on.
 
+    Updates to the same page within ``window`` seconds are merged into one
+    PATCH. Call flush_notion_writes() before the event loop ends.
+    """
+    global _write_buffer
+    if _write_buffer is None:
+        _write_buffer = WriteBehindBuffer(_send_page_update, window)
+    return _write_buffer
+
+
+async def flush_notion_writes() -> list[dict[str, Any]]:
+    """Send all buffered updates and stop buffering.
+
+    Returns:
+        Failed updates (page_id, properties, error) whose callers did not wait
+    """
+    global _write_buffer
+    buffer, _write_buffer = _write_buffer, None
+    if buffer is None:
+        return []
+
+    await buffer.flush()
+    failed = buffer.take_errors()
+    stats = buffer.stats()
+    logger.info(
+        f"Flushed Notion write buffer: {stats['updates']} updates in {stats['patches']} requests"
+    )
+    return failed
+
+
+@single_flight(
+    "notion.find_by_website",
+    key=lambda website, database_id=None, properties=None: [
+        _normalize_domain(website), database_id, properties,
+    ],
+)
 async def notion_find_by_website(
     website: str,
     database_id: Optional[str] = None,
+    properties: Optional[list[str]] = None,
 ) -> Optional[dict[str, Any]]:
     """Find a company by website URL (for duplicate checking).
 
     Uses domain normalization to match URLs regardless of format:
     - https://www.example.com == example.com == http://example.com/
 
+    Lookups are answered from the local mirror's domain index, synced first
+    when older than its staleness bound. If the sync fails, a single query ORs
+    every URL variation with a 'contains' fallback and the best hit is chosen
+    client-side.
+
     Args:
         website: Website URL to search for
         database_id: Database to search in
+        properties: Property names the caller needs; a live query fetches
+            only these and Website (mirrored pages are always complete)
 
     Returns:
         Page data if found, None otherwise
@@ -345,60 +1291,83 @@ async def notion_find_by_website(
 
     logger.debug(f"Checking for duplicate: {normalized_domain}")
 
-    # Try multiple URL variations
-    url_variations = _get_url_variations(normalized_domain)
+    mirror = await _fresh_mirror(db_id)
+    if mirror is not None:
+        return _mirror_website_match(mirror, normalized_domain)
 
-    async with httpx.AsyncClient() as client:
-        for url_variant in url_variations:
-            payload = {
-                "filter": {
-                    "property": "Website",
-                    "url": {"equals": url_variant},
-                }
-            }
+    payload = {"filter": {"or": _website_clauses(normalized_domain)}}
+    projection = await property_projection(db_id, [*properties, "Website"]) if properties else None
+    pages = await _query_all(db_id, payload, projection)
+    if isinstance(pages, dict):
+        logger.warning(f"Duplicate check failed for {normalized_domain}: {pages.get('error')}")
+        return None
 
-            response = await client.post(
-                f"{NOTION_API_URL}/databases/{db_id}/query",
-                json=payload,
-                headers=_get_headers(),
-                timeout=30.0,
-            )
+    match = _best_website_match(pages, normalized_domain)
+    if match:
+        logger.info(f"Found existing company for: {normalized_domain}")
+    else:
+        logger.debug(f"No existing company found for: {normalized_domain}")
+    return match
 
-            if response.status_code != 200:
-                continue
 
-            data = response.json()
-            results = data.get("results", [])
+async def notion_find_by_websites(
+    websites: list[str],
+    database_id: Optional[str] = None,
+    properties: Optional[list[str]] = None,
+) -> dict[str, Optional[dict[str, Any]]]:
+    """Find companies for many websites at once (bulk duplicate checking).
 
-            if results:
-                logger.info(f"Found existing company by URL variation: {url_variant}")
-                return results[0]
+    Served from the local mirror when possible. Otherwise domains are checked
+    in chunks, one compound query per MAX_FILTER_CLAUSES 'contains' conditions,
+    and each domain's best hit is chosen client-side.
 
-        # Also try "contains" search as fallback
-        logger.debug(f"Trying 'contains' fallback search for: {normalized_domain}")
-        payload = {
-            "filter": {
-                "property": "Website",
-                "url": {"contains": normalized_domain},
-            }
-        }
+    Args:
+        websites: Website URLs to look up
+        database_id: Database to search in
+        properties: Property names the caller needs (see notion_find_by_website)
 
-        response = await client.post(
-            f"{NOTION_API_URL}/databases/{db_id}/query",
-            json=payload,
-            headers=_get_headers(),
-            timeout=30.0,
-        )
+    Returns:
+        Mapping of each input website to its page data, None if not found,
+        or an error dict ('error', 'detail') if its lookup failed
+    """
+    found: dict[str, Optional[dict[str, Any]]] = {website: None for website in websites}
+    if not os.getenv("NOTION_API_KEY"):
+        logger.error("NOTION_API_KEY not configured")
+        return {website: {"error": "NOTION_API_KEY not configured"} for website in websites}
 
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get("results", [])
-            if results:
-                logger.info(f"Found existing company by contains search: {normalized_domain}")
-                return results[0]
+    db_id = database_id or os.getenv("NOTION_DATABASE_ID")
+    if not db_id:
+        logger.error("NOTION_DATABASE_ID not configured")
+        return {website: {"error": "NOTION_DATABASE_ID not configured"} for website in websites}
+
+    domains = {website: _normalize_domain(website) for website in websites}
+    unique = sorted({d for d in domains.values() if d})
+
+    mirror = await _fresh_mirror(db_id)
+    if mirror is not None:
+        matches = {domain: _mirror_website_match(mirror, domain) for domain in unique}
+    else:
+        chunks = [unique[i:i + MAX_FILTER_CLAUSES] for i in range(0, len(unique), MAX_FILTER_CLAUSES)]
+        projection = await property_projection(db_id, [*properties, "Website"]) if properties else None
+        results = await asyncio.gather(*(
+            _query_all(db_id, {"filter": {"or": [
+                clause for domain in chunk for clause in _website_clauses(domain, variations=False)
+            ]}}, projection)
+            for chunk in chunks
+        ))
+
+        matches = {}
+        for chunk, pages in zip(chunks, results):
+            if isinstance(pages, dict):
+                logger.warning(f"Bulk duplicate check failed for {len(chunk)} domains: {pages.get('error')}")
+                matches.update((domain, pages) for domain in chunk)
+                continue
+            for domain in chunk:
+                matches[domain] = _best_website_match(pages, domain)
 
-        logger.debug(f"No existing company found for: {normalized_domain}")
-        return None
+    for website, domain in domains.items():
+        found[website] = matches.get(domain)
+    return found
 
 
 async def notion_save_company_if_not_exists(
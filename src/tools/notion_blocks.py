@@ -0,0 +1,350 @@
+"""Markdown documents as Notion blocks, appended in resumable batches."""
+
+import asyncio
+import re
+from typing import Any, Optional
+
+from ..logging_config import get_logger
+from .notion import NotionAPIError, _api_error, _notion_request, notion_iter_pages
+
+logger = get_logger("tools.notion_blocks")
+
+# Notion API limits per rich_text element, rich_text array and append request
+MAX_TEXT_LENGTH = 2000
+MAX_RICH_TEXT_ITEMS = 100
+MAX_BLOCKS_PER_REQUEST = 100
+MAX_ELEMENTS_PER_REQUEST = 1000
+
+# Fenced code languages Notion knows; anything else is shown as plain text
+CODE_LANGUAGES = {
+    "bash", "c", "c++", "css", "go", "html", "java", "javascript", "json", "markdown",
+    "python", "ruby", "rust", "shell", "sql", "typescript", "xml", "yaml",
+}
+CODE_ALIASES = {
+    "sh": "shell", "js": "javascript", "ts": "typescript", "py": "python", "yml": "yaml", "md": "markdown",
+}
+
+_INLINE = re.compile(
+    r"\*\*(?P<bold>.+?)\*\*"
+    r"|`(?P<code>[^`]+)`"
+    r"|\[(?P<label>[^\]]+)\]\((?P<href>[^)\s]+)\)"
+    r"|(?<![\w*])\*(?P<star>[^*\s](?:[^*]*?[^*\s])?)\*(?![\w*])"
+    r"|(?<!\w)_(?P<under>[^_\s](?:[^_]*?[^_\s])?)_(?!\w)"
+)
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_DIVIDER = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_TODO = re.compile(r"^\s*[-*+]\s+\[([ xX])\]\s+(.*)$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+
+def _text(content: str, annotations: dict[str, bool], url: Optional[str] = None) -> list[dict[str, Any]]:
+    """Rich text elements for one run of text, split at MAX_TEXT_LENGTH."""
+    items = []
+    for start in range(0, len(content), MAX_TEXT_LENGTH):
+        text: dict[str, Any] = {"content": content[start:start + MAX_TEXT_LENGTH]}
+        if url:
+            text["link"] = {"url": url}
+        item: dict[str, Any] = {"type": "text", "text": text}
+        if annotations:
+            item["annotations"] = dict(annotations)
+        items.append(item)
+    return items
+
+
+def rich_text(markdown: str) -> list[dict[str, Any]]:
+    """Rich text for inline markdown: **bold**, *italic*, `code` and [links](url).
+
+    Only absolute http(s) links become links; in-page anchors keep their label.
+    """
+    items: list[dict[str, Any]] = []
+    position = 0
+    for match in _INLINE.finditer(markdown):
+        if match.start() > position:
+            items += _text(markdown[position:match.start()], {})
+        if match["bold"] is not None:
+            items += _text(match["bold"], {"bold": True})
+        elif match["code"] is not None:
+            items += _text(match["code"], {"code": True})
+        elif match["label"] is not None:
+            href = match["href"]
+            items += _text(match["label"], {}, href if href.startswith(("http://", "https://")) else None)
+        else:
+            items += _text(match["star"] or match["under"], {"italic": True})
+        position = match.end()
+    if position < len(markdown):
+        items += _text(markdown[position:], {})
+    return items
+
+
+def _blocks(kind: str, items: list[dict[str, Any]], **fields: Any) -> list[dict[str, Any]]:
+    """Blocks of ``kind`` holding ``items``, split when there are too many elements."""
+    chunks = [items[i:i + MAX_RICH_TEXT_ITEMS] for i in range(0, len(items), MAX_RICH_TEXT_ITEMS)] or [[]]
+    return [{"object": "block", "type": kind, kind: {"rich_text": chunk, **fields}} for chunk in chunks]
+
+
+def _code_block(lines: list[str], language: str) -> dict[str, Any]:
+    language = CODE_ALIASES.get(language, language)
+    return {
+        "object": "block",
+        "type": "code",
+        "code": {
+            "rich_text": _text("\n".join(lines), {}),
+            "language": language if language in CODE_LANGUAGES else "plain text",
+        },
+    }
+
+
+def _cells(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def _table_blocks(header: list[str], rows: list[list[str]]) -> list[dict[str, Any]]:
+    """Table blocks for a markdown table; long tables are split, repeating the header."""
+    width = len(header)
+
+    def row(cells: list[str]) -> dict[str, Any]:
+        cells = (cells + [""] * width)[:width]
+        return {"object": "block", "type": "table_row", "table_row": {"cells": [rich_text(c) for c in cells]}}
+
+    per_table = MAX_BLOCKS_PER_REQUEST - 1
+    chunks = [rows[i:i + per_table] for i in range(0, len(rows), per_table)] or [[]]
+    return [
+        {
+            "object": "block",
+            "type": "table",
+            "table": {
+                "table_width": width,
+                "has_column_header": True,
+                "has_row_header": False,
+                "children": [row(header), *(row(cells) for cells in chunk)],
+            },
+        }
+        for chunk in chunks
+    ]
+
+
+def markdown_to_blocks(markdown: str) -> list[dict[str, Any]]:
+    """Convert a markdown document to Notion blocks.
+
+    Supports headings (levels 4-6 become heading_3), paragraphs, bulleted,
+    numbered and task lists, quotes, fenced code, dividers and pipe tables.
+    Consecutive paragraph lines stay one block, separated by line breaks.
+    Nested list items are flattened.
+    """
+    blocks: list[dict[str, Any]] = []
+    paragraph: list[str] = []
+    lines = markdown.splitlines()
+
+    def flush() -> None:
+        if paragraph:
+            blocks.extend(_blocks("paragraph", rich_text("\n".join(paragraph))))
+            paragraph.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        if stripped.startswith("```"):
+            flush()
+            language = stripped[3:].strip().lower()
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith("```"):
+                code.append(lines[i])
+                i += 1
+            blocks.append(_code_block(code, language))
+        elif not stripped:
+            flush()
+        elif heading := _HEADING.match(stripped):
+            flush()
+            level = min(len(heading[1]), 3)
+            blocks.extend(_blocks(f"heading_{level}", rich_text(heading[2])))
+        elif _DIVIDER.match(stripped):
+            flush()
+            blocks.append({"object": "block", "type": "divider", "divider": {}})
+        elif stripped.startswith("|") and i + 1 < len(lines) and _TABLE_SEPARATOR.match(lines[i + 1]):
+            flush()
+            header = _cells(stripped)
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(_cells(lines[i]))
+                i += 1
+            blocks.extend(_table_blocks(header, rows))
+            continue
+        elif stripped.startswith(">"):
+            flush()
+            quote = []
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                quote.append(lines[i].strip()[1:].strip())
+                i += 1
+            blocks.extend(_blocks("quote", rich_text("\n".join(quote))))
+            continue
+        elif todo := _TODO.match(line):
+            flush()
+            blocks.extend(_blocks("to_do", rich_text(todo[2]), checked=todo[1] != " "))
+        elif bullet := _BULLET.match(line):
+            flush()
+            blocks.extend(_blocks("bulleted_list_item", rich_text(bullet[1])))
+        elif numbered := _NUMBERED.match(line):
+            flush()
+            blocks.extend(_blocks("numbered_list_item", rich_text(numbered[1])))
+        else:
+            paragraph.append(stripped)
+        i += 1
+
+    flush()
+    return blocks
+
+
+def _elements(block: dict[str, Any]) -> int:
+    """Blocks counted against MAX_ELEMENTS_PER_REQUEST, including nested children."""
+    return 1 + len(block.get(block["type"], {}).get("children", []))
+
+
+def batch_blocks(blocks: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Split blocks into append requests within Notion's per-request limits."""
+    batches: list[list[dict[str, Any]]] = []
+    batch: list[dict[str, Any]] = []
+    elements = 0
+    for block in blocks:
+        size = _elements(block)
+        if batch and (len(batch) >= MAX_BLOCKS_PER_REQUEST or elements + size > MAX_ELEMENTS_PER_REQUEST):
+            batches.append(batch)
+            batch, elements = [], 0
+        batch.append(block)
+        elements += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def block_key(block: dict[str, Any]) -> tuple:
+    """What identifies a block's content, for blocks we built and blocks read back."""
+    kind = block.get("type")
+    data = block.get(kind) or {}
+    if kind == "table":
+        return (kind, data.get("table_width"))
+    text = "".join(
+        item.get("plain_text") or item.get("text", {}).get("content", "")
+        for item in data.get("rich_text") or []
+    )
+    return (kind, text.strip())
+
+
+def _marker(title: str) -> dict[str, Any]:
+    """Callout that starts an uploaded document; uploads resume after it."""
+    return {
+        "object": "block",
+        "type": "callout",
+        "callout": {
+            "rich_text": _text(f"📊 Research report: {title}", {}),
+            "icon": {"type": "emoji", "emoji": "📊"},
+        },
+    }
+
+
+async def notion_append_markdown(
+    page_id: str,
+    markdown: str,
+    title: str,
+    replace: bool = False,
+) -> dict[str, Any]:
+    """Append a markdown document to a page, resuming an interrupted upload.
+
+    The document starts with a marker callout naming ``title``. Before
+    appending, the page's blocks after the last such marker are compared
+    with the converted document: blocks already there are skipped, so
+    running the upload again after a failure (or after it completed) never
+    duplicates blocks. If the page holds a different version of the
+    document, nothing is appended unless ``replace`` is set, in which case
+    the differing blocks after the marker are deleted first.
+
+    Returns:
+        Dict with 'page_id', document 'blocks', 'skipped' (already uploaded),
+        'appended', 'removed' and 'requests', or an error with 'appended'
+        so far
+    """
+    blocks = markdown_to_blocks(markdown)
+    marker = _marker(title)
+
+    try:
+        existing = [block async for block in notion_iter_pages(f"blocks/{page_id}/children", method="GET")]
+    except NotionAPIError as e:
+        return e.result
+
+    keys = [block_key(block) for block in existing]
+    marker_key = block_key(marker)
+    if marker_key in keys:
+        uploaded = existing[len(keys) - keys[::-1].index(marker_key):]
+        skipped = 0
+        while (
+            skipped < min(len(uploaded), len(blocks))
+            and block_key(uploaded[skipped]) == block_key(blocks[skipped])
+        ):
+            skipped += 1
+        # Blocks past a complete document may be the page's own; leave them
+        stale = uploaded[skipped:] if skipped < len(blocks) else []
+        pending = blocks[skipped:]
+    else:
+        skipped, stale, pending = 0, [], [marker, *blocks]
+
+    if stale and not replace:
+        return {
+            "error": "Page has a different version of this document",
+            "detail": {"page_id": page_id, "matching_blocks": skipped, "differing_blocks": len(stale)},
+        }
+
+    requests = 0
+    if stale:
+        results = await asyncio.gather(*(_notion_request("DELETE", f"blocks/{block['id']}") for block in stale))
+        requests += len(stale)
+        failed = next((result for result in results if "error" in result), None)
+        if failed is not None:
+            return {**_api_error(failed), "appended": 0}
+
+    appended = 0
+    for batch in batch_blocks(pending):
+        result = await _notion_request("PATCH", f"blocks/{page_id}/children", {"children": batch})
+        requests += 1
+        if "error" in result:
+            logger.warning(f"Upload of '{title}' to {page_id} stopped after {appended} blocks")
+            return {**_api_error(result), "appended": appended}
+        appended += sum(1 for block in batch if block is not marker)
+
+    logger.info(f"Uploaded '{title}' to {page_id}: {appended} appended, {skipped} already there")
+    return {
+        "page_id": page_id,
+        "blocks": len(blocks),
+        "skipped": skipped,
+        "appended": appended,
+        "removed": len(stale),
+        "requests": requests,
+    }
+
+
+async def notion_append_documents(
+    documents: list[dict[str, Any]],
+    replace: bool = False,
+) -> list[dict[str, Any]]:
+    """Upload several documents concurrently, one page each.
+
+    Args:
+        documents: {"page_id", "markdown", "title"} per page
+        replace: See notion_append_markdown
+
+    Returns:
+        notion_append_markdown results in input order
+    """
+    return await asyncio.gather(*(
+        notion_append_markdown(doc["page_id"], doc["markdown"], doc["title"], replace=replace)
+        for doc in documents
+    ))
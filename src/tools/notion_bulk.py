@@ -0,0 +1,196 @@
+"""Concurrent bulk upserts into the Notion Companies database."""
+
+import asyncio
+import os
+from typing import Any, Callable, Optional
+
+from ..logging_config import get_logger
+from .notion import (
+    _api_error,
+    _company_properties,
+    _mirror_page,
+    _normalize_domain,
+    _notion_request,
+    diff_properties,
+    notion_find_by_websites,
+    validate_properties,
+)
+
+logger = get_logger("tools.notion_bulk")
+
+# Requests in flight at once; the shared Notion rate limiter still applies
+DEFAULT_CONCURRENCY = 8
+
+# Batch file keys (as used by scripts/notion_contact_ops.py) -> company fields
+BATCH_FIELDS = {
+    "name": "company_name",
+    "linkedin": "linkedin_url",
+    "ai_engineers": "ai_ml_engineers",
+    "main_office_country": "country",
+}
+
+ProgressCallback = Callable[[int, int, dict[str, Any]], None]
+
+
+def _company_fields(company: dict[str, Any], creating: bool) -> dict[str, Any]:
+    """Company fields for one batch entry.
+
+    Mirrors NotionContactManager.create_or_update_company: ICP defaults to
+    "3", the website gets an https:// scheme, and the status is only set on
+    creation (default "Ice Box").
+    """
+    fields = {BATCH_FIELDS.get(key, key): value for key, value in company.items() if value is not None}
+    fields.pop("status", None)
+
+    website = fields.get("website", "")
+    fields["website"] = website if website.startswith("http") else f"https://{website}"
+    fields["icp"] = str(fields.get("icp", "3"))
+    if creating:
+        fields["status"] = company.get("status") or "Ice Box"
+    return fields
+
+
+async def notion_bulk_upsert_companies(
+    companies: list[dict[str, Any]],
+    database_id: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_progress: Optional[ProgressCallback] = None,
+) -> dict[str, Any]:
+    """Create or update many companies concurrently.
+
+    All domains are resolved up front with one bulk lookup (mirror or
+    compound queries). Creates and updates then run concurrently, limited by
+    ``concurrency`` and the Notion rate limiter. Entries the database schema
+    rejects, or whose duplicate check failed, fail without a request so a
+    failed lookup never creates a duplicate. Updates only send properties
+    that differ from the page found; entries with no changes count as
+    'updated' (marked 'unchanged') without a request. Entries sharing a domain are applied in
+    order so a batch never creates the same company twice.
+
+    Args:
+        companies: Batch entries ({"name", "website", "icp", ...})
+        database_id: Companies database (defaults to NOTION_DATABASE_ID)
+        concurrency: Maximum requests in flight
+        on_progress: Called as (done, total, result) after each entry
+
+    Returns:
+        Summary dict with 'success', 'total', 'created', 'updated', 'failed'
+        and per-entry 'results' in input order
+    """
+    db_id = database_id or os.getenv("NOTION_DATABASE_ID")
+    total = len(companies)
+    results: list[Optional[dict[str, Any]]] = [None] * total
+
+    if not os.getenv("NOTION_API_KEY") or not db_id:
+        error = "NOTION_API_KEY not configured" if db_id else "NOTION_DATABASE_ID not configured"
+        results = [{"company": c.get("name", "Unknown"), "action": "failed", "error": error} for c in companies]
+        return _summary(results)
+
+    existing = await notion_find_by_websites([c.get("website", "") for c in companies], db_id)
+    pages = {_normalize_domain(website): page for website, page in existing.items() if page}
+    lookup_errors = {domain: page for domain, page in pages.items() if "error" in page}
+
+    done = 0
+
+    def record(index: int, outcome: dict[str, Any]) -> None:
+        nonlocal done
+        results[index] = outcome
+        done += 1
+        if on_progress:
+            on_progress(done, total, outcome)
+
+    # Entries grouped by domain, each group applied sequentially
+    groups: dict[str, list[int]] = {}
+    for i, company in enumerate(companies):
+        domain = _normalize_domain(company.get("website", ""))
+        if domain:
+            groups.setdefault(domain, []).append(i)
+        else:
+            record(i, {"company": company.get("name", "Unknown"), "action": "failed", "error": "Missing website"})
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upsert(index: int, current: Optional[dict[str, Any]]) -> tuple[dict[str, Any], Optional[dict]]:
+        company = companies[index]
+        name = company.get("name", "Unknown")
+        page_id = current["id"] if current else None
+        properties = _company_properties(_company_fields(company, creating=current is None))
+
+        if current:
+            properties = diff_properties(properties, current)
+            if not properties:
+                return {
+                    "company": name,
+                    "action": "updated",
+                    "unchanged": True,
+                    "page_id": page_id,
+                    "url": f"https://notion.so/{page_id.replace('-', '')}",
+                }, current
+
+        invalid = await validate_properties(db_id, properties)
+        if invalid:
+            return {
+                "company": name,
+                "action": "failed",
+                "error": f"{invalid['error']}: {'; '.join(invalid['detail'])}",
+            }, current
+
+        async with semaphore:
+            if page_id:
+                result = await _notion_request("PATCH", f"pages/{page_id}", {"properties": properties})
+            else:
+                result = await _notion_request(
+                    "POST", "pages", {"parent": {"database_id": db_id}, "properties": properties}
+                )
+
+        if "error" in result:
+            error = _api_error(result)
+            return {"company": name, "action": "failed", "error": error.get("error")}, current
+
+        page = result["data"]
+        _mirror_page(page)
+        return {
+            "company": name,
+            "action": "updated" if page_id else "created",
+            "page_id": page["id"],
+            "url": f"https://notion.so/{page['id'].replace('-', '')}",
+        }, page
+
+    async def run_group(domain: str, indexes: list[int]) -> None:
+        if domain in lookup_errors:
+            error = lookup_errors[domain].get("error")
+            for index in indexes:
+                name = companies[index].get("name", "Unknown")
+                record(index, {"company": name, "action": "failed", "error": f"Duplicate check failed: {error}"})
+            return
+
+        current = pages.get(domain)
+        for index in indexes:
+            try:
+                outcome, current = await upsert(index, current)
+            except Exception as e:
+                outcome = {"company": companies[index].get("name", "Unknown"), "action": "failed", "error": str(e)}
+            record(index, outcome)
+
+    await asyncio.gather(*(run_group(domain, indexes) for domain, indexes in groups.items()))
+
+    summary = _summary(results)
+    unchanged = sum(bool(r.get("unchanged")) for r in results)
+    logger.info(
+        f"Bulk upsert: {summary['created']} created, {summary['updated']} updated "
+        f"({unchanged} unchanged), {summary['failed']} failed"
+    )
+    return summary
+
+
+def _summary(results: list[dict[str, Any]]) -> dict[str, Any]:
+    counts = {
+        action: sum(r["action"] == action for r in results)
+        for action in ("created", "updated", "failed")
+    }
+    return {
+        "success": counts["failed"] == 0,
+        "total": len(results),
+        **counts,
+        "results": results,
+    }
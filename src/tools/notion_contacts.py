@@ -0,0 +1,588 @@
+"""Async Notion People/Companies operations on the shared HTTP client."""
+
+import asyncio
+import os
+import re
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+from ..logging_config import get_logger
+from ..serialization import notion_property_value
+from .notion import (
+    _api_error,
+    _expected_pages,
+    _fresh_mirror,
+    _mirror_page,
+    _normalize_domain,
+    _notion_request,
+    _scan_partitions,
+    _website_key,
+    NotionAPIError,
+    notion_find_by_websites,
+    notion_find_user,
+    notion_iter_pages,
+    notion_scan_database,
+    notion_update_company,
+    property_projection,
+    validate_properties,
+)
+from .notion_bulk import ProgressCallback, notion_bulk_upsert_companies
+from .notion_mirror import NotionMirror, normalize_id
+
+logger = get_logger("tools.notion_contacts")
+
+
+def _page_url(page_id: str) -> str:
+    return f"https://notion.so/{page_id.replace('-', '')}"
+
+
+def _prop(page: dict[str, Any], name: str) -> Any:
+    prop = page.get("properties", {}).get(name)
+    return notion_property_value(prop) if prop else None
+
+
+# Properties read into AccountDirectory records, per database
+COMPANY_FIELDS = ["Company_Name", "Website", "ICP", "Status / Engagement"]
+CONTACT_FIELDS = ["Contact_Name", "Role", "Email", "LinkedIn URL", "Company name"]
+DUPLICATE_FIELDS = ["Contact_Name", "LinkedIn URL"]
+
+# LinkedIn path sections identifying a profile or organisation by slug
+LINKEDIN_SECTIONS = ("in", "pub", "company", "school", "showcase")
+
+
+def normalize_linkedin_url(url: str) -> str:
+    """Canonical key of a LinkedIn profile or company URL, e.g. "in/ada-lovelace".
+
+    Ignores scheme, www./locale/mobile subdomains, query strings, fragments,
+    trailing slashes, case and percent-encoding, so every form of the same
+    profile URL maps to one key. Returns "" for non-LinkedIn URLs.
+
+    Examples:
+        https://www.linkedin.com/in/Ada-Lovelace/ -> in/ada-lovelace
+        fr.linkedin.com/in/ada-lovelace?trk=x -> in/ada-lovelace
+        linkedin.com/company/krisp/about -> company/krisp
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if not re.match(r"^https?://", url, re.IGNORECASE):
+        url = f"https://{url}"
+
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().split(":")[0]
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return ""
+
+    parts = [unquote(part).lower() for part in parsed.path.split("/") if part]
+    if len(parts) >= 2 and parts[0] in LINKEDIN_SECTIONS:
+        return f"{parts[0]}/{parts[1]}"
+    return "/".join(parts)
+
+
+def _linkedin_key(page: dict[str, Any]) -> str:
+    """Normalized LinkedIn URL of a People page."""
+    return normalize_linkedin_url(_prop(page, "LinkedIn URL") or "")
+
+
+def _page_id_from_url(page_url: str) -> str:
+    """Page ID from a notion.so URL (or the ID itself), in dashed UUID form."""
+    if not page_url.startswith("http"):
+        return page_url
+    # Either a bare or dashed ID, or "Page-Title-<32 hex digits>"
+    page_id = page_url.rstrip("/").split("/")[-1].split("?")[0].replace("-", "")[-32:]
+    if len(page_id) == 32:
+        return f"{page_id[:8]}-{page_id[8:12]}-{page_id[12:16]}-{page_id[16:20]}-{page_id[20:]}"
+    return page_id
+
+
+class AccountDirectory:
+    """Companies joined with their contacts, resolved locally from two full loads.
+
+    People pages point at their company through the "Company name" relation;
+    each company record lists the contacts pointing at it, so an account view
+    needs no per-company query. Records are compact dicts of the fields the
+    agent and scripts use, not raw pages. Contacts whose relation is empty or
+    points outside the Companies database are kept in ``unlinked``.
+    """
+
+    def __init__(self, companies: list[dict[str, Any]], people: list[dict[str, Any]]):
+        # normalized company ID -> company record with its "contacts"
+        self.companies: dict[str, dict[str, Any]] = {}
+        self.unlinked: list[dict[str, Any]] = []
+        self._domains: dict[str, str] = {}
+
+        for page in companies:
+            key = normalize_id(page["id"])
+            domain = _website_key(page)
+            self.companies[key] = {
+                "page_id": page["id"],
+                "name": _prop(page, "Company_Name") or "Unknown",
+                "domain": domain,
+                "icp": _prop(page, "ICP"),
+                "status": _prop(page, "Status / Engagement"),
+                "url": _page_url(page["id"]),
+                "contacts": [],
+            }
+            if domain:
+                self._domains.setdefault(domain, key)
+
+        for page in people:
+            contact = {
+                "page_id": page["id"],
+                "name": _prop(page, "Contact_Name") or "Unknown",
+                "role": _prop(page, "Role") or "",
+                "email": _prop(page, "Email"),
+                "linkedin": _prop(page, "LinkedIn URL"),
+                "url": _page_url(page["id"]),
+            }
+            linked = False
+            for company_id in _prop(page, "Company name") or []:
+                company = self.companies.get(normalize_id(company_id))
+                if company is not None:
+                    company["contacts"].append(contact)
+                    linked = True
+            if not linked:
+                self.unlinked.append(contact)
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    def company(self, page_id: str) -> Optional[dict[str, Any]]:
+        """Company record by page ID or notion.so URL."""
+        return self.companies.get(normalize_id(_page_id_from_url(page_id)))
+
+    def company_by_domain(self, domain: str) -> Optional[dict[str, Any]]:
+        key = self._domains.get(_normalize_domain(domain))
+        return self.companies[key] if key else None
+
+    def contacts_without_email(self, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        """Contacts lacking an email, each with its company's name and domain."""
+        contacts = [
+            {**contact, "company": company["name"], "domain": company["domain"]}
+            for company in self.companies.values()
+            for contact in company["contacts"]
+            if not contact["email"]
+        ]
+        contacts += [
+            {**contact, "company": None, "domain": ""} for contact in self.unlinked if not contact["email"]
+        ]
+        # A contact linked to several companies is listed once
+        unique = list({contact["page_id"]: contact for contact in reversed(contacts)}.values())[::-1]
+        return unique[:limit] if limit is not None else unique
+
+
+class AsyncNotionContactManager:
+    """Contact and company operations for the People and Companies databases.
+
+    The async counterpart of scripts/notion_contact_ops.py's
+    NotionContactManager, with the same methods and result shapes. Requests
+    go through the pooled Notion client, so its rate limit, mirror, schema
+    validation and user directory are shared with the agent tools.
+    """
+
+    def __init__(self, people_db: Optional[str] = None, companies_db: Optional[str] = None):
+        self.people_db = people_db or os.getenv("NOTION_PEOPLE_DATABASE_ID")
+        self.companies_db = companies_db or os.getenv("NOTION_DATABASE_ID")
+
+    def _not_configured(self) -> Optional[dict[str, Any]]:
+        if not os.getenv("NOTION_API_KEY"):
+            return {"error": "NOTION_API_KEY not configured"}
+        if not self.people_db:
+            return {"error": "NOTION_PEOPLE_DATABASE_ID not configured"}
+        return None
+
+    async def _query_people(
+        self,
+        filter: dict[str, Any],
+        limit: int,
+        fields: Optional[list[str]] = None,
+    ) -> list[dict[str, Any]] | dict[str, Any]:
+        """People pages matching ``filter``, with only ``fields`` if given."""
+        projection = await property_projection(self.people_db, fields) if fields else None
+        path = f"databases/{self.people_db}/query"
+        try:
+            return [
+                page async for page in notion_iter_pages(
+                    path, {"filter": filter}, limit=limit, properties=projection
+                )
+            ]
+        except NotionAPIError as e:
+            return e.result
+
+    async def _load_pages(
+        self,
+        database_id: str,
+        fields: list[str],
+    ) -> list[dict[str, Any]] | dict[str, Any]:
+        """Every page of a database, from its mirror when fresh, else a full scan of ``fields``."""
+        mirror = await _fresh_mirror(database_id)
+        if mirror is not None:
+            return mirror.query(lambda page: True)
+        try:
+            partitions = await _scan_partitions(database_id, _expected_pages(database_id))
+            projection = await property_projection(database_id, fields)
+            return [
+                page async for page in notion_scan_database(
+                    database_id, partitions=partitions, properties=projection
+                )
+            ]
+        except NotionAPIError as e:
+            return e.result
+
+    async def prefetch_accounts(self) -> AccountDirectory | dict[str, Any]:
+        """Load Companies and People together and join contacts to their companies.
+
+        Both databases load concurrently (from the mirrors when enabled, so
+        usually one delta request each) instead of one People query per company.
+
+        Returns:
+            AccountDirectory, or an error dict
+        """
+        error = self._not_configured()
+        if error:
+            return error
+        if not self.companies_db:
+            return {"error": "NOTION_DATABASE_ID not configured"}
+
+        companies, people = await asyncio.gather(
+            self._load_pages(self.companies_db, COMPANY_FIELDS),
+            self._load_pages(self.people_db, CONTACT_FIELDS),
+        )
+        for pages in (companies, people):
+            if isinstance(pages, dict):
+                return pages
+        return AccountDirectory(companies, people)
+
+    async def get_account(self, domain: str) -> dict[str, Any]:
+        """A company and its known contacts, by website domain.
+
+        Returns:
+            {"found": bool, "company": {..., "contacts": [...]}}
+        """
+        accounts = await self.prefetch_accounts()
+        if isinstance(accounts, dict):
+            return accounts
+        company = accounts.company_by_domain(domain)
+        if company is None:
+            return {"found": False, "message": f"No company found with domain: {_normalize_domain(domain)}"}
+        return {"found": True, "company": company}
+
+    async def _people_mirror(self) -> Optional[NotionMirror]:
+        """Fresh People mirror with its LinkedIn index, or None to query live."""
+        mirror = await _fresh_mirror(self.people_db)
+        if mirror is not None and not mirror.has_index("linkedin"):
+            mirror.add_index("linkedin", _linkedin_key)
+        return mirror
+
+    async def check_duplicate_by_linkedin(self, linkedin_url: str) -> dict[str, Any]:
+        """Check if a contact exists by LinkedIn URL.
+
+        URLs are compared by normalize_linkedin_url, so trailing slashes,
+        www./locale subdomains and query strings do not cause misses. Served
+        from the People mirror's LinkedIn index when mirroring is enabled.
+
+        Returns:
+            {"exists": bool, "page_id": str|None, "name": str|None}
+        """
+        error = self._not_configured()
+        if error:
+            return error
+
+        key = normalize_linkedin_url(linkedin_url)
+        mirror = await self._people_mirror()
+        if mirror is not None and key:
+            return self._duplicate(mirror.lookup("linkedin", key))
+
+        if key:
+            # Match every form of the URL, then compare canonical keys locally
+            query = {"property": "LinkedIn URL", "url": {"contains": key.split("/", 1)[-1]}}
+            pages = await self._query_people(query, limit=100, fields=DUPLICATE_FIELDS)
+        else:
+            pages = await self._query_people(
+                {"property": "LinkedIn URL", "url": {"equals": linkedin_url}},
+                limit=1,
+                fields=DUPLICATE_FIELDS,
+            )
+        if isinstance(pages, dict):
+            return pages
+        if key:
+            pages = [page for page in pages if _linkedin_key(page) == key]
+        return self._duplicate(pages[0] if pages else None)
+
+    async def check_duplicates_by_linkedin(self, linkedin_urls: list[str]) -> dict[str, dict[str, Any]]:
+        """Check many LinkedIn URLs, e.g. before a bulk contact import.
+
+        With the People mirror available this makes at most one (delta sync)
+        request for the whole list; otherwise URLs are checked concurrently.
+
+        Returns:
+            {url: check_duplicate_by_linkedin result} for each input URL
+        """
+        error = self._not_configured()
+        if error:
+            return {url: error for url in linkedin_urls}
+
+        mirror = await self._people_mirror()
+        if mirror is not None:
+            return {
+                url: self._duplicate(mirror.lookup("linkedin", key)) if (key := normalize_linkedin_url(url))
+                else {"exists": False, "page_id": None, "name": None}
+                for url in linkedin_urls
+            }
+
+        unique = list(dict.fromkeys(linkedin_urls))
+        results = await asyncio.gather(*(self.check_duplicate_by_linkedin(url) for url in unique))
+        return dict(zip(unique, results))
+
+    @staticmethod
+    def _duplicate(page: Optional[dict[str, Any]]) -> dict[str, Any]:
+        if page is None:
+            return {"exists": False, "page_id": None, "name": None}
+        return {
+            "exists": True,
+            "page_id": page["id"],
+            "name": _prop(page, "Contact_Name") or "Unknown",
+            "url": _page_url(page["id"]),
+        }
+
+    async def get_company_by_domain(self, domain: str) -> dict[str, Any]:
+        """Get a company by website domain (mirror first, then a live query).
+
+        Returns:
+            {"found": bool, "page_id": str, "icp": str, "name": str, ...},
+            or an error dict if the lookup failed
+        """
+        found = await notion_find_by_websites([domain], self.companies_db, properties=["Company_Name", "ICP"])
+        page = found[domain]
+        if page is not None and "error" in page:
+            return page
+        if page is None:
+            return {"found": False, "message": f"No company found with domain: {_normalize_domain(domain)}"}
+
+        return {
+            "found": True,
+            "page_id": page["id"],
+            "page_url": _page_url(page["id"]),
+            "icp": _prop(page, "ICP") or "N/A",
+            "name": _prop(page, "Company_Name") or "Unknown",
+            "domain": _prop(page, "Website") or "",
+        }
+
+    async def get_user_id(self, name: str) -> Optional[str]:
+        """Get a workspace user's ID by name (from the user directory)."""
+        return await notion_find_user(name)
+
+    async def create_or_update_company(
+        self,
+        company_name: str,
+        website: str,
+        linkedin: Optional[str] = None,
+        vertical: Optional[str] = None,
+        icp: str = "3",
+        product_description: Optional[str] = None,
+        asr_providers: Optional[list[str]] = None,
+        ai_engineers: Optional[int] = None,
+        main_office_country: Optional[str] = None,
+        status: str = "Ice Box",
+    ) -> dict[str, Any]:
+        """Create or update a company in the Companies database.
+
+        Only changed properties are sent; nothing is written if the page
+        already matches. The status is only set when creating.
+
+        Returns:
+            {"success": bool, "page_id": str, "url": str,
+             "action": "created"|"updated", "unchanged": bool}
+        """
+        summary = await notion_bulk_upsert_companies(
+            [{
+                "name": company_name,
+                "website": website,
+                "linkedin": linkedin or None,
+                "vertical": vertical or None,
+                "icp": icp,
+                "product_description": product_description or None,
+                "asr_providers": asr_providers or None,
+                "ai_engineers": ai_engineers,
+                "main_office_country": main_office_country or None,
+                "status": status,
+            }],
+            database_id=self.companies_db,
+        )
+        outcome = summary["results"][0]
+        if outcome["action"] == "failed":
+            return {"error": outcome.get("error"), "success": False}
+
+        return {
+            "success": True,
+            "page_id": outcome["page_id"],
+            "url": outcome["url"],
+            "action": outcome["action"],
+            "unchanged": outcome.get("unchanged", False),
+            "company_name": company_name,
+        }
+
+    async def update_company_icp(self, company_id: str, icp: str) -> dict[str, Any]:
+        """Update a company's ICP.
+
+        Returns:
+            {"success": bool, "page_id": str, "icp": str}
+        """
+        result = await notion_update_company(
+            company_id, {"icp": str(icp)}, wait=True, database_id=self.companies_db
+        )
+        if "error" in result:
+            return {**result, "success": False}
+
+        return {"success": True, "page_id": company_id, "icp": icp, "url": _page_url(company_id)}
+
+    async def search_contacts_by_name(self, name: str) -> dict[str, Any]:
+        """Search contacts whose name contains ``name``.
+
+        Returns:
+            {"found": bool, "count": int, "contacts": [...]}
+        """
+        error = self._not_configured()
+        if error:
+            return error
+
+        pages = await self._query_people(
+            {"property": "Contact_Name", "title": {"contains": name}},
+            limit=20,
+            fields=["Contact_Name", "Email", "Role"],
+        )
+        if isinstance(pages, dict):
+            return pages
+
+        contacts = [
+            {
+                "page_id": page["id"],
+                "name": _prop(page, "Contact_Name") or "Unknown",
+                "email": _prop(page, "Email"),
+                "role": _prop(page, "Role") or "",
+                "url": _page_url(page["id"]),
+            }
+            for page in pages
+        ]
+        return {"found": bool(contacts), "count": len(contacts), "contacts": contacts}
+
+    async def get_contacts_without_email(
+        self,
+        limit: int = 50,
+        accounts: Optional[AccountDirectory] = None,
+    ) -> dict[str, Any]:
+        """Contacts without an email address, with their company's name and domain.
+
+        Served from ``accounts`` or a fresh prefetch_accounts(), so finding
+        emails needs no further company lookups.
+
+        Returns:
+            {"count": int, "contacts": [...]}
+        """
+        if accounts is None:
+            accounts = await self.prefetch_accounts()
+            if isinstance(accounts, dict):
+                return accounts
+
+        contacts = accounts.contacts_without_email(limit)
+        return {"count": len(contacts), "contacts": contacts}
+
+    async def update_contact_email(
+        self,
+        contact_id: str,
+        email: str,
+        source: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Update a contact's email address.
+
+        Returns:
+            {"success": bool, "page_id": str, "email": str}
+        """
+        error = self._not_configured()
+        if error:
+            return {**error, "success": False}
+
+        properties = {"Email": {"email": email}}
+        invalid = await validate_properties(self.people_db, properties)
+        if invalid:
+            return {**invalid, "success": False}
+
+        result = await _notion_request("PATCH", f"pages/{contact_id}", {"properties": properties})
+        if "error" in result:
+            return {**_api_error(result), "success": False}
+
+        return {
+            "success": True,
+            "page_id": contact_id,
+            "email": email,
+            "source": source,
+            "url": _page_url(contact_id),
+        }
+
+    async def batch_create_or_update_companies(
+        self,
+        companies_data: list[dict[str, Any]],
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> dict[str, Any]:
+        """Create or update many companies concurrently (see notion_bulk_upsert_companies)."""
+        return await notion_bulk_upsert_companies(
+            companies_data,
+            database_id=self.companies_db,
+            on_progress=on_progress,
+        )
+
+    async def add_contact(
+        self,
+        name: str,
+        role: str,
+        company_page_url: str,
+        linkedin_url: str,
+        email: Optional[str] = None,
+        decision_level: str = "Decision Maker",
+        campaign: Optional[str] = None,
+        owner: str = "Benjamin Lalanne",
+    ) -> dict[str, Any]:
+        """Add a contact to the People database, linked to its company.
+
+        Returns:
+            {"success": bool, "page_id": str, "url": str}
+        """
+        error = self._not_configured()
+        if error:
+            return {**error, "success": False}
+
+        owner_id = await notion_find_user(owner)
+        if not owner_id:
+            return {"error": f"Could not find user: {owner}"}
+
+        properties: dict[str, Any] = {
+            "Contact_Name": {"title": [{"text": {"content": name}}]},
+            "Role": {"rich_text": [{"text": {"content": role}}]},
+            "Company name": {"relation": [{"id": _page_id_from_url(company_page_url)}]},
+            "LinkedIn URL": {"url": linkedin_url},
+            "Decision_Level": {"multi_select": [{"name": decision_level}]},
+            "Type": {"multi_select": [{"name": "Customer"}]},
+            "Status Contact": {"select": {"name": "🥶 Ice Box"}},
+            "Source of contacts": {"select": {"name": "Outreach"}},
+            "Owner / Assigned To": {"people": [{"id": owner_id}]},
+        }
+        if email:
+            properties["Email"] = {"email": email}
+        if campaign:
+            properties["Campaign"] = {"multi_select": [{"name": campaign}]}
+
+        invalid = await validate_properties(self.people_db, properties)
+        if invalid:
+            return {**invalid, "success": False}
+
+        result = await _notion_request(
+            "POST", "pages", {"parent": {"database_id": self.people_db}, "properties": properties}
+        )
+        if "error" in result:
+            return {**_api_error(result), "success": False}
+
+        # Keep the People mirror's LinkedIn index current for later checks
+        _mirror_page(result["data"])
+        page_id = result["data"]["id"]
+        logger.info(f"Added contact {name} ({page_id})")
+        return {"success": True, "page_id": page_id, "url": _page_url(page_id), "name": name, "role": role}
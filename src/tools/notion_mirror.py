@@ -0,0 +1,256 @@
+"""Local mirror of Notion databases, kept current with last_edited_time deltas."""
+
+import copy
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from ..logging_config import get_logger
+
+logger = get_logger("tools.notion_mirror")
+
+
+def normalize_id(notion_id: str) -> str:
+    """Notion IDs appear with and without dashes; compare them without."""
+    return (notion_id or "").replace("-", "").lower()
+
+
+class NotionMirror:
+    """Local copy of one database's pages with secondary key indexes.
+
+    A sync either scans the whole database (``full=True``) or only fetches
+    pages whose ``last_edited_time`` is on or after the checkpoint, i.e. the
+    newest edit seen so far. Deltas cannot see archived pages, so a full scan
+    is due again every ``full_resync_interval`` seconds. Lookups are served
+    locally as long as the last sync is younger than ``max_staleness``.
+
+    With ``path`` set, pages and checkpoints are persisted to SQLite and the
+    next process resumes from the stored checkpoint.
+
+    Secondary indexes (``add_index``) map a derived key to page IDs. When
+    several pages share a key, the earliest created one wins.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_staleness: float = 60.0,
+        full_resync_interval: float = 24 * 3600,
+    ):
+        self.path = Path(path) if path else None
+        self.max_staleness = max_staleness
+        self.full_resync_interval = full_resync_interval
+
+        self.checkpoint: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.full_synced_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+        self._pages: dict[str, dict[str, Any]] = {}
+        self._indexes: dict[str, tuple[Callable[[dict[str, Any]], str], dict[str, set[str]]]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if self.path:
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    # Sync state
+
+    def is_fresh(self) -> bool:
+        """Whether lookups may be served without syncing first."""
+        return self.synced_at is not None and time.time() - self.synced_at < self.max_staleness
+
+    def needs_full_sync(self) -> bool:
+        return (
+            self.checkpoint is None
+            or self.full_synced_at is None
+            or time.time() - self.full_synced_at >= self.full_resync_interval
+        )
+
+    def invalidate(self) -> None:
+        """Force the next lookup to sync."""
+        self.synced_at = None
+
+    def delta_filter(self) -> Optional[dict[str, Any]]:
+        """Database query filter for the next sync, or None for a full scan."""
+        if self.needs_full_sync():
+            return None
+        # last_edited_time has minute precision, so re-fetch the checkpoint minute
+        return {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": self.checkpoint}}
+
+    def apply(self, pages: list[dict[str, Any]], full: bool) -> None:
+        """Merge synced pages and advance the checkpoint.
+
+        A full scan replaces the mirror, dropping pages that no longer exist.
+        """
+        now = time.time()
+        with self._lock:
+            if full:
+                self._pages.clear()
+                for _, keys in self._indexes.values():
+                    keys.clear()
+
+            for page in pages:
+                self._put(page)
+                edited = page.get("last_edited_time")
+                if edited and (self.checkpoint is None or edited > self.checkpoint):
+                    self.checkpoint = edited
+
+            self.synced_at = now
+            if full:
+                self.full_synced_at = now
+            self._persist(pages if not full else list(self._pages.values()), full)
+
+    # Local reads and writes
+
+    def add_index(self, name: str, key_func: Callable[[dict[str, Any]], str]) -> None:
+        """Register a secondary index, built from the pages already mirrored."""
+        with self._lock:
+            keys: dict[str, set[str]] = {}
+            self._indexes[name] = (key_func, keys)
+            for page_id, page in self._pages.items():
+                key = key_func(page)
+                if key:
+                    keys.setdefault(key, set()).add(page_id)
+
+    def has_index(self, name: str) -> bool:
+        return name in self._indexes
+
+    def lookup(self, index: str, key: str) -> Optional[dict[str, Any]]:
+        """Page stored under ``key`` in a secondary index, if any."""
+        with self._lock:
+            ids = self._indexes[index][1].get(key) if key else None
+            if not ids:
+                self.misses += 1
+                return None
+            self.hits += 1
+            page = min((self._pages[i] for i in ids), key=lambda p: p.get("created_time", ""))
+            return copy.deepcopy(page)
+
+    def get(self, page_id: str) -> Optional[dict[str, Any]]:
+        page = self._pages.get(normalize_id(page_id))
+        return copy.deepcopy(page) if page else None
+
+    def query(self, predicate: Callable[[dict[str, Any]], bool]) -> list[dict[str, Any]]:
+        """Pages matching ``predicate``, oldest first."""
+        with self._lock:
+            pages = [p for p in self._pages.values() if predicate(p)]
+        pages.sort(key=lambda p: p.get("created_time", ""))
+        return copy.deepcopy(pages)
+
+    def put(self, page: dict[str, Any]) -> None:
+        """Record a page after a local write (the checkpoint is not advanced)."""
+        with self._lock:
+            self._put(page)
+            self._persist([page], full=False)
+
+    def remove(self, page_id: str) -> None:
+        with self._lock:
+            self._remove(normalize_id(page_id))
+            self._persist([], full=False, removed=[normalize_id(page_id)])
+
+    def stats(self) -> dict[str, Any]:
+        """Size, freshness and hit/miss counters."""
+        return {
+            "pages": len(self._pages),
+            "checkpoint": self.checkpoint,
+            "age_seconds": round(time.time() - self.synced_at, 1) if self.synced_at else None,
+            "fresh": self.is_fresh(),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _put(self, page: dict[str, Any]) -> None:
+        page_id = normalize_id(page.get("id", ""))
+        self._remove(page_id)
+        if page.get("archived") or page.get("in_trash"):
+            return
+
+        self._pages[page_id] = page
+        for key_func, keys in self._indexes.values():
+            key = key_func(page)
+            if key:
+                keys.setdefault(key, set()).add(page_id)
+
+    def _remove(self, page_id: str) -> None:
+        page = self._pages.pop(page_id, None)
+        if page is None:
+            return
+        for key_func, keys in self._indexes.values():
+            key = key_func(page)
+            ids = keys.get(key)
+            if ids:
+                ids.discard(page_id)
+                if not ids:
+                    del keys[key]
+
+    # Persistence
+
+    def _open(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS pages (id TEXT PRIMARY KEY, data BLOB NOT NULL);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                """
+            )
+            for (blob,) in self._conn.execute("SELECT data FROM pages"):
+                self._put(json.loads(zlib.decompress(blob)))
+            meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error as e:
+            logger.warning(f"Notion mirror at {self.path} unavailable, keeping it in memory: {e}")
+            self._conn = None
+            return
+
+        self.checkpoint = meta.get("checkpoint")
+        self.synced_at = float(meta["synced_at"]) if meta.get("synced_at") else None
+        self.full_synced_at = float(meta["full_synced_at"]) if meta.get("full_synced_at") else None
+
+    def _persist(
+        self,
+        pages: list[dict[str, Any]],
+        full: bool,
+        removed: Optional[list[str]] = None,
+    ) -> None:
+        if self._conn is None:
+            return
+
+        try:
+            if full:
+                self._conn.execute("DELETE FROM pages")
+            for page in pages:
+                page_id = normalize_id(page.get("id", ""))
+                if page_id in self._pages:
+                    blob = zlib.compress(json.dumps(page).encode())
+                    self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?)", (page_id, blob))
+                else:
+                    self._conn.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+            for page_id in removed or []:
+                self._conn.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                [
+                    ("checkpoint", self.checkpoint),
+                    ("synced_at", str(self.synced_at) if self.synced_at else None),
+                    ("full_synced_at", str(self.full_synced_at) if self.full_synced_at else None),
+                ],
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not persist Notion mirror to {self.path}: {e}")
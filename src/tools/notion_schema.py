@@ -0,0 +1,147 @@
+"""Cached Notion database schemas for validating writes locally."""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..logging_config import get_logger
+from .notion_mirror import normalize_id
+
+logger = get_logger("tools.notion_schema")
+
+# Property types whose values must be one of the configured options
+OPTION_TYPES = ("select", "multi_select", "status")
+
+# Read-only property types that cannot be written
+COMPUTED_TYPES = (
+    "formula", "rollup", "created_time", "created_by",
+    "last_edited_time", "last_edited_by", "unique_id", "verification",
+)
+
+
+class NotionSchema:
+    """Property types and select options of one database."""
+
+    def __init__(self, properties: dict[str, dict[str, Any]], fetched_at: Optional[float] = None):
+        # name -> {"id": str, "type": str, "options": [str] | None}
+        self.properties = properties
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @classmethod
+    def from_database(cls, data: dict[str, Any]) -> "NotionSchema":
+        """Build from a ``databases/{id}`` response."""
+        properties = {}
+        for name, prop in data.get("properties", {}).items():
+            kind = prop.get("type")
+            options = None
+            if kind in OPTION_TYPES:
+                options = [o.get("name") for o in (prop.get(kind) or {}).get("options", [])]
+            properties[name] = {"id": prop.get("id"), "type": kind, "options": options}
+        return cls(properties)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"properties": self.properties, "fetched_at": self.fetched_at}
+
+    def validate(self, properties: dict[str, Any]) -> list[str]:
+        """Problems with an outgoing property payload (empty if valid).
+
+        Checks that each property exists, is written with its own type and,
+        for select, multi_select and status, only uses existing options.
+        """
+        problems = []
+        for name, value in properties.items():
+            spec = self.properties.get(name)
+            if spec is None:
+                problems.append(f"unknown property '{name}'")
+                continue
+
+            kind = spec["type"]
+            if kind in COMPUTED_TYPES:
+                problems.append(f"'{name}' is a read-only {kind} property")
+                continue
+            if not isinstance(value, dict) or kind not in value:
+                sent = next(iter(value), None) if isinstance(value, dict) else type(value).__name__
+                problems.append(f"'{name}' is a {kind} property, got {sent}")
+                continue
+
+            options = spec["options"]
+            if options is None:
+                continue
+            if kind == "multi_select":
+                chosen = [o.get("name") for o in value[kind] or []]
+            else:
+                chosen = [value[kind].get("name")] if value[kind] else []
+            unknown = [o for o in chosen if o not in options]
+            if unknown:
+                problems.append(
+                    f"'{name}' has no option {', '.join(repr(o) for o in unknown)} "
+                    f"(options: {', '.join(options)})"
+                )
+        return problems
+
+
+class SchemaCache:
+    """Schemas per database, kept in memory and persisted with a TTL.
+
+    A schema loaded from disk may predate options added since; callers can
+    check ``fetched`` to refetch once before rejecting a write.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, ttl: float = 24 * 3600):
+        self.directory = Path(directory) if directory else None
+        self.ttl = ttl
+        self._schemas: dict[str, NotionSchema] = {}
+        # Databases whose schema was fetched from the API by this process
+        self.fetched: set[str] = set()
+
+    def get(self, database_id: str) -> Optional[NotionSchema]:
+        """Cached schema, if one younger than the TTL exists."""
+        key = normalize_id(database_id)
+        schema = self._schemas.get(key)
+        if schema is None:
+            schema = self._load(key)
+            if schema is not None:
+                self._schemas[key] = schema
+        if schema is not None and time.time() - schema.fetched_at < self.ttl:
+            return schema
+        return None
+
+    def put(self, database_id: str, data: dict[str, Any]) -> NotionSchema:
+        """Store a freshly fetched ``databases/{id}`` response."""
+        key = normalize_id(database_id)
+        schema = self._schemas[key] = NotionSchema.from_database(data)
+        self.fetched.add(key)
+        self._save(key, schema)
+        return schema
+
+    def invalidate(self, database_id: str) -> None:
+        key = normalize_id(database_id)
+        self._schemas.pop(key, None)
+        self.fetched.discard(key)
+        if self.directory:
+            self._path(key).unlink(missing_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"schema-{key}.json"
+
+    def _load(self, key: str) -> Optional[NotionSchema]:
+        if not self.directory:
+            return None
+        try:
+            data = json.loads(self._path(key).read_text())
+            return NotionSchema(data["properties"], data["fetched_at"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable Notion schema cache for {key}: {e}")
+            return None
+
+    def _save(self, key: str, schema: NotionSchema) -> None:
+        if not self.directory:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._path(key).write_text(json.dumps(schema.to_dict()))
+        except OSError as e:
+            logger.warning(f"Could not persist Notion schema for {key}: {e}")
@@ -0,0 +1,312 @@
+"""Offline SQLite snapshot of Notion databases with full-text search."""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..logging_config import get_logger
+from ..serialization import notion_property_value
+from .notion_mirror import normalize_id
+
+logger = get_logger("tools.notion_snapshot")
+
+# Full-text indexed columns per table: FTS column -> Notion property
+FTS_PROPERTIES: dict[str, dict[str, str]] = {
+    "companies": {
+        "name": "Company_Name",
+        "description": "Product description",
+        "vertical": "Vertical",
+    },
+    "people": {
+        "name": "Contact_Name",
+        "role": "Role",
+    },
+}
+
+# Columns every snapshot table has; property columns must not clash with them
+BASE_COLUMNS = ("id", "url", "created_time", "last_edited_time", "raw")
+
+
+def column_name(prop: str) -> str:
+    """SQL column for a Notion property ("ASR provider" -> "asr_provider")."""
+    column = re.sub(r"[^0-9a-z]+", "_", prop.lower()).strip("_") or "property"
+    if column[0].isdigit() or column in BASE_COLUMNS:
+        column = f"p_{column}"
+    return column
+
+
+def flat_value(prop: dict[str, Any]) -> Any:
+    """Property value as a single SQL value (lists comma-joined)."""
+    value = notion_property_value(prop)
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value if v is not None)
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, dict):
+        return value.get("start") if "start" in value else json.dumps(value)
+    return value
+
+
+def _fts_query(text: str) -> str:
+    """FTS5 query matching every word of ``text`` as a prefix."""
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class NotionSnapshot:
+    """SQLite copy of exported databases for offline queries.
+
+    Each exported database becomes a table with one column per property
+    (named by ``column_name``, with a numeric suffix when two properties
+    clash; multi-values comma-joined), plus the raw page JSON. Relation
+    properties are also stored row-wise in ``relations`` (page_id, property,
+    target_id) for joins. Tables listed in FTS_PROPERTIES get a
+    ``<table>_fts`` full-text index.
+
+    Example:
+        SELECT company_name FROM companies
+        WHERE icp = '3' AND asr_provider LIKE '%Deepgram%'
+          AND main_office_country = 'France'
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS databases (
+                database_id TEXT PRIMARY KEY,
+                table_name TEXT UNIQUE NOT NULL,
+                exported_at REAL,
+                pages INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS relations (
+                page_id TEXT NOT NULL,
+                property TEXT NOT NULL,
+                target_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS relations_page ON relations (page_id);
+            CREATE INDEX IF NOT EXISTS relations_target ON relations (target_id);
+            CREATE TABLE IF NOT EXISTS property_columns (
+                table_name TEXT NOT NULL,
+                property TEXT NOT NULL,
+                column_name TEXT NOT NULL,
+                PRIMARY KEY (table_name, property)
+            );
+            """
+        )
+        self._conn.commit()
+        self._columns: dict[str, dict[str, str]] = {}
+        self._reader: Optional[sqlite3.Connection] = None
+
+    # Export
+
+    def begin_table(self, table: str, database_id: str) -> None:
+        """(Re)create ``table`` for an export of ``database_id``."""
+        with self._lock:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self._conn.execute(f'DROP TABLE IF EXISTS "{table}_fts"')
+            self._conn.execute(
+                f'CREATE TABLE "{table}" (id TEXT PRIMARY KEY, url TEXT, '
+                f'created_time TEXT, last_edited_time TEXT, raw TEXT NOT NULL)'
+            )
+            fts = FTS_PROPERTIES.get(table)
+            if fts:
+                columns = ", ".join(fts)
+                self._conn.execute(f'CREATE VIRTUAL TABLE "{table}_fts" USING fts5(id UNINDEXED, {columns})')
+            self._conn.execute(
+                "INSERT OR REPLACE INTO databases VALUES (?, ?, NULL, 0)",
+                (normalize_id(database_id), table),
+            )
+            self._conn.execute("DELETE FROM property_columns WHERE table_name = ?", (table,))
+            self._columns[table] = {}
+            self._conn.commit()
+
+    def write_pages(self, table: str, pages: list[dict[str, Any]]) -> None:
+        """Insert or replace a batch of pages."""
+        with self._lock:
+            for page in pages:
+                self._write(table, page)
+            self._conn.commit()
+
+    def finish_table(self, table: str, pages: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE databases SET exported_at = ?, pages = ? WHERE table_name = ?",
+                (time.time(), pages, table),
+            )
+            self._conn.commit()
+
+    def put(self, page: dict[str, Any]) -> None:
+        """Record a page after a local write, if its database is in the snapshot."""
+        table = self.table_for(page.get("parent", {}).get("database_id", ""))
+        if table is None:
+            return
+        with self._lock:
+            if page.get("archived") or page.get("in_trash"):
+                self._delete(table, page.get("id", ""))
+            else:
+                self._write(table, page)
+            self._conn.commit()
+
+    # Queries
+
+    def table_for(self, database_id: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT table_name FROM databases WHERE database_id = ?", (normalize_id(database_id),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def page_count(self, database_id: str) -> int:
+        """Pages in the last finished export of ``database_id`` (0 if none)."""
+        row = self._conn.execute(
+            "SELECT pages FROM databases WHERE database_id = ? AND exported_at IS NOT NULL",
+            (normalize_id(database_id),),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def age(self, table: str) -> Optional[float]:
+        """Seconds since ``table`` was exported, None if it never finished."""
+        row = self._conn.execute(
+            "SELECT exported_at FROM databases WHERE table_name = ?", (table,)
+        ).fetchone()
+        return time.time() - row[0] if row and row[0] else None
+
+    def search(self, table: str, text: str, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        """Pages whose indexed text contains every word of ``text``, best first."""
+        match = _fts_query(text)
+        if not match or table not in FTS_PROPERTIES:
+            return []
+        rows = self._conn.execute(
+            f'SELECT t.raw FROM "{table}_fts" f JOIN "{table}" t ON t.id = f.id '
+            f'WHERE "{table}_fts" MATCH ? ORDER BY f.rank LIMIT ?',
+            (match, -1 if limit is None else limit),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def filter(
+        self,
+        table: str,
+        prop: Optional[str] = None,
+        value: Optional[str] = None,
+        exact: bool = False,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """Pages whose ``prop`` equals or contains ``value`` (all pages without ``prop``), oldest first."""
+        where, params = "", []
+        if prop is not None:
+            column = self._table_columns(table).get(prop)
+            if column is None:
+                return []
+            if exact:
+                where, params = f'WHERE "{column}" = ?', [value]
+            else:
+                where, params = f'WHERE "{column}" LIKE ? ESCAPE \'\\\'', [f"%{_like_escape(value or '')}%"]
+        rows = self._conn.execute(
+            f'SELECT raw FROM "{table}" {where} ORDER BY created_time LIMIT ?',
+            [*params, -1 if limit is None else limit],
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def query(self, sql: str, params: tuple = ()) -> list[dict[str, Any]]:
+        """Run an ad-hoc SQL query (rows as dicts) on a read-only connection.
+
+        Raises:
+            sqlite3.Error: Invalid SQL, or any attempt to modify the snapshot
+        """
+        with self._lock:
+            if self._reader is None:
+                self._reader = sqlite3.connect(
+                    f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+                )
+                self._reader.row_factory = sqlite3.Row
+            return [dict(row) for row in self._reader.execute(sql, params)]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+            self._conn.close()
+
+    # Internals
+
+    def _table_columns(self, table: str) -> dict[str, str]:
+        """Property name -> column for ``table``, read from the snapshot on first use."""
+        columns = self._columns.get(table)
+        if columns is None:
+            columns = self._columns[table] = dict(self._conn.execute(
+                "SELECT property, column_name FROM property_columns WHERE table_name = ?", (table,)
+            ).fetchall())
+            existing = [row[1] for row in self._conn.execute(f'PRAGMA table_info("{table}")')]
+            if existing and not columns:
+                # Property names are recovered from any stored page
+                row = self._conn.execute(f'SELECT raw FROM "{table}" LIMIT 1').fetchone()
+                for prop in json.loads(row[0]).get("properties", {}) if row else ():
+                    if column_name(prop) in existing:
+                        columns[prop] = column_name(prop)
+        return columns
+
+    def _write(self, table: str, page: dict[str, Any]) -> None:
+        columns = self._table_columns(table)
+        properties = page.get("properties", {})
+        values: dict[str, Any] = {}
+        relations = []
+
+        for prop, data in properties.items():
+            if prop not in columns:
+                columns[prop] = self._add_column(table, prop, columns)
+            values[columns[prop]] = flat_value(data)
+            if data.get("type") == "relation" or "relation" in data:
+                relations += [(page["id"], prop, item.get("id")) for item in data.get("relation") or []]
+
+        names = [*BASE_COLUMNS, *values]
+        quoted = ", ".join(f'"{name}"' for name in names)
+        self._conn.execute(
+            f'INSERT OR REPLACE INTO "{table}" ({quoted}) VALUES ({", ".join("?" for _ in names)})',
+            [
+                page["id"], page.get("url"), page.get("created_time"), page.get("last_edited_time"),
+                json.dumps(page), *values.values(),
+            ],
+        )
+        self._conn.execute("DELETE FROM relations WHERE page_id = ?", (page["id"],))
+        self._conn.executemany("INSERT INTO relations VALUES (?, ?, ?)", relations)
+
+        fts = FTS_PROPERTIES.get(table)
+        if fts:
+            self._conn.execute(f'DELETE FROM "{table}_fts" WHERE id = ?', (page["id"],))
+            self._conn.execute(
+                f'INSERT INTO "{table}_fts" (id, {", ".join(fts)}) VALUES (?{", ?" * len(fts)})',
+                [page["id"], *(
+                    flat_value(properties[prop]) if prop in properties else None for prop in fts.values()
+                )],
+            )
+
+    def _add_column(self, table: str, prop: str, columns: dict[str, str]) -> str:
+        """Add the column of a new property, suffixed ("_2", ...) if its name is taken."""
+        taken = {*BASE_COLUMNS, *columns.values()}
+        base = column = column_name(prop)
+        n = 2
+        while column in taken:
+            column, n = f"{base}_{n}", n + 1
+        self._conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+        self._conn.execute(
+            "INSERT OR REPLACE INTO property_columns VALUES (?, ?, ?)", (table, prop, column)
+        )
+        return column
+
+    def _delete(self, table: str, page_id: str) -> None:
+        self._conn.execute(f'DELETE FROM "{table}" WHERE id = ?', (page_id,))
+        self._conn.execute("DELETE FROM relations WHERE page_id = ?", (page_id,))
+        if table in FTS_PROPERTIES:
+            self._conn.execute(f'DELETE FROM "{table}_fts" WHERE id = ?', (page_id,))
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,85 @@
+"""Persistent directory of Notion workspace users."""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ..logging_config import get_logger
+
+logger = get_logger("tools.notion_users")
+
+
+class NotionUserDirectory:
+    """Workspace users by name, refreshed from a full ``users`` listing.
+
+    The listing is persisted to ``path`` and reused by later processes until
+    it is older than ``ttl`` seconds. ``refreshed`` records whether this
+    process has listed users itself, so a name missing from a persisted copy
+    is looked up against the API at most once.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = 24 * 3600):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.fetched_at: Optional[float] = None
+        self.refreshed = False
+
+        # user ID -> {"name", "email", "type"}
+        self._users: dict[str, dict[str, Any]] = {}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def is_fresh(self) -> bool:
+        return self.fetched_at is not None and time.time() - self.fetched_at < self.ttl
+
+    def lookup(self, name: str) -> Optional[str]:
+        """ID of the user called ``name`` (exact match first, then ignoring case)."""
+        if not name:
+            return None
+        folded = name.casefold()
+        match = None
+        for user_id, user in self._users.items():
+            if user.get("name") == name:
+                return user_id
+            if match is None and (user.get("name") or "").casefold() == folded:
+                match = user_id
+        return match
+
+    def replace(self, users: list[dict[str, Any]]) -> None:
+        """Store a complete ``users`` listing."""
+        self._users = {
+            user["id"]: {
+                "name": user.get("name"),
+                "email": (user.get("person") or {}).get("email"),
+                "type": user.get("type"),
+            }
+            for user in users
+            if user.get("id")
+        }
+        self.fetched_at = time.time()
+        self.refreshed = True
+        self._save()
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            self._users = data["users"]
+            self.fetched_at = data["fetched_at"]
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable Notion user cache at {self.path}: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({"fetched_at": self.fetched_at, "users": self._users}))
+        except OSError as e:
+            logger.warning(f"Could not persist Notion user cache to {self.path}: {e}")
@@ -0,0 +1,126 @@
+"""Write-behind buffer that coalesces Notion page updates."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from ..logging_config import get_logger
+from .notion_mirror import normalize_id
+
+logger = get_logger("tools.notion_write_buffer")
+
+SendUpdate = Callable[[str, dict[str, Any]], Awaitable[dict[str, Any]]]
+
+
+class _PendingWrite:
+    def __init__(self, page_id: str):
+        self.page_id = page_id
+        self.properties: dict[str, Any] = {}
+        self.futures: list[asyncio.Future] = []
+        self.detached: list[list[str]] = []
+        self.timer: Optional[asyncio.Task] = None
+
+
+class WriteBehindBuffer:
+    """Merges property updates per page and sends one PATCH per page.
+
+    The first update of a page starts a ``window``-second timer; updates
+    arriving before it fires are merged (later values win). ``flush`` sends
+    everything pending immediately and waits for PATCHes already under way,
+    e.g. when the session ends.
+
+    Each ``enqueue`` returns a future resolving to the result of the PATCH
+    that carried the update: the page data, or the tool error dict. Failures
+    of ``detached`` updates, whose caller will not await the future, are kept
+    until ``take_errors`` instead.
+    """
+
+    def __init__(self, send: SendUpdate, window: float = 5.0):
+        self.send = send
+        self.window = window
+        self.updates = 0
+        self.patches = 0
+
+        self._pending: dict[str, _PendingWrite] = {}
+        self._sending: set[asyncio.Task] = set()
+        self._errors: list[dict[str, Any]] = []
+
+    def enqueue(self, page_id: str, properties: dict[str, Any], detached: bool = False) -> asyncio.Future:
+        """Merge ``properties`` into the pending update of ``page_id``."""
+        key = normalize_id(page_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingWrite(page_id)
+            pending.timer = asyncio.create_task(self._flush_later(key))
+
+        pending.properties.update(properties)
+        future = asyncio.get_running_loop().create_future()
+        pending.futures.append(future)
+        if detached:
+            pending.detached.append(sorted(properties))
+        self.updates += 1
+        return future
+
+    def pending(self) -> list[str]:
+        """Page IDs with unsent updates."""
+        return [p.page_id for p in self._pending.values()]
+
+    async def flush(self) -> list[dict[str, Any]]:
+        """Send every pending update now and wait for PATCHes in flight.
+
+        Returns:
+            One result per flushed page
+        """
+        keys = list(self._pending)
+        for key in keys:
+            timer = self._pending[key].timer
+            if timer is not None and timer is not asyncio.current_task():
+                timer.cancel()
+        sending = list(self._sending)
+        results = await asyncio.gather(*(self._flush_page(key) for key in keys))
+        done = await asyncio.gather(*sending, return_exceptions=True)
+        return [*results, *(r for r in done if isinstance(r, dict))]
+
+    def take_errors(self) -> list[dict[str, Any]]:
+        """Failed detached updates not yet reported (cleared on read)."""
+        errors, self._errors = self._errors, []
+        return errors
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "updates": self.updates,
+            "patches": self.patches,
+            "coalesced": self.updates - self.patches,
+            "pending": len(self._pending),
+        }
+
+    async def _flush_later(self, key: str) -> None:
+        await asyncio.sleep(self.window)
+        await self._flush_page(key)
+
+    async def _flush_page(self, key: str) -> dict[str, Any]:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return {}
+
+        self.patches += 1
+        # Own task so flush() can wait for it even when a timer started it
+        task = asyncio.ensure_future(self._send(pending))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+        return await asyncio.shield(task)
+
+    async def _send(self, pending: _PendingWrite) -> dict[str, Any]:
+        try:
+            result = await self.send(pending.page_id, pending.properties)
+        except Exception as e:
+            result = {"error": f"Notion update failed: {e}"}
+
+        if isinstance(result, dict) and "error" in result:
+            logger.warning(f"Buffered update of page {pending.page_id} failed: {result.get('error')}")
+            for properties in pending.detached:
+                self._errors.append({"page_id": pending.page_id, "properties": properties, **result})
+
+        for future in pending.futures:
+            if not future.done():
+                future.set_result(result)
+        return result
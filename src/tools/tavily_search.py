@@ -3,12 +3,89 @@
 import os
 from typing import Any, Optional
 
-import httpx
-
+from ..cache import cached_call
+from ..logging_config import get_logger
+from ..models import TavilyExtractInput, TavilySearchInput
+from ..utils import (
+    AdaptiveTimeoutConfig,
+    CircuitBreakerConfig,
+    HedgeConfig,
+    HTTPPoolConfig,
+    RateLimitConfig,
+    RetryConfig,
+    http_request,
+    single_flight,
+)
+
+logger = get_logger("tools.tavily")
 
 TAVILY_API_URL = "https://api.tavily.com"
 
+# Retry config for Tavily API
+TAVILY_RETRY_CONFIG = RetryConfig(
+    max_retries=3,
+    base_delay=1.0,
+    max_delay=15.0,
+    retryable_status_codes=(429, 500, 502, 503, 504),
+)
+
+# Tavily's default plan allows ~100 requests/minute
+TAVILY_RATE_LIMIT = RateLimitConfig(requests_per_second=1.5, burst=5)
+
+TAVILY_CIRCUIT_BREAKER = CircuitBreakerConfig(failure_threshold=5, recovery_timeout=30.0)
+
+# Only /search is hedged; /extract is too heavy to duplicate
+TAVILY_SEARCH_HEDGE_CONFIG = HedgeConfig(percentile=95.0, max_hedge_ratio=0.1)
+
+# Latency is tracked per endpoint, so /search and /extract adapt independently
+TAVILY_TIMEOUTS = AdaptiveTimeoutConfig(floor=5.0, ceiling=90.0)
+
+TAVILY_POOL_CONFIG = HTTPPoolConfig(http2=True)
+
+
+async def _tavily_post(
+    endpoint: str,
+    payload: dict[str, Any],
+    timeout: float = 30.0,
+    hedge: Optional[HedgeConfig] = None,
+) -> dict[str, Any]:
+    """POST to a Tavily endpoint through the shared, pooled HTTP client.
+
+    Args:
+        endpoint: Endpoint path (e.g. "search")
+        payload: JSON body (including api_key)
+        timeout: Request timeout in seconds
+        hedge: Hedging settings (idempotent endpoints only)
+
+    Returns:
+        Parsed response data, or an error dict
+    """
+    result = await http_request(
+        method="POST",
+        url=f"{TAVILY_API_URL}/{endpoint}",
+        json=payload,
+        timeout=timeout,
+        retry_config=TAVILY_RETRY_CONFIG,
+        rate_limit=TAVILY_RATE_LIMIT,
+        circuit_breaker=TAVILY_CIRCUIT_BREAKER,
+        hedge=hedge,
+        adaptive_timeout=TAVILY_TIMEOUTS,
+        pool=TAVILY_POOL_CONFIG,
+    )
+
+    if "error" in result:
+        logger.error(f"Tavily {endpoint} failed: {result['error']}")
+        if result.get("service_unavailable"):
+            return result
+        return {
+            "error": f"Tavily API error: {result['status_code'] or result['error']}",
+            "detail": result.get("data"),
+        }
+
+    return result["data"]
 
+
+@single_flight("tavily.search")
 async def tavily_search(
     query: str,
     search_depth: str = "basic",
@@ -17,6 +94,8 @@ async def tavily_search(
     exclude_domains: Optional[list[str]] = None,
     include_answer: bool = True,
     include_raw_content: bool = False,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
 ) -> dict[str, Any]:
     """Search the web using Tavily AI.
 
@@ -28,72 +107,93 @@ async def tavily_search(
         exclude_domains: Exclude results from these domains
         include_answer: Include AI-generated answer (default True)
         include_raw_content: Include raw page content (default False)
+        use_cache: Serve from / store in the on-disk response cache
+        refresh_cache: Ignore any cached response and fetch a fresh one
 
     Returns:
         Search results with URLs, titles, content snippets, and optional answer
     """
+    # Validate input
+    try:
+        validated = TavilySearchInput(
+            query=query,
+            search_depth=search_depth,
+            max_results=max_results,
+            include_answer=include_answer,
+            include_raw_content=include_raw_content,
+            include_domains=include_domains,
+            exclude_domains=exclude_domains,
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid input for tavily_search: {e}")
+        return {"error": f"Invalid input: {e}"}
+
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         return {"error": "TAVILY_API_KEY not configured"}
 
     payload: dict[str, Any] = {
         "api_key": api_key,
-        "query": query,
-        "search_depth": search_depth,
-        "max_results": max_results,
-        "include_answer": include_answer,
-        "include_raw_content": include_raw_content,
+        "query": validated.query,
+        "search_depth": validated.search_depth,
+        "max_results": validated.max_results,
+        "include_answer": validated.include_answer,
+        "include_raw_content": validated.include_raw_content,
     }
 
-    if include_domains:
-        payload["include_domains"] = include_domains
-    if exclude_domains:
-        payload["exclude_domains"] = exclude_domains
+    if validated.include_domains:
+        payload["include_domains"] = validated.include_domains
+    if validated.exclude_domains:
+        payload["exclude_domains"] = validated.exclude_domains
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{TAVILY_API_URL}/search",
-            json=payload,
-            timeout=30.0,
-        )
-
-        if response.status_code != 200:
-            return {"error": f"Tavily API error: {response.status_code}", "detail": response.text}
-
-        return response.json()
+    return await cached_call(
+        "tavily.search",
+        validated,
+        lambda: _tavily_post("search", payload, hedge=TAVILY_SEARCH_HEDGE_CONFIG),
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
+    )
 
 
+@single_flight("tavily.extract")
 async def tavily_extract(
     urls: list[str],
+    use_cache: bool = True,
+    refresh_cache: bool = False,
 ) -> dict[str, Any]:
     """Extract content from specific URLs using Tavily.
 
     Args:
         urls: List of URLs to extract content from
+        use_cache: Serve from / store in the on-disk response cache
+        refresh_cache: Ignore any cached response and fetch a fresh one
 
     Returns:
         Extracted content from each URL
     """
+    # Validate input
+    try:
+        validated = TavilyExtractInput(urls=urls)
+    except ValueError as e:
+        logger.warning(f"Invalid input for tavily_extract: {e}")
+        return {"error": f"Invalid input: {e}"}
+
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         return {"error": "TAVILY_API_KEY not configured"}
 
     payload = {
         "api_key": api_key,
-        "urls": urls,
+        "urls": validated.urls,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{TAVILY_API_URL}/extract",
-            json=payload,
-            timeout=60.0,
-        )
-
-        if response.status_code != 200:
-            return {"error": f"Tavily API error: {response.status_code}", "detail": response.text}
-
-        return response.json()
+    return await cached_call(
+        "tavily.extract",
+        validated,
+        lambda: _tavily_post("extract", payload, timeout=60.0),
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
+    )
 
 
 async def tavily_qna(
@@ -123,21 +223,14 @@ async def tavily_qna(
         "max_results": 5,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{TAVILY_API_URL}/search",
-            json=payload,
-            timeout=30.0,
-        )
-
-        if response.status_code != 200:
-            return {"error": f"Tavily API error: {response.status_code}", "detail": response.text}
+    data = await _tavily_post("search", payload, hedge=TAVILY_SEARCH_HEDGE_CONFIG)
+    if "error" in data:
+        return data
 
-        data = response.json()
-        return {
-            "answer": data.get("answer", ""),
-            "sources": [
-                {"title": r.get("title"), "url": r.get("url")}
-                for r in data.get("results", [])[:5]
-            ],
-        }
+    return {
+        "answer": data.get("answer", ""),
+        "sources": [
+            {"title": r.get("title"), "url": r.get("url")}
+            for r in data.get("results", [])[:5]
+        ],
+    }
@@ -1,9 +1,19 @@
 """Shared utilities for the Sales Assistant."""
 
 import asyncio
+import copy
 import functools
+import inspect
+import json as jsonlib
+import os
 import random
-from typing import Any, Callable, Optional, Type, TypeVar
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Mapping, Optional, Type, TypeVar
+from urllib.parse import urlparse
 
 import httpx
 
@@ -46,16 +56,22 @@ DEFAULT_RETRY_CONFIG = RetryConfig()
 def calculate_delay(
     attempt: int,
     config: RetryConfig,
+    retry_after: Optional[float] = None,
 ) -> float:
     """Calculate delay before next retry with exponential backoff.
 
     Args:
         attempt: Current attempt number (0-indexed)
         config: Retry configuration
+        retry_after: Server-provided Retry-After in seconds; replaces the
+            backoff when set, still capped at ``config.max_delay``
 
     Returns:
         Delay in seconds
     """
+    if retry_after is not None:
+        return min(max(retry_after, 0.0), config.max_delay)
+
     delay = config.base_delay * (config.exponential_base ** attempt)
     delay = min(delay, config.max_delay)
 
@@ -122,8 +138,842 @@ def retry_async(
     return decorator
 
 
+class HTTPPoolConfig:
+    """Connection pool settings for a shared upstream client.
+
+    ``http2=True`` marks the upstream as HTTP/2-capable. It is only used when
+    HTTP2_ENABLED is set and the optional ``h2`` package is installed;
+    otherwise, and whenever the server does not negotiate h2 via ALPN, the
+    client speaks HTTP/1.1.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+
+    def limits(self) -> httpx.Limits:
+        """Build the httpx pool limits for this configuration."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+DEFAULT_POOL_CONFIG = HTTPPoolConfig()
+
+# Process-wide client registry, keyed by upstream ("https://api.exa.ai").
+# Each entry remembers the event loop it was created on, since httpx
+# connections cannot be reused across loops (e.g. successive asyncio.run calls).
+_pool_configs: dict[str, HTTPPoolConfig] = {}
+_http_clients: dict[str, tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+
+def upstream_key(url: str) -> str:
+    """Return the upstream key (scheme://host[:port]) for a URL.
+
+    Examples:
+        https://api.notion.com/v1/pages -> https://api.notion.com
+        https://n8n-dev.blynt.ai/webhook/enrich-company -> https://n8n-dev.blynt.ai
+    """
+    parsed = urlparse(url)
+    return f"{parsed.scheme or 'https'}://{parsed.netloc.lower()}"
+
+
+def configure_http_pool(url: str, config: HTTPPoolConfig) -> None:
+    """Set pool limits for an upstream.
+
+    Takes effect the next time a client is created for that upstream.
+
+    Args:
+        url: Any URL on the upstream (only scheme and host are used)
+        config: Pool configuration
+    """
+    _pool_configs[upstream_key(url)] = config
+
+
+def http2_enabled() -> bool:
+    """Whether HTTP/2 was opted into (HTTP2_ENABLED) and ``h2`` is installed."""
+    if os.getenv("HTTP2_ENABLED", "").lower() not in ("1", "true", "yes"):
+        return False
+
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP2_ENABLED is set but 'h2' is not installed; using HTTP/1.1")
+        return False
+
+    return True
+
+
+def get_http_client(
+    url: str,
+    config: Optional[HTTPPoolConfig] = None,
+) -> httpx.AsyncClient:
+    """Get the shared, long-lived client for the upstream serving ``url``.
+
+    Clients keep their connections alive between calls, so repeated requests
+    to the same API reuse TCP/TLS sessions instead of re-handshaking.
+
+    Args:
+        url: Request URL
+        config: Pool settings used if the client does not exist yet
+            (overridden by configure_http_pool)
+
+    Returns:
+        Shared httpx.AsyncClient for the URL's upstream
+    """
+    key = upstream_key(url)
+    loop = asyncio.get_running_loop()
+
+    entry = _http_clients.get(key)
+    if entry is not None:
+        client, client_loop = entry
+        if client_loop is loop and not client.is_closed:
+            return client
+        # Created on a previous (now finished) loop - its connections are unusable
+        logger.debug(f"Discarding HTTP client for {key} bound to a stale event loop")
+
+    config = _pool_configs.get(key) or config or DEFAULT_POOL_CONFIG
+    http2 = config.http2 and http2_enabled()
+    client = httpx.AsyncClient(limits=config.limits(), http2=http2)
+    _http_clients[key] = (client, loop)
+    logger.debug(f"Created pooled HTTP client for {key} (http2={http2})")
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close every shared client created on the running event loop."""
+    loop = asyncio.get_running_loop()
+
+    for key, (client, client_loop) in list(_http_clients.items()):
+        del _http_clients[key]
+        if client_loop is not loop or client.is_closed:
+            continue
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client for {key}: {e}")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimitConfig:
+    """Token bucket settings for an upstream."""
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        burst: int = 1,
+        min_requests_per_second: float = 0.1,
+        recovery_factor: float = 1.1,
+        max_pause: float = 60.0,
+    ):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.min_requests_per_second = min_requests_per_second
+        self.recovery_factor = recovery_factor
+        # Longest pause a Retry-After or exhausted budget may impose
+        self.max_pause = max_pause
+
+
+class RateLimiter:
+    """Async token bucket shared by every coroutine calling one upstream.
+
+    Waiters are served in FIFO order. The refill rate starts at the configured
+    value and adapts to what the server reports: ``Retry-After`` pauses the
+    bucket, ``x-ratelimit-remaining``/``x-ratelimit-reset`` cap the rate to the
+    remaining budget, and a bare 429 halves it. Successful responses let it
+    recover gradually towards the configured rate.
+    """
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self.rate = config.requests_per_second
+        self._tokens = float(config.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.requests = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(float(self.config.burst), self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token.
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._get_lock():
+                while True:
+                    now = time.monotonic()
+                    if now < self._blocked_until:
+                        await asyncio.sleep(self._blocked_until - now)
+                        continue
+
+                    self._refill(now)
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        break
+
+                    await asyncio.sleep((1.0 - self._tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now (never waits)."""
+        now = time.monotonic()
+        if now < self._blocked_until or self.waiting:
+            return False
+        self._refill(now)
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        self.requests += 1
+        return True
+
+    def block_for(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (e.g. after Retry-After), at most max_pause."""
+        seconds = min(seconds, self.config.max_pause)
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = now
+
+    def update_from_response(
+        self,
+        status_code: int,
+        headers: Mapping[str, str],
+    ) -> Optional[float]:
+        """Adjust the bucket from a response's rate-limit headers.
+
+        Args:
+            status_code: Response status code
+            headers: Response headers (case-insensitive mapping)
+
+        Returns:
+            Retry-After in seconds if the server sent one, else None
+        """
+        config = self.config
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        if retry_after is not None:
+            self.block_for(retry_after)
+
+        remaining = _header_float(headers, "x-ratelimit-remaining")
+        reset = _header_float(headers, "x-ratelimit-reset")
+        if reset is not None and reset > time.time():
+            # Some APIs send an epoch timestamp instead of delta-seconds
+            reset -= time.time()
+
+        if remaining is not None and reset is not None and reset > 0:
+            if remaining < 1:
+                self.block_for(reset)
+            self.rate = min(
+                config.requests_per_second,
+                max(remaining / reset, config.min_requests_per_second),
+            )
+        elif status_code == 429:
+            self.rate = max(self.rate / 2, config.min_requests_per_second)
+        elif status_code < 400 and self.rate < config.requests_per_second:
+            self.rate = min(self.rate * config.recovery_factor, config.requests_per_second)
+
+        return retry_after
+
+    def stats(self) -> dict[str, Any]:
+        """Queue-wait statistics for this limiter."""
+        return {
+            "requests": self.requests,
+            "waiting": self.waiting,
+            "total_wait": round(self.total_wait, 3),
+            "max_wait": round(self.max_wait, 3),
+            "avg_wait": round(self.total_wait / self.requests, 3) if self.requests else 0.0,
+            "current_rate": round(self.rate, 3),
+        }
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+_rate_limiters: dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(
+    url: str,
+    config: Optional[RateLimitConfig] = None,
+) -> Optional[RateLimiter]:
+    """Get the process-wide rate limiter for the upstream serving ``url``.
+
+    The first call with a config creates the limiter; later calls share it.
+
+    Args:
+        url: Request URL
+        config: Bucket settings used if the limiter does not exist yet
+
+    Returns:
+        RateLimiter, or None if the upstream is not rate limited
+    """
+    key = upstream_key(url)
+    limiter = _rate_limiters.get(key)
+    if limiter is None and config is not None:
+        limiter = RateLimiter(config)
+        _rate_limiters[key] = limiter
+    return limiter
+
+
+def get_rate_limit_stats() -> dict[str, dict[str, Any]]:
+    """Queue-wait statistics for every upstream limiter, keyed by upstream."""
+    return {key: limiter.stats() for key, limiter in _rate_limiters.items()}
+
+
+class CircuitBreakerConfig:
+    """Failure thresholds for an upstream circuit breaker."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        failure_status_codes: tuple = (500, 502, 503, 504),
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_status_codes = failure_status_codes
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker guarding one upstream.
+
+    After ``failure_threshold`` consecutive failed calls (network errors,
+    timeouts or 5xx once http_request has exhausted its retries) the circuit
+    opens and requests fail fast. Once ``recovery_timeout``
+    has elapsed a single probe request is let through: success closes the
+    circuit, failure re-opens it for another timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, config: CircuitBreakerConfig):
+        self.config = config
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (claims the probe slot if half-open)."""
+        now = time.monotonic()
+
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.config.recovery_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+
+        if self.state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) frees its slot
+            # after another recovery_timeout
+            probe_stuck = (
+                self._probe_started is not None
+                and now - self._probe_started >= self.config.recovery_timeout
+            )
+            if self._probe_started is not None and not probe_stuck:
+                self.rejected += 1
+                return False
+            self._probe_started = now
+
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Circuit closed: upstream recovered")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.config.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probe_started = None
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 if not open)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(self.config.recovery_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": round(self.retry_in(), 1),
+        }
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(
+    url: str,
+    config: Optional[CircuitBreakerConfig] = None,
+) -> Optional[CircuitBreaker]:
+    """Get the process-wide circuit breaker for the upstream serving ``url``.
+
+    Args:
+        url: Request URL
+        config: Breaker settings used if the breaker does not exist yet
+
+    Returns:
+        CircuitBreaker, or None if the upstream is not guarded
+    """
+    key = upstream_key(url)
+    breaker = _circuit_breakers.get(key)
+    if breaker is None and config is not None:
+        breaker = CircuitBreaker(config)
+        _circuit_breakers[key] = breaker
+    return breaker
+
+
+def get_circuit_breaker_stats() -> dict[str, dict[str, Any]]:
+    """State of every upstream circuit breaker, keyed by upstream."""
+    return {key: breaker.stats() for key, breaker in _circuit_breakers.items()}
+
+
+def service_unavailable(url: str, retry_in: float) -> dict[str, Any]:
+    """Build the http_request result returned while an upstream's circuit is open."""
+    service = urlparse(url).netloc
+    return {
+        "status_code": 0,
+        "error": f"Service unavailable: {service} is failing, retry in {retry_in:.0f}s",
+        "data": None,
+        "service_unavailable": True,
+        "service": service,
+        "retry_in": round(retry_in, 1),
+    }
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls onto one in-flight task.
+
+    While a call for a key is running, later callers with the same key await
+    the same task instead of issuing a duplicate upstream request. The work
+    runs in its own task, so cancelling one caller does not cancel it for the
+    others. Followers receive a deep copy of the leader's result.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    async def do(
+        self,
+        endpoint: str,
+        key: str,
+        func: Callable[[], Any],
+    ) -> Any:
+        """Run ``func()`` once per in-flight ``key``.
+
+        Args:
+            endpoint: Name used for the saved-calls counters
+            key: Canonical request key (should include the endpoint)
+            func: Zero-argument coroutine function performing the request
+
+        Returns:
+            The (shared) result
+        """
+        stats = self._stats.setdefault(endpoint, {"upstream_calls": 0, "coalesced": 0})
+        task = self._in_flight.get(key)
+
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            stats["coalesced"] += 1
+            logger.debug(f"Coalesced duplicate in-flight call to {endpoint}")
+            result = await asyncio.shield(task)
+            return copy.deepcopy(result)
+
+        stats["upstream_calls"] += 1
+        task = asyncio.ensure_future(func())
+        self._in_flight[key] = task
+
+        def _forget(done: asyncio.Future) -> None:
+            if self._in_flight.get(key) is done:
+                del self._in_flight[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Upstream calls made vs. saved by coalescing, per endpoint."""
+        return {endpoint: dict(counts) for endpoint, counts in self._stats.items()}
+
+
+_single_flight = SingleFlight()
+
+
+def canonical_key(endpoint: str, payload: Any) -> str:
+    """Build a stable key from an endpoint name and a JSON-like payload."""
+    return f"{endpoint}:{jsonlib.dumps(payload, sort_keys=True, default=str)}"
+
+
+def single_flight(
+    endpoint: str,
+    key: Optional[Callable[..., Any]] = None,
+):
+    """Decorator coalescing identical concurrent calls to an async tool.
+
+    Args:
+        endpoint: Endpoint name used in the key and the counters
+        key: Optional function receiving the call's arguments and returning the
+            canonical payload; defaults to all bound arguments
+
+    Returns:
+        Decorated function
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            if key is not None:
+                payload = key(*args, **kwargs)
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                payload = bound.arguments
+
+            return await _single_flight.do(
+                endpoint,
+                canonical_key(endpoint, payload),
+                lambda: func(*args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def get_single_flight_stats() -> dict[str, dict[str, int]]:
+    """Upstream calls made vs. saved by single-flight coalescing, per endpoint."""
+    return _single_flight.stats()
+
+
+_ID_SEGMENT = re.compile(r"^[0-9a-fA-F]{32}$|^[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}$")
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Stable per-endpoint key: method, upstream and path with IDs collapsed.
+
+    Examples:
+        POST https://api.notion.com/v1/databases/<uuid>/query
+            -> "POST https://api.notion.com/v1/databases/{id}/query"
+    """
+    parsed = urlparse(url)
+    segments = ["{id}" if _ID_SEGMENT.match(seg) else seg for seg in parsed.path.split("/")]
+    return f"{method.upper()} {upstream_key(url)}{'/'.join(segments)}"
+
+
+class LatencyTracker:
+    """Rolling window of recent successful request latencies for one endpoint."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency at the given percentile (0-100), or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+_latency_trackers: dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(endpoint: str) -> LatencyTracker:
+    """Get the latency tracker for an endpoint key (see endpoint_key)."""
+    tracker = _latency_trackers.get(endpoint)
+    if tracker is None:
+        tracker = LatencyTracker()
+        _latency_trackers[endpoint] = tracker
+    return tracker
+
+
+class AdaptiveTimeoutConfig:
+    """Bounds for timeouts derived from an endpoint's observed latency.
+
+    Once ``min_samples`` latencies have been seen, the read timeout becomes
+    ``multiplier`` x the ``percentile`` latency, clamped to [floor, ceiling].
+    The connect timeout is derived the same way from measured TCP/TLS connect
+    times. Until then the caller's static timeout applies.
+    """
+
+    def __init__(
+        self,
+        floor: float = 2.0,
+        ceiling: float = 60.0,
+        percentile: float = 99.0,
+        multiplier: float = 2.0,
+        min_samples: int = 20,
+        connect_floor: float = 1.0,
+        connect_ceiling: float = 10.0,
+    ):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.connect_floor = connect_floor
+        self.connect_ceiling = connect_ceiling
+
+
+_connect_trackers: dict[str, LatencyTracker] = {}
+_timeout_metrics: dict[str, dict[str, Any]] = {}
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(value, high))
+
+
+def compute_timeout(
+    method: str,
+    url: str,
+    default: float,
+    config: AdaptiveTimeoutConfig,
+) -> httpx.Timeout:
+    """Derive connect/read timeouts for a request from observed latency.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        default: Static timeout used until enough samples exist
+        config: Floors, ceilings and percentile settings
+
+    Returns:
+        httpx.Timeout for the request (also published via get_timeout_metrics)
+    """
+    endpoint = endpoint_key(method, url)
+    tracker = get_latency_tracker(endpoint)
+    connect_tracker = _connect_trackers.get(upstream_key(url))
+
+    read = default
+    if len(tracker) >= config.min_samples:
+        read = _clamp(
+            tracker.percentile(config.percentile) * config.multiplier,
+            config.floor,
+            config.ceiling,
+        )
+
+    connect = min(default, config.connect_ceiling)
+    if connect_tracker is not None and len(connect_tracker) >= 5:
+        connect = _clamp(
+            connect_tracker.percentile(config.percentile) * config.multiplier,
+            config.connect_floor,
+            config.connect_ceiling,
+        )
+
+    _timeout_metrics[endpoint] = {
+        "read_timeout": round(read, 3),
+        "connect_timeout": round(connect, 3),
+        "samples": len(tracker),
+        "p50": tracker.percentile(50),
+        "p99": tracker.percentile(99),
+    }
+    return httpx.Timeout(read, connect=connect)
+
+
+def _connect_tracer(url: str) -> Callable:
+    """httpcore trace hook recording TCP+TLS connect time for the upstream."""
+    tracker = _connect_trackers.setdefault(upstream_key(url), LatencyTracker())
+    done_event = (
+        "connection.start_tls.complete"
+        if url.startswith("https")
+        else "connection.connect_tcp.complete"
+    )
+    started: dict[str, float] = {}
+
+    async def trace(event_name: str, info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            started["t"] = time.monotonic()
+        elif event_name == done_event and "t" in started:
+            tracker.record(time.monotonic() - started.pop("t"))
+
+    return trace
+
+
+def get_timeout_metrics() -> dict[str, dict[str, Any]]:
+    """Current adaptive timeout values and latency percentiles, per endpoint."""
+    return {endpoint: dict(values) for endpoint, values in _timeout_metrics.items()}
+
+
+class HedgeConfig:
+    """Settings for hedged (duplicated) requests on an idempotent endpoint.
+
+    Only enable for read-only calls such as search; a hedged request is sent
+    twice to the server.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        min_delay: float = 0.5,
+        max_hedge_ratio: float = 0.1,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_hedge_ratio = max_hedge_ratio
+
+
+_hedge_stats: dict[str, dict[str, int]] = {}
+
+
+def get_hedge_stats() -> dict[str, dict[str, int]]:
+    """Hedged request counters per endpoint."""
+    return {endpoint: dict(counts) for endpoint, counts in _hedge_stats.items()}
+
+
+async def _hedged_request(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    hedge: HedgeConfig,
+    limiter: Optional["RateLimiter"],
+    **kwargs,
+) -> httpx.Response:
+    """Send a request, firing a duplicate if it is slower than usual.
+
+    The duplicate goes out once the primary has been pending longer than the
+    endpoint's recent ``hedge.percentile`` latency, provided the hedge budget
+    (a fraction of all requests) and the rate limiter allow it. The first
+    successful response wins and the other request is cancelled.
+    """
+    endpoint = endpoint_key(method, url)
+    tracker = get_latency_tracker(endpoint)
+    stats = _hedge_stats.setdefault(endpoint, {"requests": 0, "hedged": 0, "hedge_wins": 0})
+    stats["requests"] += 1
+
+    primary = asyncio.ensure_future(client.request(method, url, **kwargs))
+    tasks = {primary}
+    try:
+        threshold = tracker.percentile(hedge.percentile)
+        if threshold is None or len(tracker) < hedge.min_samples:
+            return await primary
+
+        done, _ = await asyncio.wait(tasks, timeout=max(threshold, hedge.min_delay))
+        if done:
+            return primary.result()
+
+        within_budget = stats["hedged"] + 1 <= hedge.max_hedge_ratio * stats["requests"]
+        if not within_budget or (limiter and not limiter.try_acquire()):
+            return await primary
+
+        logger.debug(f"Hedging {endpoint} after {threshold:.2f}s")
+        stats["hedged"] += 1
+        secondary = asyncio.ensure_future(client.request(method, url, **kwargs))
+        tasks.add(secondary)
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is secondary:
+                        stats["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
 class AsyncHTTPClient:
-    """Async HTTP client with retry logic and logging."""
+    """Async HTTP client with retry logic and logging.
+
+    Requests go through the shared client for ``base_url`` (see
+    ``get_http_client``), so exiting the context does not close connections.
+    """
 
     def __init__(
         self,
@@ -139,16 +989,18 @@ class AsyncHTTPClient:
         self._client: Optional[httpx.AsyncClient] = None
 
     async def __aenter__(self) -> "AsyncHTTPClient":
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            headers=self.headers,
-            timeout=self.timeout,
-        )
+        self._client = get_http_client(self.base_url)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._client:
-            await self._client.aclose()
+        # The underlying client is shared; it is closed by close_http_clients()
+        self._client = None
+
+    def _build_url(self, url: str) -> str:
+        """Resolve a request path against base_url."""
+        if not self.base_url or url.startswith(("http://", "https://")):
+            return url
+        return f"{self.base_url.rstrip('/')}/{url.lstrip('/')}"
 
     async def _request(
         self,
@@ -163,6 +1015,10 @@ class AsyncHTTPClient:
         last_exception = None
         config = self.retry_config
 
+        url = self._build_url(url)
+        kwargs["headers"] = {**self.headers, **(kwargs.get("headers") or {})}
+        kwargs.setdefault("timeout", self.timeout)
+
         for attempt in range(config.max_retries + 1):
             try:
                 logger.debug(f"{method.upper()} {url} (attempt {attempt + 1})")
@@ -218,6 +1074,11 @@ async def http_request(
     json: Optional[dict[str, Any]] = None,
     timeout: float = 30.0,
     retry_config: Optional[RetryConfig] = None,
+    rate_limit: Optional[RateLimitConfig] = None,
+    circuit_breaker: Optional[CircuitBreakerConfig] = None,
+    hedge: Optional[HedgeConfig] = None,
+    adaptive_timeout: Optional[AdaptiveTimeoutConfig] = None,
+    pool: Optional[HTTPPoolConfig] = None,
 ) -> dict[str, Any]:
     """Make a single HTTP request with retry logic.
 
@@ -226,71 +1087,121 @@ async def http_request(
         url: Request URL
         headers: Request headers
         json: JSON body
-        timeout: Request timeout
+        timeout: Request timeout (the starting value when adaptive_timeout is set)
         retry_config: Retry configuration
+        rate_limit: Token bucket for the upstream (shared process-wide)
+        circuit_breaker: Breaker settings for the upstream (shared process-wide)
+        hedge: Enable hedged requests (idempotent endpoints only)
+        adaptive_timeout: Derive timeouts from the endpoint's observed latency
+        pool: Pool settings for the upstream's shared client (incl. HTTP/2 opt-in)
 
     Returns:
-        Response as dict with 'status_code', 'data', and optionally 'error'
+        Response as dict with 'status_code', 'data', and optionally 'error'.
+        When the upstream's circuit is open the call fails fast and the dict
+        also carries 'service_unavailable': True, 'service' and 'retry_in'.
     """
     config = retry_config or DEFAULT_RETRY_CONFIG
     last_exception = None
+    client = get_http_client(url, pool)
+    limiter = get_rate_limiter(url, rate_limit)
+    breaker = get_circuit_breaker(url, circuit_breaker)
+    tracker = get_latency_tracker(endpoint_key(method, url))
 
     for attempt in range(config.max_retries + 1):
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                logger.debug(f"{method.upper()} {url} (attempt {attempt + 1})")
-
-                response = await client.request(
-                    method,
-                    url,
-                    headers=headers,
-                    json=json,
-                )
+        # The breaker counts one outcome per call: retries of a call admitted
+        # (or probing) go on unless another call has opened the circuit since
+        admitted = attempt > 0 and breaker is not None and breaker.state != breaker.OPEN
+        if breaker and not admitted and not breaker.allow_request():
+            logger.warning(f"Circuit open for {upstream_key(url)}, failing fast: {method} {url}")
+            return service_unavailable(url, breaker.retry_in())
 
-                # Check for retryable status codes
-                if response.status_code in config.retryable_status_codes:
-                    if attempt < config.max_retries:
-                        delay = calculate_delay(attempt, config)
-                        logger.warning(
-                            f"Retrying {method} {url} after {delay:.2f}s "
-                            f"(status {response.status_code})"
-                        )
-                        await asyncio.sleep(delay)
-                        continue
+        if limiter:
+            waited = await limiter.acquire()
+            if waited > 0.1:
+                logger.debug(f"Rate limiter held {method.upper()} {url} for {waited:.2f}s")
 
-                logger.debug(f"{method.upper()} {url} -> {response.status_code}")
+        try:
+            logger.debug(f"{method.upper()} {url} (attempt {attempt + 1})")
 
-                # Try to parse JSON
-                try:
-                    data = response.json()
-                except Exception:
-                    data = {"text": response.text}
-
-                if response.status_code >= 400:
-                    return {
-                        "status_code": response.status_code,
-                        "error": f"HTTP {response.status_code}",
-                        "data": data,
-                    }
-
-                return {
-                    "status_code": response.status_code,
-                    "data": data,
-                }
+            request_timeout: Any = timeout
+            request_kwargs: dict[str, Any] = {"headers": headers, "json": json}
+            if adaptive_timeout:
+                request_timeout = compute_timeout(method, url, timeout, adaptive_timeout)
+                request_kwargs["extensions"] = {"trace": _connect_tracer(url)}
+            request_kwargs["timeout"] = request_timeout
 
+            started = time.monotonic()
+            if hedge:
+                response = await _hedged_request(
+                    client, method, url, hedge, limiter, **request_kwargs
+                )
+            else:
+                response = await client.request(method, url, **request_kwargs)
+            if response.status_code < 500:
+                tracker.record(time.monotonic() - started)
         except config.retryable_exceptions as e:
             last_exception = e
+            if isinstance(e, httpx.ReadTimeout):
+                # Count the timeout as a (censored) sample so adaptive timeouts
+                # back off instead of repeatedly cutting slow calls short
+                tracker.record(time.monotonic() - started)
             if attempt < config.max_retries:
                 delay = calculate_delay(attempt, config)
                 logger.warning(f"Retrying {method} {url} after {delay:.2f}s due to: {e}")
                 await asyncio.sleep(delay)
+                continue
+
+            logger.error(f"Request failed after {config.max_retries} retries: {e}")
+            if breaker:
+                breaker.record_failure()
+            return {
+                "status_code": 0,
+                "error": str(e),
+                "data": None,
+            }
+
+        retry_after = None
+        if limiter:
+            retry_after = limiter.update_from_response(response.status_code, response.headers)
+        elif response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+
+        # Check for retryable status codes
+        if response.status_code in config.retryable_status_codes:
+            if attempt < config.max_retries:
+                delay = calculate_delay(attempt, config, retry_after)
+                logger.warning(
+                    f"Retrying {method} {url} after {delay:.2f}s "
+                    f"(status {response.status_code})"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+        if breaker:
+            if response.status_code in breaker.config.failure_status_codes:
+                breaker.record_failure()
             else:
-                logger.error(f"Request failed after {config.max_retries} retries: {e}")
-                return {
-                    "status_code": 0,
-                    "error": str(e),
-                    "data": None,
-                }
+                breaker.record_success()
+
+        logger.debug(f"{method.upper()} {url} -> {response.status_code}")
+
+        # Try to parse JSON
+        try:
+            data = response.json()
+        except Exception:
+            data = {"text": response.text}
+
+        if response.status_code >= 400:
+            return {
+                "status_code": response.status_code,
+                "error": f"HTTP {response.status_code}",
+                "data": data,
+            }
+
+        return {
+            "status_code": response.status_code,
+            "data": data,
+        }
 
     return {
         "status_code": 0,
@@ -0,0 +1,108 @@
+"""Tests for the persistent response cache."""
+
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.cache import ResponseCache, cache_key, cached_call
+from src.models import ExaSearchInput
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    """Response cache backed by a temporary SQLite file."""
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_entries=3)
+    yield cache
+    cache.close()
+
+
+class TestCacheKey:
+    """Tests for canonical request hashing."""
+
+    def test_equivalent_requests_share_key(self):
+        """Test defaults and empty values normalize to the same key."""
+        a = ExaSearchInput(query="voice ai")
+        b = ExaSearchInput(query="voice ai", num_results=10, include_domains=[])
+        assert cache_key(a) == cache_key(b)
+
+    def test_different_requests_differ(self):
+        """Test different parameters produce different keys."""
+        a = ExaSearchInput(query="voice ai")
+        b = ExaSearchInput(query="voice ai", num_results=5)
+        assert cache_key(a) != cache_key(b)
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_roundtrip(self, response_cache):
+        """Test stored responses are returned intact."""
+        response_cache.set("exa.search", "k1", {"results": [{"url": "https://a.com"}]})
+        assert response_cache.get("exa.search", "k1") == {"results": [{"url": "https://a.com"}]}
+        assert response_cache.get("exa.search", "missing") is None
+
+    def test_ttl_expiry(self, response_cache):
+        """Test entries older than the endpoint TTL are dropped."""
+        response_cache.ttls["exa.search"] = 0
+        response_cache.set("exa.search", "k1", {"results": []})
+
+        with patch("src.cache.time.time", return_value=10**12):
+            assert response_cache.get("exa.search", "k1") is None
+        assert response_cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self, response_cache):
+        """Test least recently used entries are evicted over the size bound."""
+        now = time.time()
+        with patch("src.cache.time.time", side_effect=[now + i for i in range(5)]):
+            response_cache.set("exa.search", "a", {"n": 1})
+            response_cache.set("exa.search", "b", {"n": 2})
+            response_cache.set("exa.search", "c", {"n": 3})
+            response_cache.get("exa.search", "a")
+            response_cache.set("exa.search", "d", {"n": 4})
+
+        assert response_cache.get("exa.search", "b") is None
+        assert response_cache.get("exa.search", "a") == {"n": 1}
+        assert response_cache.stats()["entries"] == 3
+
+
+class TestCachedCall:
+    """Tests for cached_call."""
+
+    @pytest.mark.asyncio
+    async def test_second_call_served_from_cache(self, response_cache):
+        """Test a repeated request does not hit the API."""
+        fetch = AsyncMock(return_value={"results": [1]})
+        request = ExaSearchInput(query="voice ai")
+
+        with patch("src.cache.get_response_cache", return_value=response_cache):
+            first = await cached_call("exa.search", request, fetch)
+            second = await cached_call("exa.search", request, fetch)
+
+        assert first == second == {"results": [1]}
+        assert fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_bypasses_lookup(self, response_cache):
+        """Test refresh_cache fetches again and stores the new response."""
+        fetch = AsyncMock(side_effect=[{"v": 1}, {"v": 2}])
+        request = ExaSearchInput(query="voice ai")
+
+        with patch("src.cache.get_response_cache", return_value=response_cache):
+            await cached_call("exa.search", request, fetch)
+            refreshed = await cached_call("exa.search", request, fetch, refresh_cache=True)
+            cached = await cached_call("exa.search", request, fetch)
+
+        assert refreshed == cached == {"v": 2}
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self, response_cache):
+        """Test error responses are never stored."""
+        fetch = AsyncMock(return_value={"error": "HTTP 500"})
+        request = ExaSearchInput(query="voice ai")
+
+        with patch("src.cache.get_response_cache", return_value=response_cache):
+            await cached_call("exa.search", request, fetch)
+            await cached_call("exa.search", request, fetch)
+
+        assert fetch.await_count == 2
@@ -1,14 +1,95 @@
 """Tests for Notion tools."""
 
+import asyncio
+import json
+import sqlite3
+from contextlib import aclosing
+from datetime import datetime, timezone
+
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 
+from src.tools import notion as notion_module
 from src.tools.notion import (
+    NotionAPIError,
     _normalize_domain,
     _get_url_variations,
+    created_time_partitions,
+    diff_properties,
+    flush_notion_writes,
+    get_notion_write_stats,
+    notion_iter_pages,
+    notion_scan_database,
+    notion_update_company,
+    property_projection,
     notion_find_by_website,
+    notion_export_snapshot,
+    notion_find_user,
+    option_partitions,
+    notion_save_company,
     notion_save_company_if_not_exists,
+    notion_search,
+    notion_sync_mirror,
+    start_write_behind,
+)
+from src.tools.notion_blocks import (
+    MAX_TEXT_LENGTH,
+    batch_blocks,
+    markdown_to_blocks,
+    notion_append_documents,
+    notion_append_markdown,
 )
+from src.tools.notion_bulk import notion_bulk_upsert_companies
+from src.tools.notion_contacts import AsyncNotionContactManager, normalize_linkedin_url
+from src.tools.notion_mirror import NotionMirror
+from src.tools.notion_schema import NotionSchema, SchemaCache
+from src.tools.notion_snapshot import NotionSnapshot
+from src.tools.notion_users import NotionUserDirectory
+
+
+def _company_page(
+    page_id: str,
+    website: str,
+    database_id: str = "test-database-id",
+    edited: str = "2024-01-01T00:00:00.000Z",
+) -> dict:
+    return {
+        "id": page_id,
+        "object": "page",
+        "created_time": f"2024-01-01T00:00:0{len(page_id) % 10}.000Z",
+        "last_edited_time": edited,
+        "parent": {"type": "database_id", "database_id": database_id},
+        "properties": {
+            "Company_Name": {"type": "title", "title": [{"plain_text": page_id}]},
+            "Website": {"type": "url", "url": website},
+        },
+    }
+
+
+@pytest.fixture(autouse=True)
+def isolated_mirrors(monkeypatch, tmp_path):
+    """Start every test without mirrors, write buffer or schemas, persisting to
+    a temporary directory. Schema validation and projection are enabled per test."""
+    monkeypatch.setattr(notion_module, "_mirrors", {})
+    monkeypatch.setattr(notion_module, "_write_buffer", None)
+    monkeypatch.setattr(notion_module, "_schema_cache", None)
+    monkeypatch.setattr(notion_module, "_user_directory", None)
+    monkeypatch.setattr(notion_module, "_snapshot", None)
+    monkeypatch.setenv("NOTION_SCHEMA_VALIDATION", "0")
+    monkeypatch.setenv("NOTION_PROJECTION", "0")
+    monkeypatch.setenv("NOTION_MIRROR_DIR", str(tmp_path / "mirrors"))
+
+
+def _domain_mirror(**kwargs) -> NotionMirror:
+    mirror = NotionMirror(**kwargs)
+    mirror.add_index("domain", notion_module._website_key)
+    return mirror
+
+
+def _query_response(pages: list, cursor: str = None) -> dict:
+    return {"status_code": 200, "data": {
+        "results": pages, "has_more": cursor is not None, "next_cursor": cursor,
+    }}
 
 
 class TestNormalizeDomain:
@@ -107,3 +188,1372 @@ class TestNotionSaveCompanyIfNotExists:
                 assert result["action"] == "exists"
                 assert "page" in result
                 assert "already exists" in result["message"]
+
+
+class TestNotionMirror:
+    """Tests for the local database mirror."""
+
+    def test_full_sync_and_lookup(self):
+        """Test pages are found by normalized key, earliest created winning."""
+        mirror = _domain_mirror()
+        mirror.apply([
+            _company_page("bb", "vapi.ai"),
+            _company_page("a", "https://www.vapi.ai/"),
+            _company_page("c", "http://spitch.ai"),
+        ], full=True)
+
+        assert mirror.is_fresh()
+        assert mirror.lookup("domain", "vapi.ai")["id"] == "a"
+        assert mirror.lookup("domain", "spitch.ai")["id"] == "c"
+        assert mirror.lookup("domain", "missing.ai") is None
+
+    def test_checkpoint_and_delta_filter(self):
+        """Test the checkpoint tracks the newest edit and drives delta syncs."""
+        mirror = _domain_mirror()
+        assert mirror.delta_filter() is None
+
+        mirror.apply([
+            _company_page("a", "vapi.ai", edited="2024-03-01T10:00:00.000Z"),
+            _company_page("b", "spitch.ai", edited="2024-03-02T09:00:00.000Z"),
+        ], full=True)
+
+        assert mirror.checkpoint == "2024-03-02T09:00:00.000Z"
+        assert mirror.delta_filter() == {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": "2024-03-02T09:00:00.000Z"},
+        }
+
+    def test_delta_merges_rekeys_and_archives(self):
+        """Test delta pages update keys and archived pages drop out."""
+        mirror = _domain_mirror()
+        mirror.apply([_company_page("a", "old.ai"), _company_page("b", "keep.ai")], full=True)
+
+        mirror.apply([_company_page("a", "new.ai")], full=False)
+        assert mirror.lookup("domain", "old.ai") is None
+        assert mirror.lookup("domain", "new.ai")["id"] == "a"
+        assert mirror.lookup("domain", "keep.ai")["id"] == "b"
+
+        mirror.apply([{**_company_page("a", "new.ai"), "archived": True}], full=False)
+        assert mirror.lookup("domain", "new.ai") is None
+        assert len(mirror) == 1
+
+    def test_staleness_and_full_resync(self):
+        """Test freshness expires and full resyncs come due."""
+        mirror = _domain_mirror(max_staleness=60, full_resync_interval=3600)
+        mirror.apply([_company_page("a", "vapi.ai")], full=True)
+        assert not mirror.needs_full_sync()
+
+        mirror.synced_at -= 61
+        assert not mirror.is_fresh()
+
+        mirror.full_synced_at -= 3601
+        assert mirror.delta_filter() is None
+
+    def test_persistence(self, tmp_path):
+        """Test pages and checkpoint are restored by a new instance."""
+        path = tmp_path / "companies.sqlite3"
+        mirror = _domain_mirror(path=path)
+        mirror.apply([_company_page("a", "vapi.ai", edited="2024-03-01T10:00:00.000Z")], full=True)
+        mirror.put(_company_page("b", "spitch.ai"))
+        mirror.close()
+
+        reloaded = _domain_mirror(path=path)
+        assert reloaded.is_fresh()
+        assert reloaded.checkpoint == "2024-03-01T10:00:00.000Z"
+        assert reloaded.lookup("domain", "vapi.ai")["id"] == "a"
+        assert reloaded.lookup("domain", "spitch.ai")["id"] == "b"
+        reloaded.close()
+
+
+class TestMirrorLookups:
+    """Tests for mirror-backed Notion reads."""
+
+    @pytest.mark.asyncio
+    async def test_scan_once_then_lookup_locally(self, mock_env_vars):
+        """Test a paginated scan serves every later lookup."""
+        request = AsyncMock(side_effect=[
+            _query_response([_company_page("a", "https://vapi.ai")], cursor="cursor-1"),
+            _query_response([_company_page("b", "www.spitch.ai")]),
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            assert (await notion_find_by_website("http://www.vapi.ai/"))["id"] == "a"
+            assert (await notion_find_by_website("spitch.ai"))["id"] == "b"
+            assert await notion_find_by_website("unknown.ai") is None
+
+        assert request.await_count == 2
+        assert request.await_args_list[1].args[2]["start_cursor"] == "cursor-1"
+
+    @pytest.mark.asyncio
+    async def test_stale_mirror_syncs_delta(self, mock_env_vars):
+        """Test a stale mirror only fetches pages edited since the checkpoint."""
+        request = AsyncMock(side_effect=[
+            _query_response([_company_page("a", "vapi.ai", edited="2024-03-01T10:00:00.000Z")]),
+            _query_response([_company_page("b", "spitch.ai", edited="2024-03-05T08:00:00.000Z")]),
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            await notion_sync_mirror()
+            notion_module.get_mirror("test-database-id").invalidate()
+            assert (await notion_find_by_website("spitch.ai"))["id"] == "b"
+
+        delta = request.await_args_list[1].args[2]["filter"]
+        assert delta["last_edited_time"] == {"on_or_after": "2024-03-01T10:00:00.000Z"}
+        assert (await notion_find_by_website("vapi.ai"))["id"] == "a"
+
+    @pytest.mark.asyncio
+    async def test_mirror_matches_subdomains_like_live_lookup(self, mock_env_vars):
+        """Test mirrored lookups fall back to subdomain and 'contains' matches."""
+        request = AsyncMock(return_value=_query_response([
+            _company_page("app", "https://app.livekit.io/dashboard"),
+            _company_page("other", "https://mylivekit.io"),
+        ]))
+
+        with patch("src.tools.notion._notion_request", request):
+            single = await notion_find_by_website("livekit.io")
+            bulk = await notion_module.notion_find_by_websites(["https://livekit.io", "krisp.ai"])
+
+        assert single["id"] == "app"
+        assert bulk["https://livekit.io"]["id"] == "app"
+        assert bulk["krisp.ai"] is None
+        request.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_search_served_from_mirror(self, mock_env_vars):
+        """Test database searches filter the mirror locally."""
+        request = AsyncMock(return_value=_query_response([
+            _company_page("a", "vapi.ai"),
+            _company_page("b", "spitch.ai"),
+        ]))
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await notion_search("SPITCH", filter_property="Website")
+            again = await notion_search("vapi", filter_property="Website")
+
+        assert [p["id"] for p in result["results"]] == ["b"]
+        assert [p["id"] for p in again["results"]] == ["a"]
+        assert request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_saved_company_is_mirrored(self, mock_env_vars):
+        """Test notion_save_company keeps the mirror current."""
+        request = AsyncMock(side_effect=[
+            _query_response([]),
+            {"status_code": 200, "data": _company_page("new", "https://recept.ai")},
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            assert await notion_find_by_website("recept.ai") is None
+            await notion_save_company(company_name="Recept", website="https://recept.ai")
+            assert (await notion_find_by_website("recept.ai"))["id"] == "new"
+
+        assert request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_sync_fails(self, mock_env_vars):
+        """Test a single compound query is used when the sync fails."""
+        failure = {"status_code": 500, "error": "HTTP 500", "data": None}
+        found = _query_response([_company_page("a", "vapi.ai")])
+        request = AsyncMock(side_effect=[failure, found])
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await notion_find_by_website("vapi.ai")
+
+        assert result["id"] == "a"
+        assert request.await_count == 2
+        clauses = request.await_args.args[2]["filter"]["or"]
+        assert len(clauses) == 9
+        assert clauses[-1] == {"property": "Website", "url": {"contains": "vapi.ai"}}
+
+
+class TestCompoundWebsiteQueries:
+    """Tests for compound OR duplicate detection without a mirror."""
+
+    @pytest.fixture(autouse=True)
+    def no_mirror(self, monkeypatch):
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+
+    @pytest.mark.asyncio
+    async def test_ranks_hits_client_side(self, mock_env_vars):
+        """Test exact variations beat paths, subdomains and substring hits."""
+        pages = [
+            _company_page("sub", "https://app.vapi.ai"),
+            _company_page("other", "https://myvapi.ai"),
+            _company_page("path", "https://vapi.ai/en"),
+            _company_page("www", "https://www.vapi.ai"),
+        ]
+        request = AsyncMock(return_value=_query_response(pages))
+
+        with patch("src.tools.notion._notion_request", request):
+            assert (await notion_find_by_website("vapi.ai"))["id"] == "www"
+
+        request = AsyncMock(return_value=_query_response(pages[:3]))
+        with patch("src.tools.notion._notion_request", request):
+            assert (await notion_find_by_website("vapi.ai"))["id"] == "path"
+
+        request = AsyncMock(return_value=_query_response(pages[:2]))
+        with patch("src.tools.notion._notion_request", request):
+            assert (await notion_find_by_website("vapi.ai"))["id"] == "sub"
+
+    @pytest.mark.asyncio
+    async def test_bulk_chunks_domains(self, mock_env_vars):
+        """Test bulk lookups chunk domains within the clause limit."""
+        websites = [f"https://company{i}.ai" for i in range(150)]
+        pages = [_company_page("c7", "company7.ai"), _company_page("c42", "https://www.company42.ai")]
+        request = AsyncMock(return_value=_query_response(pages))
+
+        with patch("src.tools.notion._notion_request", request):
+            found = await notion_module.notion_find_by_websites(websites)
+
+        assert request.await_count == 2
+        assert [len(call.args[2]["filter"]["or"]) for call in request.await_args_list] == [100, 50]
+        assert found["https://company7.ai"]["id"] == "c7"
+        assert found["https://company42.ai"]["id"] == "c42"
+        assert found["https://company1.ai"] is None
+        assert found["https://company4.ai"] is None
+
+
+class TestNotionIterPages:
+    """Tests for the streaming paginated iterator."""
+
+    @pytest.mark.asyncio
+    async def test_streams_all_cursors(self, mock_env_vars):
+        """Test results from every cursor are yielded in order."""
+        request = AsyncMock(side_effect=[
+            _query_response([{"id": "1"}, {"id": "2"}], cursor="c1"),
+            _query_response([{"id": "3"}], cursor="c2"),
+            _query_response([{"id": "4"}]),
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            ids = [page["id"] async for page in notion_iter_pages("databases/db/query")]
+
+        assert ids == ["1", "2", "3", "4"]
+        bodies = [call.args[2] for call in request.await_args_list]
+        assert bodies[0] == {"page_size": 100}
+        assert [b.get("start_cursor") for b in bodies] == [None, "c1", "c2"]
+
+    @pytest.mark.asyncio
+    async def test_prefetches_next_batch(self, mock_env_vars):
+        """Test the next request is in flight while the caller processes a batch."""
+        request = AsyncMock(side_effect=[
+            _query_response([{"id": "1"}], cursor="c1"),
+            _query_response([{"id": "2"}]),
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            stream = notion_iter_pages("search", {"query": "voice"})
+            async with aclosing(stream):
+                first = await anext(stream)
+                await asyncio.sleep(0)
+                assert request.await_count == 2
+                rest = [page async for page in stream]
+
+        assert first["id"] == "1"
+        assert rest == [{"id": "2"}]
+
+    @pytest.mark.asyncio
+    async def test_limit_stops_early(self, mock_env_vars):
+        """Test no further cursors are requested once the limit is reached."""
+        request = AsyncMock(side_effect=[
+            _query_response([{"id": "1"}, {"id": "2"}], cursor="c1"),
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            ids = [page["id"] async for page in notion_iter_pages("search", limit=2)]
+
+        assert ids == ["1", "2"]
+        assert request.await_count == 1
+        assert request.await_args.args[2]["page_size"] == 2
+
+    @pytest.mark.asyncio
+    async def test_error_raises(self, mock_env_vars):
+        """Test a failed request raises with the tool error shape."""
+        request = AsyncMock(return_value={"status_code": 400, "error": "HTTP 400", "data": {}})
+
+        with patch("src.tools.notion._notion_request", request):
+            with pytest.raises(NotionAPIError) as excinfo:
+                [page async for page in notion_iter_pages("search")]
+
+        assert excinfo.value.result["error"] == "Notion API error: 400"
+
+    @pytest.mark.asyncio
+    async def test_properties_sent_as_filter_properties(self, mock_env_vars):
+        """Test every cursor request carries the projection as query parameters."""
+        request = AsyncMock(side_effect=[
+            _query_response([{"id": "1"}], cursor="c1"),
+            _query_response([{"id": "2"}]),
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            pages = [p async for p in notion_iter_pages("databases/db/query", properties=["title", "W%3Ab"])]
+
+        assert len(pages) == 2
+        paths = [call.args[1] for call in request.await_args_list]
+        assert paths == ["databases/db/query?filter_properties=title&filter_properties=W%3Ab"] * 2
+
+    @pytest.mark.asyncio
+    async def test_notion_search_collects_pages(self, mock_env_vars, monkeypatch):
+        """Test notion_search returns every page, or reports a limit cut."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        responses = [
+            _query_response([{"id": "1"}, {"id": "2"}], cursor="c1"),
+            _query_response([{"id": "3"}]),
+        ]
+
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=responses)):
+            result = await notion_search("", filter_property=None)
+        assert [p["id"] for p in result["results"]] == ["1", "2", "3"]
+        assert result["has_more"] is False
+
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=responses)):
+            result = await notion_search("", limit=1)
+        assert [p["id"] for p in result["results"]] == ["1"]
+        assert result["has_more"] is True
+
+    @pytest.mark.asyncio
+    async def test_notion_search_bounded_by_default(self, mock_env_vars, monkeypatch):
+        """Test notion_search stops paginating at SEARCH_LIMIT unless asked for all pages."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        request = AsyncMock(side_effect=[
+            _query_response([{"id": f"{n}-{i}"} for i in range(100)], cursor=f"c{n}") for n in range(5)
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await notion_search("")
+
+        assert len(result["results"]) == notion_module.SEARCH_LIMIT and result["has_more"] is True
+        assert request.await_count == 2
+
+
+async def _collect(stream) -> list:
+    return [item async for item in stream]
+
+
+class TestPartitionedScan:
+    """Tests for concurrent scans over disjoint filter partitions."""
+
+    def test_created_time_partitions_cover_everything(self):
+        """Test the first and last ranges are open-ended and the middle ones chain."""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2024, 1, 5, tzinfo=timezone.utc)
+
+        partitions = created_time_partitions(start, end, 4)
+
+        assert len(partitions) == 4
+        assert partitions[0]["created_time"] == {"before": "2024-01-02T00:00:00+00:00"}
+        assert partitions[1]["and"][0]["created_time"] == {"on_or_after": "2024-01-02T00:00:00+00:00"}
+        assert partitions[1]["and"][1]["created_time"] == {"before": "2024-01-03T00:00:00+00:00"}
+        assert partitions[3]["created_time"] == {"on_or_after": "2024-01-04T00:00:00+00:00"}
+        assert created_time_partitions(start, end, 1) == []
+
+    def test_option_partitions_include_empty_and_unknown(self):
+        """Test pages without a value or with an unlisted option are still covered."""
+        partitions = option_partitions("ICP", ["1", "2"])
+
+        assert partitions[:2] == [
+            {"property": "ICP", "select": {"equals": "1"}},
+            {"property": "ICP", "select": {"equals": "2"}},
+        ]
+        assert partitions[2] == {"property": "ICP", "select": {"is_empty": True}}
+        assert partitions[3]["and"][1:] == [
+            {"property": "ICP", "select": {"does_not_equal": "1"}},
+            {"property": "ICP", "select": {"does_not_equal": "2"}},
+        ]
+        assert option_partitions("Status", ["Lead"], kind="status")[0] == {
+            "property": "Status", "status": {"equals": "Lead"},
+        }
+
+    @pytest.mark.asyncio
+    async def test_scan_merges_and_deduplicates(self, mock_env_vars):
+        """Test every partition is paginated and pages seen twice are yielded once."""
+        partitions = option_partitions("ICP", ["1", "2"])
+        responses = {
+            '{"equals": "1"}': [_query_response([{"id": "a"}], cursor="c1"), _query_response([{"id": "b"}])],
+            '{"equals": "2"}': [_query_response([{"id": "c"}, {"id": "a"}])],
+        }
+
+        async def request(method, path, body):
+            key = json.dumps(body["filter"]["and"][1].get("select", {}))
+            queue = responses.get(key)
+            return queue.pop(0) if queue else _query_response([])
+
+        payload = {"filter": {"property": "Website", "url": {"is_not_empty": True}}}
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=request)) as mock:
+            ids = [page["id"] async for page in notion_scan_database("db", payload, partitions)]
+
+        assert sorted(ids) == ["a", "b", "c"]
+        assert mock.await_count == 5
+        assert all(call.args[2]["filter"]["and"][0] == payload["filter"] for call in mock.await_args_list)
+
+    @pytest.mark.asyncio
+    async def test_scan_partition_error_raises(self, mock_env_vars):
+        """Test a failing partition fails the whole scan."""
+        async def request(method, path, body):
+            if body["filter"]["select"].get("is_empty"):
+                return {"status_code": 500, "error": "HTTP 500", "data": {}}
+            return _query_response([{"id": body["filter"]["select"].get("equals", "x")}])
+
+        partitions = option_partitions("ICP", ["1"])[:2]
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=request)):
+            with pytest.raises(NotionAPIError):
+                [page async for page in notion_scan_database("db", partitions=partitions)]
+
+    @pytest.mark.asyncio
+    async def test_scan_non_notion_error_raises(self, mock_env_vars):
+        """Test an unexpected exception in one partition fails the scan instead of hanging it."""
+        async def request(method, path, body):
+            if body["filter"]["select"].get("is_empty"):
+                raise KeyError("results")
+            return _query_response([{"id": body["filter"]["select"].get("equals", "x")}])
+
+        partitions = option_partitions("ICP", ["1"])[:2]
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=request)):
+            with pytest.raises(KeyError):
+                await asyncio.wait_for(
+                    _collect(notion_scan_database("db", partitions=partitions)), timeout=5
+                )
+
+    @pytest.mark.asyncio
+    async def test_scan_cancelled_partition_raises(self, mock_env_vars):
+        """Test a partition dying with a non-Exception error does not leave the consumer waiting."""
+        async def request(method, path, body):
+            if body["filter"]["select"].get("is_empty"):
+                raise asyncio.CancelledError()
+            return _query_response([{"id": "a"}])
+
+        partitions = option_partitions("ICP", ["1"])[:2]
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=request)):
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(
+                    _collect(notion_scan_database("db", partitions=partitions)), timeout=5
+                )
+
+    @pytest.mark.asyncio
+    async def test_full_mirror_sync_partitions_large_databases(self, mock_env_vars, monkeypatch):
+        """Test a full sync of a large database scans created_time ranges concurrently."""
+        monkeypatch.setattr(notion_module, "SCAN_PARTITION_MIN_PAGES", 0)
+        pages = [_company_page(f"page-{i}", f"site{i}.com") for i in range(3)]
+
+        async def request(method, path, body):
+            if "sorts" in body:
+                return _query_response([pages[0]])
+            return _query_response(pages)
+
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=request)) as mock:
+            result = await notion_sync_mirror("db", full=True)
+
+        assert result == {"mode": "full", "fetched": 3, "pages": 3}
+        # Oldest-page probe, then one cursor chain per partition
+        assert mock.await_count == 1 + notion_module.SCAN_PARTITIONS
+
+
+class TestBulkUpsertCompanies:
+    """Tests for the concurrent bulk upsert engine."""
+
+    @pytest.mark.asyncio
+    async def test_creates_updates_and_reports(self, mock_env_vars, monkeypatch):
+        """Test one lookup pass, then creates/updates with the summary shape."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        created = iter(["new-1", "new-2"])
+
+        async def fake_request(method, path, payload=None):
+            if path.endswith("/query"):
+                return _query_response([_company_page("existing", "https://vapi.ai")])
+            if method == "POST":
+                return {"status_code": 200, "data": _company_page(next(created), "x.ai")}
+            return {"status_code": 200, "data": _company_page(path.split("/")[1], "x.ai")}
+
+        request = AsyncMock(side_effect=fake_request)
+        progress = []
+        companies = [
+            {"name": "Vapi", "website": "vapi.ai", "icp": 3},
+            {"name": "Recept", "website": "https://recept.ai"},
+            {"name": "Recept AI", "website": "www.recept.ai", "vertical": "Voice AI"},
+            {"name": "Nowhere"},
+        ]
+
+        with patch("src.tools.notion._notion_request", request), \
+                patch("src.tools.notion_bulk._notion_request", request):
+            summary = await notion_bulk_upsert_companies(
+                companies, on_progress=lambda done, total, r: progress.append((done, total)),
+            )
+
+        assert (summary["created"], summary["updated"], summary["failed"]) == (1, 2, 1)
+        assert summary["total"] == 4 and summary["success"] is False
+        assert [r["action"] for r in summary["results"]] == ["updated", "created", "updated", "failed"]
+        assert summary["results"][0]["page_id"] == "existing"
+        # Second Recept entry updates the page the first one created
+        assert summary["results"][2]["page_id"] == "new-1"
+        assert sorted(progress) == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+        calls = [(c.args[0], c.args[1]) for c in request.await_args_list]
+        assert sum(path.endswith("/query") for _, path in calls) == 1
+
+        create = next(c.args[2] for c in request.await_args_list if c.args[:2] == ("POST", "pages"))
+        assert create["properties"]["Website"] == {"url": "https://recept.ai"}
+        assert create["properties"]["ICP"] == {"select": {"name": "3"}}
+        assert create["properties"]["Status / Engagement"] == {"select": {"name": "Ice Box"}}
+        update = next(c.args[2] for c in request.await_args_list if c.args[1] == "pages/existing")
+        assert "Status / Engagement" not in update["properties"]
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_creates_nothing(self, mock_env_vars, monkeypatch):
+        """Test entries whose duplicate check errored fail instead of being created."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+
+        async def fake_request(method, path, payload=None):
+            if path.endswith("/query"):
+                return {"error": "HTTP 503", "status_code": 503, "data": None}
+            return {"status_code": 200, "data": _company_page("new", "x.ai")}
+
+        request = AsyncMock(side_effect=fake_request)
+        companies = [{"name": "Vapi", "website": "vapi.ai"}, {"name": "Recept", "website": "recept.ai"}]
+
+        with patch("src.tools.notion._notion_request", request), \
+                patch("src.tools.notion_bulk._notion_request", request):
+            summary = await notion_bulk_upsert_companies(companies)
+
+        assert summary["failed"] == 2 and summary["created"] == 0
+        assert all("Duplicate check failed" in r["error"] for r in summary["results"])
+        assert not any(c.args[0] == "POST" and c.args[1] == "pages" for c in request.await_args_list)
+
+
+class TestPropertyDiff:
+    """Tests for skipping no-op property writes."""
+
+    def test_only_changed_properties(self):
+        """Test unchanged values are dropped, ignoring list order and empties."""
+        page = {
+            "id": "p1",
+            "properties": {
+                "Company_Name": {"type": "title", "title": [{"plain_text": "Vapi"}]},
+                "ICP": {"type": "select", "select": {"name": "3"}},
+                "ASR provider": {"type": "multi_select", "multi_select": [{"name": "A"}, {"name": "B"}]},
+                "Main Office Country": {"type": "rich_text", "rich_text": []},
+            },
+        }
+        outgoing = {
+            "Company_Name": {"title": [{"text": {"content": "Vapi"}}]},
+            "ICP": {"select": {"name": "2"}},
+            "ASR provider": {"multi_select": [{"name": "B"}, {"name": "A"}]},
+            "Main Office Country": {"rich_text": [{"text": {"content": ""}}]},
+            "Vertical": {"select": {"name": "Voice AI"}},
+        }
+        before = get_notion_write_stats()
+
+        changed = diff_properties(outgoing, page)
+
+        assert set(changed) == {"ICP", "Vertical"}
+        after = get_notion_write_stats()
+        assert after["properties_skipped"] - before["properties_skipped"] == 3
+        assert after["writes_sent"] - before["writes_sent"] == 1
+
+    @pytest.mark.asyncio
+    async def test_update_skipped_when_unchanged(self, mock_env_vars):
+        """Test notion_update_company sends nothing for a no-op update."""
+        current = _company_page("p1", "https://vapi.ai")
+        request = AsyncMock()
+        before = get_notion_write_stats()["writes_skipped"]
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await notion_update_company("p1", {"website": "https://vapi.ai"}, current=current)
+
+        assert result["id"] == "p1"
+        request.assert_not_awaited()
+        assert get_notion_write_stats()["writes_skipped"] == before + 1
+
+    @pytest.mark.asyncio
+    async def test_update_sends_changed_subset(self, mock_env_vars):
+        """Test only changed properties are PATCHed."""
+        current = _company_page("p1", "https://vapi.ai")
+        request = AsyncMock(return_value={"status_code": 200, "data": current})
+
+        with patch("src.tools.notion._notion_request", request):
+            await notion_update_company("p1", {"website": "https://vapi.ai", "icp": "3"}, current=current)
+
+        assert request.await_args.args[2] == {"properties": {"ICP": {"select": {"name": "3"}}}}
+
+    @pytest.mark.asyncio
+    async def test_bulk_reports_unchanged(self, mock_env_vars, monkeypatch):
+        """Test bulk upserts skip pages that already match."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        page = _company_page("p1", "https://vapi.ai")
+        page["properties"]["Company_Name"]["title"] = [{"plain_text": "Vapi"}]
+        page["properties"]["ICP"] = {"type": "select", "select": {"name": "3"}}
+        request = AsyncMock(return_value=_query_response([page]))
+
+        with patch("src.tools.notion._notion_request", request), \
+                patch("src.tools.notion_bulk._notion_request", request):
+            summary = await notion_bulk_upsert_companies([{"name": "Vapi", "website": "vapi.ai"}])
+
+        assert set(summary) == {"success", "total", "created", "updated", "failed", "results"}
+        assert summary["updated"] == 1
+        assert summary["results"][0]["action"] == "updated"
+        assert summary["results"][0]["unchanged"] is True
+        assert request.await_count == 1
+
+
+class TestWriteBehind:
+    """Tests for coalescing buffered page updates."""
+
+    @pytest.mark.asyncio
+    async def test_updates_merged_into_one_patch(self, mock_env_vars):
+        """Test consecutive updates of a page are sent as one PATCH on flush."""
+        page = _company_page("p1", "https://vapi.ai")
+        request = AsyncMock(return_value={"status_code": 200, "data": page})
+        start_write_behind(window=60)
+
+        with patch("src.tools.notion._notion_request", request):
+            first = await notion_update_company("p1", {"icp": "1"})
+            await notion_update_company("p1", {"asr_providers": ["Deepgram"]})
+            await notion_update_company("p1", {"ai_ml_engineers": 4, "icp": "2"})
+            request.assert_not_awaited()
+            failed = await flush_notion_writes()
+
+        assert first["queued"] is True
+        assert failed == []
+        request.assert_awaited_once()
+        method, path, payload = request.await_args.args
+        assert (method, path) == ("PATCH", "pages/p1")
+        assert payload["properties"]["ICP"] == {"select": {"name": "2"}}
+        assert set(payload["properties"]) == {"ICP", "ASR provider", "Nbr of AI/ML/Speech engineer"}
+
+    @pytest.mark.asyncio
+    async def test_window_flushes_and_wait_returns_result(self, mock_env_vars):
+        """Test the window timer flushes and waiting callers get the page."""
+        page = _company_page("p1", "https://vapi.ai")
+        request = AsyncMock(return_value={"status_code": 200, "data": page})
+        start_write_behind(window=0.01)
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await notion_update_company("p1", {"icp": "1"}, wait=True)
+
+        assert result["id"] == "p1"
+        request.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_callers(self, mock_env_vars):
+        """Test failed flushes go to their own waiter, or to the final flush when nobody waits."""
+        request = AsyncMock(return_value={"error": "HTTP 400", "detail": "validation_error"})
+        buffer = start_write_behind(window=60)
+
+        with patch("src.tools.notion._notion_request", request):
+            future = buffer.enqueue("p1", {"ICP": {"select": {"name": "9"}}})
+            await buffer.flush()
+            detached = await notion_update_company("p2", {"icp": "1"})
+            await buffer.flush()
+            receipt = await notion_update_company("p3", {"icp": "2"})
+            failed = await flush_notion_writes()
+
+        assert "error" in future.result()
+        assert "failed_updates" not in receipt
+        assert detached["queued"] is True
+        assert [(f["page_id"], f["properties"]) for f in failed] == [("p2", ["ICP"]), ("p3", ["ICP"])]
+
+    @pytest.mark.asyncio
+    async def test_flush_waits_for_patch_in_flight(self, mock_env_vars):
+        """Test flush waits for a PATCH a window timer already started."""
+        page = _company_page("p1", "https://vapi.ai")
+        started = asyncio.Event()
+        finished = []
+
+        async def request(method, path, payload):
+            started.set()
+            await asyncio.sleep(0.05)
+            finished.append(path)
+            return {"status_code": 200, "data": page}
+
+        start_write_behind(window=0)
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=request)):
+            await notion_update_company("p1", {"icp": "1"})
+            await started.wait()
+            await flush_notion_writes()
+
+        assert finished == ["pages/p1"]
+
+
+def _database_response() -> dict:
+    return {"status_code": 200, "data": {
+        "object": "database",
+        "properties": {
+            "Company_Name": {"id": "title", "type": "title", "title": {}},
+            "Website": {"id": "W%3Ab", "type": "url", "url": {}},
+            "ICP": {"id": "%3FIcP", "type": "select", "select": {
+                "options": [{"name": "1"}, {"name": "2"}, {"name": "3"}],
+            }},
+            "ASR provider": {"type": "multi_select", "multi_select": {"options": [{"name": "Deepgram"}]}},
+            "Status / Engagement": {"type": "status", "status": {"options": [{"name": "Ice Box"}]}},
+            "Created": {"type": "created_time", "created_time": {}},
+        },
+    }}
+
+
+class TestSchemaValidation:
+    """Tests for validating writes against the cached database schema."""
+
+    def test_validate_payload(self):
+        """Test unknown names, wrong types, read-only and unknown options are reported."""
+        schema = NotionSchema.from_database(_database_response()["data"])
+
+        problems = schema.validate({
+            "Company_Name": {"title": [{"text": {"content": "Vapi"}}]},
+            "ICP": {"select": {"name": "7"}},
+            "ASR provider": {"multi_select": [{"name": "Deepgram"}, {"name": "Whisper"}]},
+            "Status / Engagement": {"select": {"name": "Ice Box"}},
+            "Created": {"created_time": "2024-01-01"},
+            "Vertical": {"select": {"name": "Voice AI"}},
+        })
+
+        assert len(problems) == 5
+        assert any("'7'" in p for p in problems)
+        assert any("'Whisper'" in p for p in problems)
+        assert any("status property, got select" in p for p in problems)
+        assert any("unknown property 'Vertical'" in p for p in problems)
+        assert schema.validate({"ICP": {"select": {"name": "2"}}, "ASR provider": {"multi_select": []}}) == []
+
+    def test_cache_persists_with_ttl(self, tmp_path):
+        """Test schemas are reloaded from disk until the TTL expires."""
+        SchemaCache(tmp_path).put("db-1", _database_response()["data"])
+
+        assert SchemaCache(tmp_path).get("db1").properties["ICP"]["options"] == ["1", "2", "3"]
+        assert SchemaCache(tmp_path, ttl=0).get("db-1") is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_save_rejected_without_write(self, mock_env_vars, monkeypatch):
+        """Test a bad option fails locally; the schema is fetched once per process."""
+        monkeypatch.setenv("NOTION_SCHEMA_VALIDATION", "1")
+        request = AsyncMock(return_value=_database_response())
+
+        with patch("src.tools.notion._notion_request", request):
+            first = await notion_save_company("Vapi", "https://vapi.ai", icp="7")
+            second = await notion_update_company("p1", {"icp": "9"})
+
+        assert first["error"] == "Invalid Notion properties"
+        assert "'7'" in first["detail"][0]
+        assert second["error"] == "Invalid Notion properties"
+        request.assert_awaited_once()
+        assert request.await_args.args[:2] == ("GET", "databases/test-database-id")
+        assert get_notion_write_stats()["writes_rejected"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_icp_update_validated_against_manager_database(self, mock_env_vars, monkeypatch):
+        """Test update_company_icp checks the manager's Companies database, not the default."""
+        monkeypatch.setenv("NOTION_SCHEMA_VALIDATION", "1")
+        request = AsyncMock(return_value=_database_response())
+        contacts = AsyncNotionContactManager(people_db="people-db", companies_db="companies-db")
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await contacts.update_company_icp("p1", "9")
+
+        assert result["success"] is False
+        assert result["error"] == "Invalid Notion properties"
+        assert request.await_args.args[:2] == ("GET", "databases/companies-db")
+
+    @pytest.mark.asyncio
+    async def test_persisted_schema_rechecked_before_rejecting(self, mock_env_vars, monkeypatch, tmp_path):
+        """Test an option missing from a persisted schema is checked against the API once."""
+        monkeypatch.setenv("NOTION_SCHEMA_VALIDATION", "1")
+        stale = _database_response()["data"]
+        stale["properties"]["ICP"]["select"]["options"] = [{"name": "1"}]
+        SchemaCache(tmp_path / "mirrors").put("test-database-id", stale)
+        page = _company_page("p1", "https://vapi.ai")
+        request = AsyncMock(side_effect=[_database_response(), {"status_code": 200, "data": page}])
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await notion_save_company("Vapi", "https://vapi.ai", icp="3")
+
+        assert result["id"] == "p1"
+        assert [c.args[0] for c in request.await_args_list] == ["GET", "POST"]
+
+
+def _user(user_id: str, name: str) -> dict:
+    return {"object": "user", "id": user_id, "type": "person", "name": name,
+            "person": {"email": f"{user_id}@example.com"}}
+
+
+class TestPropertyProjection:
+    """Tests for fetching only the properties a caller reads."""
+
+    @pytest.mark.asyncio
+    async def test_names_map_to_schema_ids(self, mock_env_vars, monkeypatch):
+        """Test names resolve through the cached schema, and unknown names disable projection."""
+        monkeypatch.setenv("NOTION_PROJECTION", "1")
+        request = AsyncMock(return_value=_database_response())
+
+        with patch("src.tools.notion._notion_request", request):
+            ids = await property_projection("db", ["Company_Name", "Website", "ICP"])
+            unknown = await property_projection("db", ["Company_Name", "Notes"])
+
+        assert ids == ["title", "W%3Ab", "%3FIcP"]
+        assert unknown is None
+        request.assert_awaited_once()
+
+        monkeypatch.setenv("NOTION_PROJECTION", "0")
+        assert await property_projection("db", ["Website"]) is None
+
+    @pytest.mark.asyncio
+    async def test_live_company_lookup_is_projected(self, mock_env_vars, monkeypatch):
+        """Test a live domain lookup fetches only the properties the result uses."""
+        monkeypatch.setenv("NOTION_PROJECTION", "1")
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        page = _company_page("a", "https://vapi.ai")
+
+        async def respond(method, path, payload=None):
+            if method == "GET":
+                return _database_response()
+            return _query_response([page])
+
+        request = AsyncMock(side_effect=respond)
+        with patch("src.tools.notion._notion_request", request):
+            result = await AsyncNotionContactManager(companies_db="db").get_company_by_domain("vapi.ai")
+
+        assert result["found"] is True
+        query_path = request.await_args.args[1]
+        assert query_path == (
+            "databases/db/query?filter_properties=title&filter_properties=%3FIcP&filter_properties=W%3Ab"
+        )
+
+    @pytest.mark.asyncio
+    async def test_company_lookup_error_is_not_a_miss(self, mock_env_vars, monkeypatch):
+        """Test a failed domain lookup returns the error instead of found=False."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        request = AsyncMock(return_value={"status_code": 503, "error": "HTTP 503", "data": {}})
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await AsyncNotionContactManager(companies_db="db").get_company_by_domain("vapi.ai")
+
+        assert result["error"] == "Notion API error: 503"
+        assert "found" not in result
+
+
+class TestUserDirectory:
+    """Tests for resolving owners through the persisted user directory."""
+
+    @pytest.mark.asyncio
+    async def test_lists_all_pages_then_serves_locally(self, mock_env_vars):
+        """Test every users page is listed once and later lookups need no request."""
+        request = AsyncMock(side_effect=[
+            {"status_code": 200, "data": {"results": [_user("u1", "Ada")], "has_more": True, "next_cursor": "c2"}},
+            {"status_code": 200, "data": {"results": [_user("u2", "Benjamin Lalanne")], "has_more": False}},
+        ])
+
+        with patch("src.tools.notion._notion_request", request):
+            assert await notion_find_user("Benjamin Lalanne") == "u2"
+            assert await notion_find_user("ada") == "u1"
+            assert await notion_find_user("Nobody") is None
+
+        assert request.await_count == 2
+        assert [c.args for c in request.await_args_list] == [
+            ("GET", "users?page_size=100"),
+            ("GET", "users?page_size=100&start_cursor=c2"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_persisted_directory_reused(self, mock_env_vars, tmp_path):
+        """Test a fresh directory from an earlier process answers without a request."""
+        NotionUserDirectory(tmp_path / "mirrors" / "users.json").replace([_user("u1", "Ada")])
+        request = AsyncMock(return_value={"status_code": 200, "data": {"results": [], "has_more": False}})
+
+        with patch("src.tools.notion._notion_request", request):
+            assert await notion_find_user("Ada") == "u1"
+            request.assert_not_awaited()
+            # Unknown names are checked against the API once per process
+            assert await notion_find_user("Grace") is None
+            assert await notion_find_user("Grace") is None
+
+        request.assert_awaited_once()
+
+
+def _contact_page(page_id: str, name: str, linkedin: str) -> dict:
+    return {
+        "id": page_id,
+        "object": "page",
+        "properties": {
+            "Contact_Name": {"type": "title", "title": [{"plain_text": name}]},
+            "LinkedIn URL": {"type": "url", "url": linkedin},
+            "Email": {"type": "email", "email": None},
+            "Role": {"type": "rich_text", "rich_text": [{"plain_text": "CTO"}]},
+        },
+    }
+
+
+class TestAsyncContactManager:
+    """Tests for People database operations on the shared client."""
+
+    @pytest.mark.asyncio
+    async def test_check_duplicate(self, mock_env_vars, monkeypatch):
+        """Test a live check matches any form of the URL, not just the stored one."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        pages = [
+            _contact_page("c1", "Adam", "https://linkedin.com/in/adam"),
+            _contact_page("c2", "Ada", "https://www.linkedin.com/in/ada/"),
+        ]
+        request = AsyncMock(return_value=_query_response(pages))
+        contacts = AsyncNotionContactManager(people_db="people-db")
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await contacts.check_duplicate_by_linkedin("fr.linkedin.com/in/Ada?trk=public")
+
+        assert result == {"exists": True, "page_id": "c2", "name": "Ada", "url": "https://notion.so/c2"}
+        method, path, payload = request.await_args.args
+        assert path == "databases/people-db/query"
+        assert payload["filter"] == {"property": "LinkedIn URL", "url": {"contains": "ada"}}
+
+    @pytest.mark.asyncio
+    async def test_bulk_duplicate_checks_use_index(self, mock_env_vars):
+        """Test bulk checks cost one mirror sync and new contacts join the index."""
+        pages = [_contact_page("c1", "Ada", "https://linkedin.com/in/ada")]
+        for page in pages:
+            page["parent"] = {"type": "database_id", "database_id": "people-db"}
+        request = AsyncMock(return_value=_query_response(pages))
+        contacts = AsyncNotionContactManager(people_db="people-db")
+
+        with patch("src.tools.notion._notion_request", request):
+            results = await contacts.check_duplicates_by_linkedin([
+                "https://www.linkedin.com/in/ada/",
+                "linkedin.com/in/grace",
+                "https://example.com/ada",
+            ])
+            notion_module._mirror_page({**_contact_page("c2", "Grace", "https://linkedin.com/in/Grace/"),
+                                        "parent": {"database_id": "people-db"}})
+            grace = await contacts.check_duplicate_by_linkedin("https://linkedin.com/in/grace")
+
+        assert results["https://www.linkedin.com/in/ada/"]["page_id"] == "c1"
+        assert results["linkedin.com/in/grace"]["exists"] is False
+        assert results["https://example.com/ada"]["exists"] is False
+        assert grace["page_id"] == "c2"
+        request.assert_awaited_once()
+
+    @pytest.mark.parametrize("url,expected", [
+        ("https://www.linkedin.com/in/Ada-Lovelace/", "in/ada-lovelace"),
+        ("http://fr.linkedin.com/in/ada-lovelace?originalSubdomain=fr", "in/ada-lovelace"),
+        ("linkedin.com/in/ada%2Dlovelace#about", "in/ada-lovelace"),
+        ("https://m.linkedin.com/company/krisp/about/", "company/krisp"),
+        ("https://example.com/in/ada", ""),
+        ("", ""),
+    ])
+    def test_normalize_linkedin_url(self, url, expected):
+        """Test URL forms of the same profile share one key."""
+        assert normalize_linkedin_url(url) == expected
+
+    @pytest.mark.asyncio
+    async def test_add_contact_resolves_owner_and_company(self, mock_env_vars):
+        """Test the owner comes from the user directory and the company ID from its URL."""
+        request = AsyncMock(side_effect=[
+            {"status_code": 200, "data": {"results": [_user("u1", "Benjamin Lalanne")], "has_more": False}},
+            {"status_code": 200, "data": {"id": "c9"}},
+        ])
+        contacts = AsyncNotionContactManager(people_db="people-db")
+
+        with patch("src.tools.notion._notion_request", request), \
+                patch("src.tools.notion_contacts._notion_request", request):
+            result = await contacts.add_contact(
+                name="Ada",
+                role="CTO",
+                company_page_url="https://www.notion.so/Vapi-0123456789abcdef0123456789abcdef",
+                linkedin_url="https://linkedin.com/in/ada",
+            )
+
+        assert result["success"] is True and result["page_id"] == "c9"
+        properties = request.await_args.args[2]["properties"]
+        assert properties["Owner / Assigned To"] == {"people": [{"id": "u1"}]}
+        assert properties["Company name"] == {"relation": [{"id": "01234567-89ab-cdef-0123-456789abcdef"}]}
+
+    @pytest.mark.asyncio
+    async def test_prefetch_joins_contacts_to_companies(self, mock_env_vars, monkeypatch):
+        """Test one load per database resolves contacts onto their companies."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        companies = [_company_page("a-1", "https://www.vapi.ai"), _company_page("b-2", "krisp.ai")]
+        linked = _contact_page("p1", "Ada", "https://linkedin.com/in/ada")
+        linked["properties"]["Company name"] = {"type": "relation", "relation": [{"id": "a1"}]}
+        emailed = _contact_page("p2", "Grace", "https://linkedin.com/in/grace")
+        emailed["properties"]["Company name"] = {"type": "relation", "relation": [{"id": "a-1"}]}
+        emailed["properties"]["Email"]["email"] = "grace@vapi.ai"
+        orphan = _contact_page("p3", "Alan", "https://linkedin.com/in/alan")
+
+        async def respond(method, path, payload=None):
+            if path == "databases/companies-db/query":
+                return _query_response(companies)
+            return _query_response([linked, emailed, orphan])
+
+        request = AsyncMock(side_effect=respond)
+        contacts = AsyncNotionContactManager(people_db="people-db", companies_db="companies-db")
+
+        with patch("src.tools.notion._notion_request", request):
+            account = await contacts.get_account("https://vapi.ai/")
+            missing = await contacts.get_contacts_without_email()
+
+        assert account["found"] is True
+        assert account["company"]["page_id"] == "a-1"
+        assert [c["name"] for c in account["company"]["contacts"]] == ["Ada", "Grace"]
+        assert request.await_count == 4
+        assert [(c["name"], c["company"], c["domain"]) for c in missing["contacts"]] == [
+            ("Ada", "a-1", "vapi.ai"),
+            ("Alan", None, ""),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_prefetch_reads_engagement_status(self, mock_env_vars, monkeypatch):
+        """Test the projected company load fetches and reads "Status / Engagement"."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        monkeypatch.setenv("NOTION_PROJECTION", "1")
+        company = _company_page("a-1", "https://vapi.ai")
+        company["properties"]["ICP"] = {"id": "%3FIcP", "type": "select", "select": {"name": "1"}}
+        company["properties"]["Status / Engagement"] = {
+            "id": "St%3Dg", "type": "status", "status": {"name": "Contacted"},
+        }
+        schema = _database_response()
+        schema["data"]["properties"]["Status / Engagement"]["id"] = "St%3Dg"
+
+        async def respond(method, path, payload=None):
+            if method == "GET":
+                return schema
+            if path.startswith("databases/companies-db/query"):
+                return _query_response([company])
+            return _query_response([])
+
+        request = AsyncMock(side_effect=respond)
+        contacts = AsyncNotionContactManager(people_db="people-db", companies_db="companies-db")
+
+        with patch("src.tools.notion._notion_request", request):
+            account = await contacts.get_account("vapi.ai")
+
+        assert account["company"]["status"] == "Contacted"
+        assert account["company"]["icp"] == "1"
+        paths = [c.args[1] for c in request.await_args_list if c.args[1].startswith("databases/companies-db/query")]
+        assert paths and all("filter_properties=St%3Dg" in path for path in paths)
+
+    @pytest.mark.asyncio
+    async def test_prefetch_reports_errors(self, mock_env_vars, monkeypatch):
+        """Test a failed load returns the tool error instead of a partial join."""
+        monkeypatch.setenv("NOTION_MIRROR_MAX_STALENESS", "0")
+        request = AsyncMock(return_value={"status_code": 500, "error": "HTTP 500", "data": {}})
+        contacts = AsyncNotionContactManager(people_db="people-db", companies_db="companies-db")
+
+        with patch("src.tools.notion._notion_request", request):
+            result = await contacts.get_contacts_without_email()
+
+        assert result["error"] == "Notion API error: 500"
+
+    @pytest.mark.asyncio
+    async def test_people_database_required(self, mock_env_vars, monkeypatch):
+        """Test contact operations report a missing People database ID."""
+        monkeypatch.delenv("NOTION_PEOPLE_DATABASE_ID", raising=False)
+
+        result = await AsyncNotionContactManager().search_contacts_by_name("Ada")
+
+        assert result == {"error": "NOTION_PEOPLE_DATABASE_ID not configured"}
+
+
+def _snapshot_company(page_id: str, name: str, description: str, icp: str, asr: list, country: str) -> dict:
+    page = _company_page(page_id, f"https://{name.lower()}.ai")
+    page["properties"].update({
+        "Company_Name": {"type": "title", "title": [{"plain_text": name}]},
+        "Product description": {"type": "rich_text", "rich_text": [{"plain_text": description}]},
+        "Vertical": {"type": "select", "select": {"name": "Voice AI"}},
+        "ICP": {"type": "select", "select": {"name": icp}},
+        "ASR provider": {"type": "multi_select", "multi_select": [{"name": a} for a in asr]},
+        "Main Office Country": {"type": "rich_text", "rich_text": [{"plain_text": country}]},
+    })
+    return page
+
+
+class TestNotionSnapshot:
+    """Tests for the offline SQLite snapshot."""
+
+    async def _export(self, monkeypatch) -> dict:
+        monkeypatch.setenv("NOTION_PEOPLE_DATABASE_ID", "people-db")
+        companies = [
+            _snapshot_company("a", "Vapi", "Voice agents platform", "3", ["Deepgram"], "France"),
+            _snapshot_company("b", "Krisp", "Noise cancellation", "1", ["Deepgram"], "USA"),
+            _snapshot_company("c", "Alan", "Voice agents for insurance", "3", ["Whisper"], "France"),
+        ]
+        person = _contact_page("p1", "Ada", "https://linkedin.com/in/ada")
+        person["properties"]["Company name"] = {"type": "relation", "relation": [{"id": "a"}]}
+
+        async def respond(method, path, payload=None):
+            return _query_response([person] if "people-db" in path else companies)
+
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=respond)):
+            return await notion_export_snapshot()
+
+    @pytest.mark.asyncio
+    async def test_export_flattens_and_relates(self, mock_env_vars, monkeypatch):
+        """Test ad-hoc SQL over flattened columns and relation rows."""
+        result = await self._export(monkeypatch)
+        snapshot = notion_module.get_snapshot()
+
+        assert result["tables"] == {"companies": 3, "people": 1}
+        rows = snapshot.query(
+            "SELECT company_name FROM companies WHERE icp = '3' "
+            "AND asr_provider LIKE '%Deepgram%' AND main_office_country = 'France'"
+        )
+        assert rows == [{"company_name": "Vapi"}]
+        joined = snapshot.query(
+            "SELECT p.contact_name, c.company_name FROM relations r "
+            "JOIN people p ON p.id = r.page_id JOIN companies c ON c.id = r.target_id"
+        )
+        assert joined == [{"contact_name": "Ada", "company_name": "Vapi"}]
+
+    @pytest.mark.asyncio
+    async def test_search_served_from_snapshot(self, mock_env_vars, monkeypatch):
+        """Test notion_search uses full-text search on a fresh snapshot without requests."""
+        await self._export(monkeypatch)
+        request = AsyncMock()
+
+        with patch("src.tools.notion._notion_request", request):
+            found = await notion_search("voice agent")
+            filtered = await notion_search("fran", filter_property="Main Office Country")
+
+        request.assert_not_awaited()
+        assert sorted(p["id"] for p in found["results"]) == ["a", "c"]
+        assert [p["id"] for p in filtered["results"]] == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_and_local_writes(self, mock_env_vars, monkeypatch):
+        """Test writes update the snapshot and stale snapshots are not used."""
+        await self._export(monkeypatch)
+        notion_module._mirror_page(
+            _snapshot_company("d", "Gladia", "Voice agents API", "3", ["Gladia"], "France")
+        )
+        assert len(notion_module.get_snapshot().search("companies", "gladia")) == 1
+
+        monkeypatch.setenv("NOTION_SNAPSHOT_MAX_AGE", "0")
+        assert notion_module._fresh_snapshot("test-database-id") is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failure", [
+        {"status_code": 500, "error": "HTTP 500", "data": {}},
+        RuntimeError("boom"),
+    ])
+    async def test_failed_export_stops_other_tables(self, mock_env_vars, monkeypatch, tmp_path, failure):
+        """Test a failing table cancels the others and removes the partial file."""
+        monkeypatch.setenv("NOTION_PEOPLE_DATABASE_ID", "people-db")
+        people_requests = []
+
+        async def respond(method, path, payload=None):
+            if "people-db" in path:
+                await asyncio.sleep(0.01)
+                people_requests.append(path)
+                return _query_response([{"id": f"p{len(people_requests)}"}], cursor="more")
+            await asyncio.sleep(0.02)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+
+        snapshot_path = tmp_path / "out.sqlite3"
+        with patch("src.tools.notion._notion_request", AsyncMock(side_effect=respond)):
+            if isinstance(failure, Exception):
+                with pytest.raises(RuntimeError):
+                    await notion_export_snapshot(path=snapshot_path)
+            else:
+                result = await notion_export_snapshot(path=snapshot_path)
+                assert result["error"] == "Notion API error: 500"
+            sent = len(people_requests)
+            await asyncio.sleep(0.05)
+
+        assert len(people_requests) == sent
+        assert not (tmp_path / "out.sqlite3.partial").exists()
+        assert not snapshot_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_query_is_read_only(self, mock_env_vars, monkeypatch):
+        """Test ad-hoc SQL cannot modify the snapshot."""
+        await self._export(monkeypatch)
+        snapshot = notion_module.get_snapshot()
+
+        with pytest.raises(sqlite3.OperationalError):
+            snapshot.query("DELETE FROM companies")
+        with pytest.raises(sqlite3.OperationalError):
+            snapshot.query("DROP TABLE people")
+        assert snapshot.query("SELECT COUNT(*) AS n FROM companies") == [{"n": 3}]
+
+    def test_clashing_property_columns_kept_apart(self, tmp_path):
+        """Test properties sanitizing to one column name get suffixed columns, also after reopening."""
+        page = {
+            "id": "a",
+            "properties": {
+                "ASR provider": {"type": "rich_text", "rich_text": [{"plain_text": "Deepgram"}]},
+                "ASR-provider": {"type": "rich_text", "rich_text": [{"plain_text": "Whisper"}]},
+                "ID": {"type": "rich_text", "rich_text": [{"plain_text": "X-1"}]},
+            },
+        }
+        snapshot = NotionSnapshot(tmp_path / "snapshot.sqlite3")
+        snapshot.begin_table("companies", "db")
+        snapshot.write_pages("companies", [page])
+        snapshot.close()
+
+        reopened = NotionSnapshot(tmp_path / "snapshot.sqlite3")
+        assert reopened.query("SELECT asr_provider, asr_provider_2, p_id FROM companies") == [
+            {"asr_provider": "Deepgram", "asr_provider_2": "Whisper", "p_id": "X-1"},
+        ]
+        assert [p["id"] for p in reopened.filter("companies", "ASR-provider", "Whisper", exact=True)] == ["a"]
+
+
+REPORT = """# Vapi Deep Dive
+
+**Domain:** vapi.ai
+See [site](https://vapi.ai) and [below](#stack).
+
+---
+
+## Stack
+
+- Uses `Deepgram` for *streaming*
+1. Call [CTO](https://linkedin.com/in/cto)
+
+| Attribute | Value |
+|-----------|-------|
+| **Founded** | 2023 |
+| HQ | San Francisco | extra |
+
+```python
+print("hi")
+```
+"""
+
+
+def _text_of(block: dict) -> str:
+    return "".join(item["text"]["content"] for item in block[block["type"]]["rich_text"])
+
+
+def _as_listed(block: dict, block_id: str) -> dict:
+    """A block we sent, as the children listing returns it."""
+    data = block[block["type"]]
+    listed = {key: value for key, value in data.items() if key != "children"}
+    if "rich_text" in listed:
+        listed["rich_text"] = [{**item, "plain_text": item["text"]["content"]} for item in listed["rich_text"]]
+    return {"object": "block", "id": block_id, "type": block["type"], block["type"]: listed}
+
+
+class TestMarkdownBlocks:
+    """Tests for converting and uploading markdown reports."""
+
+    def test_converts_report_structure(self):
+        """Test headings, paragraphs, lists, tables, code and inline formatting."""
+        blocks = markdown_to_blocks(REPORT)
+
+        assert [b["type"] for b in blocks] == [
+            "heading_1", "paragraph", "divider", "heading_2",
+            "bulleted_list_item", "numbered_list_item", "table", "code",
+        ]
+        paragraph = blocks[1]["paragraph"]["rich_text"]
+        assert paragraph[0] == {"type": "text", "text": {"content": "Domain:"}, "annotations": {"bold": True}}
+        assert _text_of(blocks[1]) == "Domain: vapi.ai\nSee site and below."
+        links = [item["text"].get("link") for item in paragraph]
+        assert {"url": "https://vapi.ai"} in links and links.count(None) == len(links) - 1
+
+        bullet = blocks[4]["bulleted_list_item"]["rich_text"]
+        assert [(i["text"]["content"], i.get("annotations")) for i in bullet] == [
+            ("Uses ", None), ("Deepgram", {"code": True}), (" for ", None), ("streaming", {"italic": True}),
+        ]
+
+        table = blocks[6]["table"]
+        assert table["table_width"] == 2 and table["has_column_header"] is True
+        rows = [[_text_of({"type": "c", "c": {"rich_text": cell}}) for cell in row["table_row"]["cells"]]
+                for row in table["children"]]
+        assert rows == [["Attribute", "Value"], ["Founded", "2023"], ["HQ", "San Francisco"]]
+        assert blocks[7]["code"] == {
+            "rich_text": [{"type": "text", "text": {"content": 'print("hi")'}}], "language": "python",
+        }
+
+    def test_long_text_is_chunked(self):
+        """Test rich_text content never exceeds Notion's 2000 character limit."""
+        text = "word " * 1000
+        blocks = markdown_to_blocks(text)
+
+        lengths = [len(item["text"]["content"]) for item in blocks[0]["paragraph"]["rich_text"]]
+        assert max(lengths) == MAX_TEXT_LENGTH
+        assert sum(lengths) == len(text.strip())
+
+    def test_batches_respect_request_limits(self):
+        """Test at most 100 blocks, and 1000 elements including table rows, per append."""
+        paragraphs = markdown_to_blocks("\n\n".join(f"Paragraph {i}" for i in range(250)))
+        assert [len(batch) for batch in batch_blocks(paragraphs)] == [100, 100, 50]
+
+        table = "| A |\n|---|\n" + "\n".join(f"| {i} |" for i in range(99))
+        tables = markdown_to_blocks("\n\n".join([table] * 12))
+        assert [len(batch) for batch in batch_blocks(tables)] == [9, 3]
+
+    @pytest.mark.asyncio
+    async def test_upload_appends_in_batches(self, mock_env_vars):
+        """Test a fresh upload sends the marker and document in 100-block requests."""
+        markdown = "\n\n".join(f"Paragraph {i}" for i in range(150))
+        request = AsyncMock(side_effect=[
+            _query_response([]),
+            {"status_code": 200, "data": {}},
+            {"status_code": 200, "data": {}},
+        ])
+
+        with patch("src.tools.notion._notion_request", request), \
+                patch("src.tools.notion_blocks._notion_request", request):
+            result = await notion_append_markdown("page-1", markdown, "report.md")
+
+        assert result == {
+            "page_id": "page-1", "blocks": 150, "skipped": 0, "appended": 150, "removed": 0, "requests": 2,
+        }
+        listing, first, second = request.await_args_list
+        assert listing.args[:2] == ("GET", "blocks/page-1/children?page_size=100")
+        assert first.args[1] == "blocks/page-1/children"
+        assert first.args[2]["children"][0]["type"] == "callout"
+        assert len(first.args[2]["children"]) == 100
+        assert _text_of(second.args[2]["children"][-1]) == "Paragraph 149"
+
+    @pytest.mark.asyncio
+    async def test_interrupted_upload_resumes(self, mock_env_vars):
+        """Test blocks already on the page are skipped instead of appended again."""
+        markdown = "\n\n".join(f"Paragraph {i}" for i in range(150))
+        pages = {"page-1": []}
+
+        async def respond(method, path, payload=None):
+            if method == "GET":
+                return _query_response(pages["page-1"])
+            if len(pages["page-1"]) >= 100:
+                return {"status_code": 502, "error": "HTTP 502", "data": {}}
+            start = len(pages["page-1"])
+            pages["page-1"] += [_as_listed(b, f"b{start + i}") for i, b in enumerate(payload["children"])]
+            return {"status_code": 200, "data": {}}
+
+        request = AsyncMock(side_effect=respond)
+        with patch("src.tools.notion._notion_request", request), \
+                patch("src.tools.notion_blocks._notion_request", request):
+            interrupted = await notion_append_markdown("page-1", markdown, "report.md")
+            request.side_effect = lambda method, path, payload=None: (
+                _query_response(pages["page-1"]) if method == "GET" else {"status_code": 200, "data": {}}
+            )
+            resumed = await notion_append_markdown("page-1", markdown, "report.md")
+
+        assert interrupted["error"] == "Notion API error: 502" and interrupted["appended"] == 99
+        assert resumed["skipped"] == 99 and resumed["appended"] == 51
+        sent = request.await_args_list[-1].args[2]["children"]
+        assert _text_of(sent[0]) == "Paragraph 99"
+
+    @pytest.mark.asyncio
+    async def test_changed_document_is_not_duplicated(self, mock_env_vars):
+        """Test a different uploaded version is reported, or replaced on request."""
+        old = markdown_to_blocks("# Report\n\nOld text")
+        listed = [
+            {"object": "block", "id": "own", "type": "paragraph",
+             "paragraph": {"rich_text": [{"plain_text": "Notes"}]}},
+            {"object": "block", "id": "m", "type": "callout",
+             "callout": {"rich_text": [{"plain_text": "📊 Research report: report.md"}]}},
+            *(_as_listed(block, f"old-{i}") for i, block in enumerate(old)),
+        ]
+
+        async def respond(method, path, payload=None):
+            return _query_response(listed) if method == "GET" else {"status_code": 200, "data": {}}
+
+        request = AsyncMock(side_effect=respond)
+        with patch("src.tools.notion._notion_request", request), \
+                patch("src.tools.notion_blocks._notion_request", request):
+            refused = await notion_append_markdown("page-1", "# Report\n\nNew text", "report.md")
+            replaced = await notion_append_documents(
+                [{"page_id": "page-1", "markdown": "# Report\n\nNew text", "title": "report.md"}], replace=True,
+            )
+
+        assert refused["detail"]["differing_blocks"] == 1
+        assert replaced[0]["skipped"] == 1 and replaced[0]["removed"] == 1 and replaced[0]["appended"] == 1
+        calls = [(call.args[0], call.args[1]) for call in request.await_args_list]
+        assert ("DELETE", "blocks/old-1") in calls
+        assert ("DELETE", "blocks/own") not in calls
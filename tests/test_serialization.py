@@ -0,0 +1,128 @@
+"""Tests for compact tool-result serialization."""
+
+import json
+
+import pytest
+
+from src.serialization import (
+    TRUNCATION_MARK,
+    notion_property_value,
+    project_notion_page,
+    serialize_result,
+)
+
+
+NOTION_PAGE = {
+    "object": "page",
+    "id": "page-123",
+    "url": "https://www.notion.so/page-123",
+    "created_time": "2024-01-01T00:00:00.000Z",
+    "properties": {
+        "Company_Name": {"type": "title", "title": [{"plain_text": "Vapi"}]},
+        "Website": {"type": "url", "url": "https://vapi.ai"},
+        "ICP": {"type": "select", "select": {"name": "ICP 3"}},
+        "ASR provider": {"type": "multi_select", "multi_select": [{"name": "Deepgram"}]},
+    },
+}
+
+
+class TestProjection:
+    """Tests for per-tool field projection."""
+
+    def test_property_values(self):
+        """Test Notion property objects flatten to plain values."""
+        props = NOTION_PAGE["properties"]
+        assert notion_property_value(props["Company_Name"]) == "Vapi"
+        assert notion_property_value(props["ICP"]) == "ICP 3"
+        assert notion_property_value(props["ASR provider"]) == ["Deepgram"]
+        assert notion_property_value({"type": "select", "select": None}) is None
+
+    def test_notion_page(self):
+        """Test pages are reduced to id/url/name/website/ICP."""
+        assert project_notion_page(NOTION_PAGE) == {
+            "id": "page-123",
+            "url": "https://www.notion.so/page-123",
+            "name": "Vapi",
+            "website": "https://vapi.ai",
+            "icp": "ICP 3",
+        }
+
+    def test_exa_results(self):
+        """Test Exa results keep title/url/date and trimmed text."""
+        result = {
+            "autopromptString": "voice ai",
+            "results": [{
+                "id": "x",
+                "title": "Vapi",
+                "url": "https://vapi.ai",
+                "publishedDate": "2024-05-01T10:00:00.000Z",
+                "score": 0.9,
+                "text": "a" * 2000,
+            }],
+        }
+        data = json.loads(serialize_result("exa_web_search", result))
+
+        item = data["results"][0]
+        assert set(item) == {"title", "url", "published", "text"}
+        assert item["published"] == "2024-05-01"
+        assert len(item["text"]) == 500
+        assert item["text"].endswith(TRUNCATION_MARK)
+
+    def test_errors_not_projected(self):
+        """Test error payloads are passed through."""
+        result = {"error": "Notion API error: 400", "detail": {"code": "validation_error"}}
+        assert json.loads(serialize_result("notion_search_companies", result)) == result
+
+
+class TestSerialization:
+    """Tests for compact output and size budgets."""
+
+    def test_compact_json(self):
+        """Test output has no indentation or separator padding."""
+        text = serialize_result("n8n_enrich_company", {"name": "Vapi", "size": 50})
+        assert text == '{"name":"Vapi","size":50}'
+
+    def test_verbose_mode(self, monkeypatch):
+        """Test verbose mode returns the raw, indented payload."""
+        monkeypatch.setenv("TOOL_RESULTS_VERBOSE", "1")
+        text = serialize_result("notion_search_companies", {"results": [NOTION_PAGE]})
+        assert json.loads(text) == {"results": [NOTION_PAGE]}
+        assert "\n  " in text
+
+    def test_budget_drops_trailing_results(self):
+        """Test result lists are shortened to fit the budget."""
+        result = {
+            "results": [
+                {"title": f"Company {i}", "url": f"https://c{i}.com", "text": "x" * 400}
+                for i in range(40)
+            ]
+        }
+        text = serialize_result("exa_web_search", result)
+        data = json.loads(text)
+
+        assert len(text) <= 6000
+        assert data["omitted"] == 40 - len(data["results"])
+        assert data["results"][0]["title"] == "Company 0"
+
+    def test_budget_trims_long_text(self):
+        """Test a single oversized string is shortened to fit."""
+        result = {"title": "Page", "url": "https://x.com", "text": "y" * 50000}
+        text = serialize_result("browser_extract_text", result)
+        data = json.loads(text)
+
+        assert len(text) <= 15000
+        assert data["truncated"] is True
+        assert data["text"].endswith(TRUNCATION_MARK)
+
+    @pytest.mark.parametrize("result", [
+        {"workflow": {"nodes": [{"name": f"node {i}", "notes": "z" * 200} for i in range(200)]}},
+        [{"name": f"row {i}", "quote": '"' * 100} for i in range(200)],
+    ])
+    def test_budget_caps_nested_and_non_dict_results(self, result):
+        """Test payloads the list/string trimming cannot shrink are capped with a marker."""
+        text = serialize_result("n8n_enrich_company", result)
+        data = json.loads(text)
+
+        assert len(text) <= 8000
+        assert data["truncated"] is True
+        assert json.dumps(result, separators=(",", ":")).startswith(data["partial"])
@@ -1,13 +1,39 @@
 """Tests for utility functions."""
 
+import asyncio
+import sys
+import time
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 
 from src.utils import (
+    AdaptiveTimeoutConfig,
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    HedgeConfig,
+    HTTPPoolConfig,
+    LatencyTracker,
+    RateLimitConfig,
+    RateLimiter,
     RetryConfig,
     calculate_delay,
+    close_http_clients,
+    compute_timeout,
+    configure_http_pool,
+    endpoint_key,
+    get_circuit_breaker,
+    get_hedge_stats,
+    get_http_client,
+    get_latency_tracker,
+    get_timeout_metrics,
+    get_rate_limiter,
+    get_single_flight_stats,
     http_request,
+    parse_retry_after,
+    single_flight,
+    upstream_key,
 )
 
 
@@ -83,6 +109,12 @@ class TestCalculateDelay:
         for delay in delays:
             assert 2.0 <= delay <= 6.0
 
+    def test_retry_after_overrides_backoff(self):
+        """Test server-provided Retry-After replaces the backoff, capped at max_delay."""
+        config = RetryConfig(base_delay=1.0, max_delay=5.0, jitter=True)
+        assert calculate_delay(0, config, retry_after=3.0) == 3.0
+        assert calculate_delay(0, config, retry_after=3600.0) == 5.0
+
 
 class TestHttpRequest:
     """Tests for http_request function."""
@@ -94,10 +126,10 @@ class TestHttpRequest:
         mock_response.status_code = 200
         mock_response.json.return_value = {"success": True}
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_instance = AsyncMock()
-            mock_instance.request.return_value = mock_response
-            mock_client.return_value.__aenter__.return_value = mock_instance
+        mock_instance = AsyncMock()
+        mock_instance.request.return_value = mock_response
+
+        with patch("src.utils.get_http_client", return_value=mock_instance):
 
             result = await http_request(
                 method="GET",
@@ -115,10 +147,10 @@ class TestHttpRequest:
         mock_response.status_code = 404
         mock_response.json.return_value = {"error": "Not found"}
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_instance = AsyncMock()
-            mock_instance.request.return_value = mock_response
-            mock_client.return_value.__aenter__.return_value = mock_instance
+        mock_instance = AsyncMock()
+        mock_instance.request.return_value = mock_response
+
+        with patch("src.utils.get_http_client", return_value=mock_instance):
 
             result = await http_request(
                 method="GET",
@@ -127,3 +159,426 @@ class TestHttpRequest:
 
             assert result["status_code"] == 404
             assert "error" in result
+
+
+class TestHTTPClientPool:
+    """Tests for the shared upstream client registry."""
+
+    def test_upstream_key(self):
+        """Test upstream key keeps only scheme and host."""
+        assert upstream_key("https://api.notion.com/v1/pages") == "https://api.notion.com"
+        assert upstream_key("https://N8N.example.com:8443/webhook/x") == "https://n8n.example.com:8443"
+
+    @pytest.mark.asyncio
+    async def test_reuses_client_per_upstream(self):
+        """Test the same client is returned for the same upstream."""
+        first = get_http_client("https://api.exa.ai/search")
+        second = get_http_client("https://api.exa.ai/findSimilar")
+        other = get_http_client("https://api.tavily.com/search")
+
+        assert first is second
+        assert first is not other
+
+        await close_http_clients()
+        assert first.is_closed
+        assert other.is_closed
+
+    @pytest.mark.asyncio
+    async def test_new_client_after_close(self):
+        """Test a fresh client is created after shutdown."""
+        first = get_http_client("https://api.exa.ai/search")
+        await close_http_clients()
+
+        second = get_http_client("https://api.exa.ai/search")
+        assert second is not first
+        assert not second.is_closed
+        await close_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_configured_pool_limits(self):
+        """Test per-upstream pool limits are applied."""
+        configure_http_pool(
+            "https://pool-test.example.com",
+            HTTPPoolConfig(max_connections=3, max_keepalive_connections=1),
+        )
+
+        with patch("src.utils.httpx.AsyncClient") as mock_client:
+            get_http_client("https://pool-test.example.com/x")
+
+        limits = mock_client.call_args.kwargs["limits"]
+        assert limits.max_connections == 3
+        assert limits.max_keepalive_connections == 1
+        await close_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_http2_requires_opt_in(self, monkeypatch):
+        """Test HTTP/2 is only used when HTTP2_ENABLED is set."""
+        config = HTTPPoolConfig(http2=True)
+
+        monkeypatch.delenv("HTTP2_ENABLED", raising=False)
+        with patch("src.utils.httpx.AsyncClient") as mock_client:
+            get_http_client("https://h2-off.example.com/x", config)
+        assert mock_client.call_args.kwargs["http2"] is False
+
+        monkeypatch.setenv("HTTP2_ENABLED", "1")
+        with patch("src.utils.httpx.AsyncClient") as mock_client:
+            get_http_client("https://h2-on.example.com/x", config)
+        assert mock_client.call_args.kwargs["http2"] is True
+        await close_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(self, monkeypatch):
+        """Test a missing h2 package falls back to HTTP/1.1."""
+        monkeypatch.setenv("HTTP2_ENABLED", "1")
+        monkeypatch.setitem(sys.modules, "h2", None)
+
+        with patch("src.utils.httpx.AsyncClient") as mock_client:
+            get_http_client("https://h2-missing.example.com/x", HTTPPoolConfig(http2=True))
+        assert mock_client.call_args.kwargs["http2"] is False
+        await close_http_clients()
+
+
+class TestRateLimiter:
+    """Tests for the token bucket rate limiter."""
+
+    def test_parse_retry_after_seconds(self):
+        """Test delta-seconds Retry-After."""
+        assert parse_retry_after("2.5") == 2.5
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_parse_retry_after_http_date(self):
+        """Test HTTP-date Retry-After in the past clamps to zero."""
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    @pytest.mark.asyncio
+    async def test_burst_then_throttle(self):
+        """Test tokens beyond the burst are spaced by the refill rate."""
+        limiter = RateLimiter(RateLimitConfig(requests_per_second=20.0, burst=2))
+
+        waits = [await limiter.acquire() for _ in range(3)]
+
+        assert waits[0] < 0.01
+        assert waits[1] < 0.01
+        assert waits[2] >= 0.04
+        assert limiter.stats()["requests"] == 3
+        assert limiter.stats()["max_wait"] >= 0.04
+
+    def test_retry_after_blocks_bucket(self):
+        """Test Retry-After pauses the bucket and is returned."""
+        limiter = RateLimiter(RateLimitConfig(requests_per_second=3.0, burst=3))
+
+        retry_after = limiter.update_from_response(429, httpx.Headers({"Retry-After": "2"}))
+
+        assert retry_after == 2.0
+        assert limiter._tokens == 0.0
+        assert limiter._blocked_until > 0
+
+    def test_retry_after_pause_capped(self):
+        """Test a huge Retry-After pauses the bucket for at most max_pause."""
+        limiter = RateLimiter(RateLimitConfig(requests_per_second=3.0, max_pause=10.0))
+
+        limiter.update_from_response(429, httpx.Headers({"Retry-After": "3600"}))
+
+        assert limiter._blocked_until - time.monotonic() <= 10.0
+
+    def test_ratelimit_headers_adjust_rate(self):
+        """Test x-ratelimit-* headers cap the refill rate."""
+        limiter = RateLimiter(RateLimitConfig(requests_per_second=10.0, burst=5))
+
+        limiter.update_from_response(
+            200,
+            httpx.Headers({"x-ratelimit-remaining": "4", "x-ratelimit-reset": "8"}),
+        )
+
+        assert limiter.rate == 0.5
+
+    def test_bare_429_halves_rate_then_recovers(self):
+        """Test 429 without headers halves the rate; successes recover it."""
+        limiter = RateLimiter(
+            RateLimitConfig(requests_per_second=4.0, burst=1, recovery_factor=2.0)
+        )
+
+        limiter.update_from_response(429, httpx.Headers({}))
+        assert limiter.rate == 2.0
+
+        limiter.update_from_response(200, httpx.Headers({}))
+        assert limiter.rate == 4.0
+
+    def test_shared_per_upstream(self):
+        """Test limiters are shared by upstream and optional."""
+        config = RateLimitConfig(requests_per_second=3.0)
+        first = get_rate_limiter("https://limiter-test.example.com/a", config)
+        second = get_rate_limiter("https://limiter-test.example.com/b")
+
+        assert first is second
+        assert get_rate_limiter("https://unlimited.example.com/a") is None
+
+
+class TestCircuitBreaker:
+    """Tests for the per-upstream circuit breaker."""
+
+    def test_opens_after_threshold(self):
+        """Test the circuit opens after consecutive failures."""
+        breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=2, recovery_timeout=60))
+
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.retry_in() > 0
+
+    def test_half_open_allows_single_probe(self):
+        """Test only one probe is let through after the recovery timeout."""
+        breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=1, recovery_timeout=60))
+        breaker.record_failure()
+        breaker.opened_at -= 61
+
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request()
+
+    def test_failed_probe_reopens(self):
+        """Test a failed probe re-opens the circuit."""
+        breaker = CircuitBreaker(CircuitBreakerConfig(failure_threshold=3, recovery_timeout=60))
+        for _ in range(3):
+            breaker.record_failure()
+        breaker.opened_at -= 61
+
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    @pytest.mark.asyncio
+    async def test_http_request_fails_fast_when_open(self):
+        """Test each exhausted call counts once and calls fail fast once the circuit opens."""
+        mock_response = MagicMock()
+        mock_response.status_code = 503
+        mock_response.headers = httpx.Headers({})
+        mock_response.json.return_value = {}
+
+        mock_instance = AsyncMock()
+        mock_instance.request.return_value = mock_response
+
+        async def call() -> dict:
+            return await http_request(
+                method="POST",
+                url="https://breaker-test.example.com/search",
+                retry_config=RetryConfig(max_retries=3, base_delay=0, jitter=False),
+                circuit_breaker=CircuitBreakerConfig(failure_threshold=2, recovery_timeout=60),
+            )
+
+        with patch("src.utils.get_http_client", return_value=mock_instance):
+            first = await call()
+            assert first["status_code"] == 503
+            assert get_circuit_breaker("https://breaker-test.example.com").state == CircuitBreaker.CLOSED
+            await call()
+            result = await call()
+
+        assert result["service_unavailable"] is True
+        assert result["service"] == "breaker-test.example.com"
+        assert mock_instance.request.call_count == 8
+
+
+class TestSingleFlight:
+    """Tests for single-flight request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_request(self):
+        """Test identical in-flight calls run the function once."""
+        calls = []
+
+        @single_flight("test.coalesce")
+        async def fetch(query: str, limit: int = 10) -> dict:
+            calls.append(query)
+            await asyncio.sleep(0.01)
+            return {"query": query, "results": [1, 2]}
+
+        results = await asyncio.gather(
+            fetch("voice ai"),
+            fetch("voice ai", limit=10),
+            fetch(query="voice ai"),
+        )
+
+        assert calls == ["voice ai"]
+        assert all(r == {"query": "voice ai", "results": [1, 2]} for r in results)
+        assert results[0] is not results[1]
+        assert get_single_flight_stats()["test.coalesce"] == {
+            "upstream_calls": 1,
+            "coalesced": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_different_payloads_not_coalesced(self):
+        """Test calls with different arguments run separately."""
+        calls = []
+
+        @single_flight("test.distinct")
+        async def fetch(query: str) -> dict:
+            calls.append(query)
+            await asyncio.sleep(0.01)
+            return {"query": query}
+
+        await asyncio.gather(fetch("a"), fetch("b"))
+        assert sorted(calls) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_not_cached(self):
+        """Test a finished call is not reused by later callers."""
+        calls = []
+
+        @single_flight("test.sequential")
+        async def fetch(query: str) -> dict:
+            calls.append(query)
+            return {"query": query}
+
+        await fetch("a")
+        await fetch("a")
+        assert calls == ["a", "a"]
+
+    @pytest.mark.asyncio
+    async def test_custom_key(self):
+        """Test a key function canonicalizes equivalent arguments."""
+        calls = []
+
+        @single_flight("test.key", key=lambda url: url.lower().rstrip("/"))
+        async def fetch(url: str) -> str:
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return url
+
+        await asyncio.gather(fetch("https://A.com/"), fetch("https://a.com"))
+        assert len(calls) == 1
+
+
+class TestHedging:
+    """Tests for latency tracking and hedged requests."""
+
+    def test_endpoint_key_collapses_ids(self):
+        """Test Notion-style IDs are collapsed in endpoint keys."""
+        key = endpoint_key(
+            "post",
+            "https://api.notion.com/v1/databases/2861bdff7e998000a14edb0bf56a75bf/query",
+        )
+        assert key == "POST https://api.notion.com/v1/databases/{id}/query"
+
+    def test_latency_percentile(self):
+        """Test percentile over the rolling window."""
+        tracker = LatencyTracker(window=100)
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+
+        assert tracker.percentile(50) == 0.051
+        assert tracker.percentile(95) == 0.096
+        assert LatencyTracker().percentile(95) is None
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        """Test a slow primary triggers a hedge that wins."""
+        url = "https://hedge-test.example.com/search"
+        tracker = get_latency_tracker(endpoint_key("POST", url))
+        for _ in range(20):
+            tracker.record(0.01)
+
+        fast = MagicMock(status_code=200, headers=httpx.Headers({}))
+        fast.json.return_value = {"results": ["fast"]}
+        calls = 0
+
+        async def request(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(5)
+            return fast
+
+        mock_instance = MagicMock()
+        mock_instance.request = request
+
+        with patch("src.utils.get_http_client", return_value=mock_instance):
+            result = await asyncio.wait_for(
+                http_request(
+                    method="POST",
+                    url=url,
+                    hedge=HedgeConfig(min_delay=0.01, max_hedge_ratio=1.0),
+                ),
+                timeout=1,
+            )
+
+        assert result["data"] == {"results": ["fast"]}
+        assert calls == 2
+        stats = get_hedge_stats()[endpoint_key("POST", url)]
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_history(self):
+        """Test requests are not hedged before enough samples exist."""
+        url = "https://hedge-cold.example.com/search"
+        response = MagicMock(status_code=200, headers=httpx.Headers({}))
+        response.json.return_value = {}
+
+        mock_instance = AsyncMock()
+        mock_instance.request.return_value = response
+
+        with patch("src.utils.get_http_client", return_value=mock_instance):
+            await http_request(method="POST", url=url, hedge=HedgeConfig())
+
+        assert mock_instance.request.call_count == 1
+        assert get_hedge_stats()[endpoint_key("POST", url)]["hedged"] == 0
+
+
+class TestAdaptiveTimeout:
+    """Tests for latency-driven timeouts."""
+
+    def test_static_timeout_until_enough_samples(self):
+        """Test the caller's timeout is used without history."""
+        timeout = compute_timeout(
+            "POST", "https://timeout-cold.example.com/q", 30.0, AdaptiveTimeoutConfig()
+        )
+        assert timeout.read == 30.0
+        assert timeout.connect == 10.0
+
+    def test_timeout_follows_latency_within_bounds(self):
+        """Test read timeout is multiplier x percentile, clamped to floor/ceiling."""
+        url = "https://timeout-warm.example.com/q"
+        tracker = get_latency_tracker(endpoint_key("POST", url))
+        config = AdaptiveTimeoutConfig(floor=1.0, ceiling=60.0, multiplier=2.0, min_samples=10)
+
+        for _ in range(10):
+            tracker.record(3.0)
+        assert compute_timeout("POST", url, 30.0, config).read == 6.0
+
+        for _ in range(10):
+            tracker.record(0.1)
+        assert compute_timeout("POST", url, 30.0, AdaptiveTimeoutConfig(
+            floor=1.0, percentile=25, min_samples=10,
+        )).read == 1.0
+
+        metrics = get_timeout_metrics()[endpoint_key("POST", url)]
+        assert metrics["read_timeout"] == 1.0
+        assert metrics["samples"] == 20
+
+    @pytest.mark.asyncio
+    async def test_read_timeout_counts_as_sample(self):
+        """Test timed-out requests feed the latency window."""
+        url = "https://timeout-slow.example.com/q"
+        mock_instance = AsyncMock()
+        mock_instance.request.side_effect = httpx.ReadTimeout("slow")
+
+        with patch("src.utils.get_http_client", return_value=mock_instance):
+            result = await http_request(
+                method="POST",
+                url=url,
+                retry_config=RetryConfig(max_retries=1, base_delay=0, jitter=False),
+                adaptive_timeout=AdaptiveTimeoutConfig(),
+            )
+
+        assert result["status_code"] == 0
+        assert len(get_latency_tracker(endpoint_key("POST", url))) == 2
+        assert "extensions" in mock_instance.request.call_args.kwargs